@@ -1,9 +1,14 @@
+import uuid
 import streamlit as st
 from components.auth import auth_page, require_auth
-from components.dashboard import dashboard
-from components.course_add import add_course_form
-from components.course_view import course_view, course_list_view
-from database import get_user_courses
+from components.charts import chart_mode_toggle
+from components.playback import playback_speed_selector
+from course_purge import start_purger
+from instrumentation import begin_rerun, end_rerun, is_perf_enabled
+from loader import begin_rerun_loader, end_rerun_loader, load_user_courses
+from metrics import record_rerun, start_exporter
+from profiling import is_profiling_requested, profile_call
+from progress_queue import apply_pending_progress, flush_user_progress
 
 # Set page config
 st.set_page_config(
@@ -13,6 +18,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Start the Prometheus metrics endpoint/textfile writer if configured (once per process)
+start_exporter()
+
+# Remove deleted courses in the background once their undo window has passed (once per process)
+start_purger()
+
 # Add custom CSS
 st.markdown("""
 <style>
@@ -69,6 +80,9 @@ def initialize_session_state():
     
     if "page" not in st.session_state:
         st.session_state["page"] = "dashboard"
+    
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex
 
 def sidebar_navigation():
     """Create sidebar navigation"""
@@ -91,10 +105,25 @@ def sidebar_navigation():
         if st.sidebar.button("Add New Course", key="sidebar_add_course_btn", use_container_width=True):
             st.session_state["page"] = "add_course"
             st.rerun()
+            
+        if st.sidebar.button("Compare Courses", key="sidebar_compare_btn", use_container_width=True):
+            st.session_state["page"] = "compare"
+            st.rerun()
+            
+        if st.sidebar.button("Study Plan", key="sidebar_plan_btn", use_container_width=True):
+            st.session_state["page"] = "plan"
+            st.rerun()
+        
+        # Chart rendering mode and playback speeds
+        st.sidebar.markdown("---")
+        chart_mode_toggle()
+        playback_speed_selector()
         
         # Logout option
         st.sidebar.markdown("---")
         if st.sidebar.button("Logout", key="sidebar_logout_btn", use_container_width=True):
+            # Save buffered progress before the session lets go of the user
+            flush_user_progress(st.session_state["user"]["id"])
             st.session_state["authenticated"] = False
             st.session_state.pop("user", None)
             st.session_state["page"] = "dashboard"
@@ -105,6 +134,24 @@ def main():
     # Initialize session state
     initialize_session_state()
     
+    page = st.session_state["page"] if st.session_state["authenticated"] else "login"
+    record_rerun(page, st.session_state["session_id"])
+    
+    # Collect timing spans for this rerun; shown in the sidebar when enabled
+    rerun = begin_rerun(page, is_perf_enabled(st.query_params), st.session_state["session_id"])
+    # Reads in this rerun go through one loader, so repeated ones are served from memory
+    begin_rerun_loader()
+    try:
+        render_app()
+        if rerun.enabled:
+            from components.perf_panel import display_perf_panel
+            display_perf_panel(rerun)
+    finally:
+        end_rerun_loader()
+        end_rerun(rerun)
+
+def render_app():
+    """Render the header, navigation and current page"""
     # Display the header on all pages (including login)
     display_header()
     
@@ -124,15 +171,19 @@ def main():
         auth_page()
         return
     
-    # Page router
+    # Page router. Page modules are imported on first use, so the login page
+    # starts without loading pandas and plotly; later imports are cache hits.
     current_page = st.session_state["page"]
     
     if current_page == "dashboard":
+        from components.dashboard import dashboard
         dashboard(st.session_state["user"])
     
     elif current_page == "courses":
+        from components.course_view import course_view, course_list_view
+        from components.course_search import course_search
+        
         st.title("My Courses")
-        courses = get_user_courses(st.session_state["user"]["id"])
         
         if "selected_course" in st.session_state:
             # Single course view
@@ -141,13 +192,44 @@ def main():
             # Back button
             if st.button("Back to All Courses", key="back_to_courses_btn"):
                 st.session_state.pop("selected_course", None)
+                st.session_state.pop("focus_section", None)
                 st.rerun()
         else:
-            # Course list view
+            # Search across all courses, then the course list
+            course_search(st.session_state["user"]["id"])
+            # Only the list needs every course; a selected course is loaded on its own
+            courses = [apply_pending_progress(course) for course in load_user_courses(st.session_state["user"]["id"])]
             course_list_view(courses)
     
     elif current_page == "add_course":
+        from components.course_add import add_course_form
         add_course_form()
+    
+    elif current_page == "compare":
+        from components.course_compare import course_comparison
+        st.title("Compare Courses")
+        course_comparison(st.session_state["user"])
+    
+    elif current_page == "plan":
+        from components.study_plan import study_plan
+        st.title("Study Plan")
+        study_plan(st.session_state["user"])
+
+def run():
+    """Run the app, under the profiler when requested"""
+    if is_profiling_requested(st.query_params):
+        initialize_session_state()
+        page = st.session_state["page"] if st.session_state["authenticated"] else "login"
+        # A query-param request profiles this rerun only
+        if "profile" in st.query_params:
+            del st.query_params["profile"]
+        profile_call(page, main, lambda result: st.session_state.__setitem__("last_profile", result))
+    else:
+        main()
+    
+    if "last_profile" in st.session_state:
+        from components.perf_panel import display_profile_panel
+        display_profile_panel(st.session_state["last_profile"])
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    run() 
\ No newline at end of file
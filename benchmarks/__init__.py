@@ -0,0 +1 @@
+# Benchmarks and load-test harnesses for Study Track
@@ -0,0 +1,104 @@
+"""Microbenchmarks for the data layer and course statistics
+
+Usage:
+    python benchmarks/bench_data_layer.py --backend memory
+    python benchmarks/bench_data_layer.py --backend mongo --sections 40 --videos 25 \
+        --baseline benchmarks/results/data_layer-20240101-120000.json
+"""
+import argparse
+import copy
+import random
+
+from harness import setup_backend, summarize, time_calls, environment_info, write_results, compare_results
+from synthetic import generate_dataset, generate_course
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Study Track data layer")
+    parser.add_argument("--backend", choices=["memory", "mongo", "sqlite"], default="memory",
+                        help="in-memory mongomock stand-in, the MongoDB at MONGO_URI or in-memory SQLite")
+    parser.add_argument("--db-name", default="study_track_bench",
+                        help="database used for the run; it is dropped afterwards")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--courses-per-user", type=int, default=5)
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--videos", type=int, default=10, help="videos per section")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/data_layer-<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous result file to compare against")
+    return parser.parse_args()
+
+def seed_database(database, dataset):
+    """Insert the synthetic users and courses, returning (user_ids, course_ids)"""
+    from components.course_handlers import update_course_statistics
+    
+    user_ids, course_ids = [], []
+    for user, courses in dataset:
+        # Skip bcrypt here; hashing cost is not what this suite measures
+        user_id = database.get_storage().insert_user({"email": user["email"], "password": b"", "name": user["name"]})
+        user_ids.append(user_id)
+        for course in courses:
+            course_ids.append(database.add_course(user_id, update_course_statistics(copy.deepcopy(course))))
+    return user_ids, course_ids
+
+def run_benchmarks(database, args, user_ids, course_ids):
+    """Time each operation and return the summaries keyed by name"""
+    from components.course_handlers import calculate_course_statistics, update_course_statistics
+    
+    rng = random.Random(args.seed)
+    sample_course = generate_course(rng, args.sections, args.videos)
+    results = {}
+    
+    results["calculate_course_statistics"] = summarize(time_calls(
+        lambda i: calculate_course_statistics(sample_course), args.iterations))
+    
+    results["update_course_statistics"] = summarize(time_calls(
+        lambda i: update_course_statistics(sample_course), args.iterations))
+    
+    results["get_user_courses"] = summarize(time_calls(
+        lambda i: database.get_user_courses(user_ids[i % len(user_ids)]), args.iterations))
+    
+    results["get_course_by_id"] = summarize(time_calls(
+        lambda i: database.get_course_by_id(course_ids[i % len(course_ids)]), args.iterations))
+    
+    stats_update = calculate_course_statistics(sample_course)
+    results["update_course"] = summarize(time_calls(
+        lambda i: database.update_course(course_ids[i % len(course_ids)], dict(stats_update)), args.iterations))
+    
+    def toggle_video(i):
+        database.update_video_status(course_ids[i % len(course_ids)],
+                                     i % args.sections, i % args.videos, i % 2 == 0)
+    results["update_video_status"] = summarize(time_calls(toggle_video, args.iterations))
+    
+    return results
+
+def main():
+    args = parse_args()
+    database = setup_backend(args.backend, args.db_name)
+    
+    dataset = generate_dataset(args.users, args.courses_per_user, args.sections, args.videos, seed=args.seed)
+    try:
+        user_ids, course_ids = seed_database(database, dataset)
+        results = run_benchmarks(database, args, user_ids, course_ids)
+    finally:
+        database.get_storage().drop()
+    
+    report = {
+        "benchmark": "data_layer",
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "environment": environment_info(),
+        "results": results
+    }
+    
+    print(f"{'operation':<28} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<28} {result['ops_per_sec']:>10} {result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f}")
+    
+    path = write_results("data_layer", report, args.output)
+    print(f"\nResults written to {path}")
+    
+    if args.baseline:
+        compare_results(report, args.baseline)
+
+if __name__ == "__main__":
+    main()
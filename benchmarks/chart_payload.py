@@ -0,0 +1,133 @@
+"""Bytes sent to the browser per rerun with Plotly and lightweight charts
+
+Renders the dashboard and a course page through Streamlit's AppTest in both
+chart modes and sums the serialized size of the ForwardMsgs each rerun
+enqueues for the browser, i.e. the websocket payload before compression.
+`chart_bytes` counts only the chart elements (Plotly, Vega-Lite, metrics
+and progress bars); the rest of the page is the same in both modes.
+
+Usage:
+    python benchmarks/chart_payload.py --backend memory --courses 9
+"""
+import argparse
+import copy
+import time
+
+from harness import REPO_ROOT, setup_backend, environment_info, write_results, compare_results
+from synthetic import generate_dataset
+
+APP_PATH = f"{REPO_ROOT}/app.py"
+MODES = ("plotly", "light")
+
+# Elements either chart mode draws its gauges, donuts and bars with
+CHART_ELEMENTS = {"plotly_chart", "vega_lite_chart", "arrow_vega_lite_chart", "metric", "progress"}
+
+class PayloadCounter:
+    """Sums the size of the messages the script runner queues for the browser"""
+
+    def __init__(self):
+        self.bytes = 0
+        self.chart_bytes = 0
+        self.messages = 0
+
+    def install(self):
+        from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+
+        enqueue = ForwardMsgQueue.enqueue
+        counter = self
+
+        def counting_enqueue(queue, msg):
+            size = msg.ByteSize()
+            counter.bytes += size
+            counter.messages += 1
+            if msg.WhichOneof("type") == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                if msg.delta.new_element.WhichOneof("type") in CHART_ELEMENTS:
+                    counter.chart_bytes += size
+            return enqueue(queue, msg)
+        ForwardMsgQueue.enqueue = counting_enqueue
+
+    def reset(self):
+        self.bytes = 0
+        self.chart_bytes = 0
+        self.messages = 0
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure per-rerun browser payload by chart mode")
+    parser.add_argument("--backend", choices=["memory", "mongo", "sqlite"], default="memory")
+    parser.add_argument("--db-name", default="study_track_payload")
+    parser.add_argument("--courses", type=int, default=9, help="courses of the measured user")
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--videos", type=int, default=10, help="videos per section")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/chart_payload-<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous result file to compare against")
+    return parser.parse_args()
+
+def measure(user, course_id, mode, page, counter):
+    """Bytes and messages of one steady-state rerun of `page` in chart mode `mode`"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.session_state["authenticated"] = True
+    app.session_state["user"] = user
+    app.session_state["light_charts"] = mode == "light"
+    app.session_state["page"] = "dashboard" if page == "dashboard" else "courses"
+    if page == "course":
+        app.session_state["selected_course"] = course_id
+
+    # The first run also carries one-off messages (page config, new session)
+    app.run()
+    counter.reset()
+    start = time.perf_counter()
+    app.run()
+    duration = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"{page} ({mode}) raised: {app.exception[0].value}")
+    return {"bytes": counter.bytes, "chart_bytes": counter.chart_bytes, "messages": counter.messages,
+            "rerun_ms": round(duration * 1000, 1)}
+
+def main():
+    args = parse_args()
+    database = setup_backend(args.backend, args.db_name)
+    counter = PayloadCounter()
+    counter.install()
+
+    from components.course_handlers import update_course_statistics
+
+    [(account, courses)] = generate_dataset(1, args.courses, args.sections, args.videos, seed=args.seed)
+    try:
+        user_id = database.get_storage().insert_user({"email": account["email"], "password": b"", "name": account["name"]})
+        course_ids = [database.add_course(user_id, update_course_statistics(copy.deepcopy(course))) for course in courses]
+        user = {"id": user_id, "email": account["email"], "name": account["name"]}
+
+        results = {}
+        for page in ("dashboard", "course"):
+            for mode in MODES:
+                results[f"{page}/{mode}"] = measure(user, course_ids[0], mode, page, counter)
+    finally:
+        database.get_storage().drop()
+
+    report = {
+        "benchmark": "chart_payload",
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "environment": environment_info(),
+        "results": results
+    }
+
+    print(f"{'page/mode':<20} {'bytes':>10} {'chart bytes':>12} {'messages':>10} {'rerun ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<20} {result['bytes']:>10} {result['chart_bytes']:>12} {result['messages']:>10} "
+              f"{result['rerun_ms']:>10}")
+    for page in ("dashboard", "course"):
+        full, light = results[f"{page}/plotly"], results[f"{page}/light"]
+        print(f"{page}: lightweight mode sends {(1 - light['bytes'] / full['bytes']) * 100:.0f}% fewer bytes per "
+              f"rerun ({(1 - light['chart_bytes'] / full['chart_bytes']) * 100:.0f}% fewer for the charts)")
+
+    path = write_results("chart_payload", report, args.output)
+    print(f"\nResults written to {path}")
+
+    if args.baseline:
+        compare_results(report, args.baseline, metric="bytes")
+
+if __name__ == "__main__":
+    main()
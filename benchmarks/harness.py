@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+
+# Allow running the benchmarks as scripts from the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+def setup_backend(backend, db_name):
+    """Select the storage the app modules will use and import `database`
+
+    `memory` swaps the MongoDB client for mongomock's in-memory stand-in,
+    `mongo` uses MONGO_URI as usual and `sqlite` uses an in-memory SQLite
+    database. Must run before anything imports `database`.
+    """
+    os.environ["DB_NAME"] = db_name
+    if backend == "sqlite":
+        os.environ["STORAGE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = ":memory:"
+    elif backend == "memory":
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("The memory backend requires mongomock (pip install mongomock)")
+        import pymongo
+        pymongo.MongoClient = mongomock.MongoClient
+    
+    import database
+    return database
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def summarize(durations):
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    values = sorted(d * 1000 for d in durations)
+    total = sum(durations)
+    return {
+        "iterations": len(values),
+        "ops_per_sec": round(len(values) / total, 1) if total > 0 else 0.0,
+        "mean_ms": round(statistics.fmean(values), 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "min_ms": round(values[0], 3) if values else 0.0,
+        "max_ms": round(values[-1], 3) if values else 0.0
+    }
+
+def time_calls(func, iterations):
+    """Call func(i) `iterations` times and return the individual durations"""
+    durations = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def environment_info():
+    """Describe the machine and revision a result was produced on"""
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git_revision": revision
+    }
+
+def write_results(name, results, output=None):
+    """Write results as JSON and return the path"""
+    if output is None:
+        from synthetic import timestamp
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{timestamp()}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return output
+
+def compare_results(current, baseline_path, metric="p50_ms"):
+    """Print the relative change of `metric` per benchmark against a previous run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    
+    print(f"\nChange in {metric} vs {baseline_path}:")
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get(metric):
+            print(f"  {name:<28} (no baseline)")
+            continue
+        change = (result[metric] - previous[metric]) / previous[metric] * 100
+        print(f"  {name:<28} {previous[metric]:>10.3f} -> {result[metric]:>10.3f}  ({change:+.1f}%)")
@@ -0,0 +1,129 @@
+"""Cold-start measurement: import time and time to the first login form
+
+Each run starts a fresh interpreter with `-X importtime`, renders the login
+page of app.py once through Streamlit's AppTest and reports:
+
+- cold_start: process start to the login form being rendered
+- streamlit_import: importing Streamlit and its testing harness
+- first_login_rerun: the first script run of app.py (app imports + login page)
+
+plus the top-level modules with the largest cumulative import time and which
+heavy libraries (pandas, plotly, pymongo...) were loaded for the login page.
+
+Usage:
+    python benchmarks/import_time.py --runs 5
+    python benchmarks/import_time.py --baseline benchmarks/results/import_time-20240101-120000.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from harness import REPO_ROOT, summarize, environment_info, write_results, compare_results
+
+# Libraries the login page should not need. (Streamlit itself imports the
+# lightweight plotly.graph_objects package to register its chart theme.)
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "plotly.express", "pymongo"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+DRIVER = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+finished = time.perf_counter()
+print(json.dumps({
+    "streamlit_import": imported - start,
+    "first_login_rerun": finished - imported,
+    "login_form": any(element.key == "login_email" for element in at.text_input),
+    "exceptions": [str(e.value) for e in at.exception],
+    "heavy_modules": sorted(name for name in sys.argv[2].split(",") if name in sys.modules)
+}))
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure Study Track cold-start and import time")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=15, help="modules to list by cumulative import time")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/import_time-<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous result file to compare against")
+    return parser.parse_args()
+
+def parse_importtime(stderr):
+    """Cumulative import time in seconds of each top-level import, from `-X importtime` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Nested imports are indented and already part of their parent's cumulative time
+        if match and not match.group(3):
+            modules[match.group(4)] = modules.get(match.group(4), 0) + int(match.group(2)) / 1e6
+    return modules
+
+def run_once():
+    """Start one interpreter, render the login page and return its measurements"""
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", DRIVER, os.path.join(REPO_ROOT, "app.py"), ",".join(HEAVY_MODULES)],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        sys.exit(f"Cold-start run failed:\n{process.stderr[-2000:]}")
+
+    measurements = json.loads(process.stdout.strip().splitlines()[-1])
+    measurements["cold_start"] = elapsed
+    measurements["imports"] = parse_importtime(process.stderr)
+    return measurements
+
+def main():
+    args = parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    last = runs[-1]
+    if last["exceptions"]:
+        print(f"Warning: the login page raised {last['exceptions']}")
+    if not last["login_form"]:
+        print("Warning: no login form found on the first page")
+
+    results = {name: summarize([run[name] for run in runs])
+               for name in ("cold_start", "streamlit_import", "first_login_rerun")}
+
+    # Median cumulative time per top-level module across runs
+    module_names = set().union(*(run["imports"] for run in runs))
+    modules = {name: statistics.median(run["imports"].get(name, 0) for run in runs) for name in module_names}
+    top_modules = sorted(modules.items(), key=lambda item: -item[1])[:args.top]
+
+    report = {
+        "benchmark": "import_time",
+        "parameters": {"runs": args.runs},
+        "environment": environment_info(),
+        "results": results,
+        "top_imports_ms": {name: round(seconds * 1000, 1) for name, seconds in top_modules},
+        "heavy_modules_on_login": last["heavy_modules"]
+    }
+
+    print(f"{'measurement':<28} {'p50 ms':>10} {'max ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<28} {result['p50_ms']:>10.1f} {result['max_ms']:>10.1f}")
+
+    print(f"\nTop {args.top} imports by cumulative time (median ms):")
+    for name, seconds in top_modules:
+        print(f"  {name:<40} {seconds * 1000:>8.1f}")
+
+    print(f"\nHeavy modules loaded for the login page: {', '.join(last['heavy_modules']) or 'none'}")
+
+    path = write_results("import_time", report, args.output)
+    print(f"\nResults written to {path}")
+
+    if args.baseline:
+        compare_results(report, args.baseline)
+
+if __name__ == "__main__":
+    main()
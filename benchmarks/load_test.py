@@ -0,0 +1,250 @@
+"""Concurrent-session load test for app.py using Streamlit's AppTest
+
+Each simulated user runs a headless app session through login, dashboard,
+opening a course, toggling videos and adding a course. Sessions run
+concurrently in one process, like the sessions served by one Streamlit server.
+
+Usage:
+    python benchmarks/load_test.py --backend memory --sessions 20 --rounds 3
+    python benchmarks/load_test.py --backend mongo --sessions 50
+"""
+import argparse
+import copy
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from harness import REPO_ROOT, setup_backend, summarize, environment_info, write_results
+from synthetic import generate_dataset
+from instrumentation import add_span_listener
+
+APP_PATH = f"{REPO_ROOT}/app.py"
+
+class DbOperationCounter:
+    """Counts data-layer calls: every `@traced("db")` function in `database`, so new ones are included"""
+    
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def install(self):
+        """Listen for finished spans; the database functions don't call each other, so none is counted twice"""
+        add_span_listener(self._on_span)
+    
+    def _on_span(self, category, name, seconds):
+        if category == "db":
+            with self._lock:
+                self.count += 1
+
+def allow_concurrent_apptests():
+    """Let AppTest instances run on several threads at once
+
+    AppTest assumes one test at a time: each run installs a mock Runtime
+    singleton and patches the config, then clears both when it finishes,
+    which breaks any other session that is mid-run. Keep the last mock
+    runtime and the test config in place for the whole load test instead.
+    """
+    from contextlib import contextmanager
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import build_mock_config_get_option
+    
+    sticky = {}
+    
+    def instance(cls):
+        if cls._instance is not None:
+            sticky["runtime"] = cls._instance
+            return cls._instance
+        if "runtime" not in sticky:
+            raise RuntimeError("Runtime hasn't been created!")
+        return sticky["runtime"]
+    
+    def exists(cls):
+        return cls._instance is not None or "runtime" in sticky
+    
+    @contextmanager
+    def keep_config(config_overrides):
+        yield
+    
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = keep_config
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Drive concurrent headless Study Track sessions")
+    parser.add_argument("--backend", choices=["memory", "mongo", "sqlite"], default="memory")
+    parser.add_argument("--db-name", default="study_track_load")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent app sessions")
+    parser.add_argument("--rounds", type=int, default=2, help="scenario repetitions per session")
+    parser.add_argument("--courses-per-user", type=int, default=3)
+    parser.add_argument("--sections", type=int, default=8)
+    parser.add_argument("--videos", type=int, default=8, help="videos per section")
+    parser.add_argument("--toggles", type=int, default=3, help="videos toggled per round")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-rerun timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    return parser.parse_args()
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def seed_users(database, args):
+    """Create the load-test users and their courses"""
+    from components.course_handlers import update_course_statistics
+    
+    accounts = []
+    dataset = generate_dataset(args.sessions, args.courses_per_user, args.sections, args.videos, seed=args.seed)
+    for user, courses in dataset:
+        user_id = database.create_user(user["email"], user["password"], user["name"])
+        course_ids = [database.add_course(user_id, update_course_statistics(copy.deepcopy(course)))
+                      for course in courses]
+        accounts.append({**user, "id": user_id, "course_ids": course_ids})
+    return accounts
+
+class Session:
+    """One simulated user driving a headless app session"""
+    
+    def __init__(self, account, args, record):
+        from streamlit.testing.v1 import AppTest
+        
+        self.account = account
+        self.args = args
+        self.record = record
+        self.rng = random.Random(account["email"])
+        self.app = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    
+    def _run(self, step, element=None):
+        """Rerun the app (optionally after interacting with an element) and record the latency"""
+        start = time.perf_counter()
+        if element is None:
+            self.app.run()
+        else:
+            element.run()
+        self.record(step, time.perf_counter() - start)
+        if self.app.exception:
+            raise RuntimeError(f"{step} failed: {self.app.exception[0].value}")
+    
+    def login(self):
+        self._run("login_page")
+        self.app.text_input(key="login_email").input(self.account["email"])
+        self.app.text_input(key="login_password").input(self.account["password"])
+        submit = next(button for button in self.app.button if button.label == "Login")
+        self._run("login", submit.click())
+    
+    def dashboard(self):
+        self._run("dashboard", self.app.button(key="sidebar_dashboard_btn").click())
+    
+    def open_course(self):
+        course_id = self.rng.choice(self.account["course_ids"])
+        self.app.session_state["selected_course"] = course_id
+        self._run("open_course", self.app.button(key="sidebar_courses_btn").click())
+        return course_id
+    
+    def toggle_videos(self, course_id):
+        for _ in range(self.args.toggles):
+            section = self.rng.randrange(self.args.sections)
+            video = self.rng.randrange(self.args.videos)
+            checkbox = self.app.checkbox(key=f"video_{section}_{video}_{course_id}")
+            self._run("toggle_video", checkbox.set_value(not checkbox.value))
+    
+    def add_course(self, round_index):
+        self._run("add_course_page", self.app.button(key="sidebar_add_course_btn").click())
+        self.app.text_input(key="course_title").input(f"Load test course {round_index}")
+        self._run("add_course", self.app.button(key="save_course_btn").click())
+    
+    def scenario(self):
+        self.login()
+        for round_index in range(self.args.rounds):
+            self.dashboard()
+            course_id = self.open_course()
+            self.toggle_videos(course_id)
+            self.add_course(round_index)
+
+def calibrate(account, args, counter):
+    """Run the scenario once on its own to attribute database operations to each step"""
+    ops = {}
+    
+    def record(step, duration):
+        ops.setdefault(step, []).append(counter.count - record.last)
+        record.last = counter.count
+    record.last = counter.count
+    
+    Session(account, dict_args(args, rounds=1), record).scenario()
+    return {step: round(sum(values) / len(values), 2) for step, values in ops.items()}
+
+def dict_args(args, **overrides):
+    """Copy of the parsed arguments with some values replaced"""
+    return argparse.Namespace(**{**vars(args), **overrides})
+
+def main():
+    args = parse_args()
+    database = setup_backend(args.backend, args.db_name)
+    counter = DbOperationCounter()
+    counter.install()
+    allow_concurrent_apptests()
+    
+    try:
+        accounts = seed_users(database, args)
+        
+        print("Calibrating database operations per step...")
+        db_ops_per_step = calibrate(accounts[0], args, counter)
+        
+        latencies = {}
+        lock = threading.Lock()
+        
+        def record(step, duration):
+            with lock:
+                latencies.setdefault(step, []).append(duration)
+        
+        print(f"Running {args.sessions} concurrent sessions x {args.rounds} rounds...")
+        ops_before = counter.count
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            futures = [pool.submit(Session(account, args, record).scenario) for account in accounts]
+            errors = [str(f.exception()) for f in futures if f.exception()]
+        elapsed = time.perf_counter() - start
+        total_ops = counter.count - ops_before
+    finally:
+        database.get_storage().drop()
+    
+    reruns = sum(len(values) for values in latencies.values())
+    report = {
+        "benchmark": "load_test",
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "environment": environment_info(),
+        "summary": {
+            "elapsed_sec": round(elapsed, 2),
+            "reruns": reruns,
+            "reruns_per_sec": round(reruns / elapsed, 1) if elapsed > 0 else 0.0,
+            "db_ops": total_ops,
+            "db_ops_per_rerun": round(total_ops / reruns, 2) if reruns else 0.0,
+            "peak_rss_mb": peak_rss_mb(),
+            "failed_sessions": len(errors),
+            "errors": errors[:10]
+        },
+        "results": {step: {**summarize(values), "db_ops_per_rerun": db_ops_per_step.get(step)}
+                    for step, values in latencies.items()}
+    }
+    
+    print(f"\n{'step':<18} {'reruns':>8} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10} {'db ops':>8}")
+    for step, result in report["results"].items():
+        print(f"{step:<18} {result['iterations']:>8} {result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f} "
+              f"{result['max_ms']:>10.1f} {result['db_ops_per_rerun']!s:>8}")
+    summary = report["summary"]
+    print(f"\n{summary['reruns']} reruns in {summary['elapsed_sec']}s ({summary['reruns_per_sec']}/s), "
+          f"{summary['db_ops_per_rerun']} db ops/rerun, peak RSS {summary['peak_rss_mb']} MB, "
+          f"{summary['failed_sessions']} failed sessions")
+    
+    path = write_results("load_test", report, args.output)
+    print(f"Results written to {path}")
+
+if __name__ == "__main__":
+    main()
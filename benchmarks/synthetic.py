@@ -0,0 +1,56 @@
+import random
+import datetime
+
+PLATFORMS = ["udemy", "youtube", "other"]
+TOPICS = ["Python", "Decorators", "Generators", "Databases", "Indexes", "Testing",
+          "Streamlit", "Pandas", "Plotting", "Async", "Packaging", "Profiling"]
+
+def generate_user(index):
+    """Generate a deterministic user record"""
+    return {
+        "email": f"bench_user_{index}@example.com",
+        "password": f"BenchPass{index}",
+        "name": f"Bench User {index}"
+    }
+
+def generate_course(rng, num_sections, videos_per_section, completed_ratio=0.3):
+    """Generate a course document shaped like the ones built by the add-course form"""
+    sections = []
+    for i in range(num_sections):
+        videos = []
+        for j in range(videos_per_section):
+            duration = round(rng.uniform(2.0, 30.0), 1)
+            videos.append({
+                "title": f"{rng.choice(TOPICS)} part {j+1}",
+                "duration_minutes": duration,
+                "completed": rng.random() < completed_ratio
+            })
+        sections.append({
+            "title": f"Section {i+1}: {rng.choice(TOPICS)}",
+            "videos": videos
+        })
+    
+    return {
+        "title": f"{rng.choice(TOPICS)} course {rng.randint(1, 10_000)}",
+        "description": "Synthetic course generated for benchmarking",
+        "platform": rng.choice(PLATFORMS),
+        "url": "",
+        "sections": sections
+    }
+
+def generate_dataset(num_users, courses_per_user, num_sections, videos_per_section, seed=42):
+    """Generate users with their courses
+
+    The same arguments always produce the same data, so benchmark runs are
+    comparable with each other.
+    """
+    rng = random.Random(seed)
+    dataset = []
+    for i in range(num_users):
+        courses = [generate_course(rng, num_sections, videos_per_section) for _ in range(courses_per_user)]
+        dataset.append((generate_user(i), courses))
+    return dataset
+
+def timestamp():
+    """Timestamp used in result file names"""
+    return datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -1,6 +1,15 @@
 import streamlit as st
 import re
+import logging
 from database import create_user, get_user_by_email, verify_password
+from instrumentation import traced
+from components.course_handlers import DEFAULT_PLAYBACK_SPEEDS
+from progress_queue import flush_user_progress
+
+logger = logging.getLogger(__name__)
+
+# All the login form needs of a user document
+LOGIN_FIELDS = ["email", "password", "name", "playback_speeds"]
 
 def is_valid_email(email):
     """Validate email format"""
@@ -20,6 +29,7 @@ def is_strong_password(password):
         return False
     return True
 
+@traced("render")
 def login_form():
     """Display login form and handle login"""
     # Create a centered container with styling
@@ -37,7 +47,7 @@ def login_form():
                     st.error("Please fill in all fields")
                     return False
                     
-                user = get_user_by_email(email)
+                user = get_user_by_email(email, LOGIN_FIELDS)
                 if not user:
                     st.error("Email not found. Please sign up first.")
                     return False
@@ -51,13 +61,15 @@ def login_form():
                 st.session_state["user"] = {
                     "id": str(user["_id"]),
                     "email": user["email"],
-                    "name": user["name"]
+                    "name": user["name"],
+                    "playback_speeds": user.get("playback_speeds", DEFAULT_PLAYBACK_SPEEDS)
                 }
                 st.session_state["authenticated"] = True
                 return True
                 
     return False
 
+@traced("render")
 def signup_form():
     """Display signup form and handle registration"""
     # Create a centered container with styling
@@ -97,23 +109,23 @@ def signup_form():
                     st.error("Password does not meet security requirements")
                     return False
                     
-                # Check if email already exists
-                existing_user = get_user_by_email(email)
-                if existing_user:
-                    st.error("Email already exists")
+                # Create new user; a taken email is rejected by the insert itself
+                try:
+                    user_id = create_user(email, password, name)
+                except Exception as e:
+                    logger.error(f"Sign up failed: {e}")
+                    st.error("Sign up failed, please try again later")
                     return False
-                    
-                # Create new user
-                user_id = create_user(email, password, name)
                 if user_id:
                     st.success("Sign up successful! Please log in.")
                     return True
                 else:
-                    st.error("Error creating user. Please try again.")
+                    st.error("Email already exists")
                     return False
                 
     return False
 
+@traced("render")
 def auth_page():
     """Main authentication page with tabs for login and signup"""
     # Add custom CSS for better styling of the auth page
@@ -161,6 +173,8 @@ def auth_page():
     if st.session_state["authenticated"]:
         # If already logged in, show logout option
         if st.button("Logout"):
+            if "user" in st.session_state:
+                flush_user_progress(st.session_state["user"]["id"])
             st.session_state["authenticated"] = False
             st.session_state.pop("user", None)
             st.rerun()
@@ -0,0 +1,91 @@
+import os
+import streamlit as st
+from instrumentation import traced
+
+# "plotly" (default) draws the full Plotly charts; "light" draws the same
+# gauges, donuts and bars with native Streamlit elements and small Vega-Lite
+# specs, which are a fraction of the websocket payload. Users can switch with
+# the "Lightweight charts" toggle in the sidebar.
+CHART_MODE = os.getenv("CHART_MODE", "plotly").lower()
+
+def use_light_charts():
+    """True when this session renders charts in lightweight mode"""
+    return st.session_state.get("light_charts", CHART_MODE == "light")
+
+def chart_mode_toggle():
+    """Sidebar switch between Plotly and lightweight charts"""
+    st.sidebar.toggle("Lightweight charts", value=use_light_charts(), key="light_charts",
+                      help="Faster on slow connections and low-end laptops")
+
+@traced("render")
+def light_gauge(title, value, max_value=100, suffix="%"):
+    """Gauge as a metric over a progress bar"""
+    st.metric(title, f"{value}{suffix}")
+    st.progress(min(max(value / max_value, 0.0), 1.0) if max_value else 0.0)
+
+@traced("render")
+def light_donut(labels, values, colors, title=None, center_text=None, height=250):
+    """Donut chart as a Vega-Lite arc spec with the data inline"""
+    spec = {
+        "data": {"values": [{"label": label, "value": value} for label, value in zip(labels, values)]},
+        "height": height - 50,
+        "layer": [{
+            "mark": {"type": "arc", "innerRadius": (height - 50) // 4},
+            "encoding": {
+                "theta": {"field": "value", "type": "quantitative", "stack": True},
+                "color": {"field": "label", "type": "nominal", "sort": None, "title": None,
+                          "scale": {"domain": list(labels), "range": list(colors)},
+                          "legend": {"orient": "bottom"}},
+                "tooltip": [{"field": "label"}, {"field": "value"}]
+            }
+        }]
+    }
+    if center_text:
+        spec["layer"].append({"mark": {"type": "text", "fontSize": 18}, "encoding": {"text": {"value": center_text}}})
+    if title:
+        spec["title"] = title
+    st.vega_lite_chart(spec=spec, use_container_width=True)
+
+@traced("render")
+def light_bars(labels, values, colors, texts=None, title=None, x_title=None, x_max=None, height=200):
+    """Horizontal bar chart as a Vega-Lite spec, one color per bar, in the given order"""
+    texts = texts or [str(value) for value in values]
+    x_scale = {"domain": [0, x_max]} if x_max else {}
+    spec = {
+        "data": {"values": [{"label": label, "value": value, "color": color, "text": text}
+                            for label, value, color, text in zip(labels, values, colors, texts)]},
+        "height": height - 60,
+        "encoding": {
+            "y": {"field": "label", "type": "nominal", "sort": None, "title": None},
+            "x": {"field": "value", "type": "quantitative", "title": x_title, "scale": x_scale}
+        },
+        "layer": [
+            {"mark": "bar", "encoding": {"color": {"field": "color", "type": "nominal", "scale": None}}},
+            {"mark": {"type": "text", "align": "left", "dx": 4}, "encoding": {"text": {"field": "text"}}}
+        ]
+    }
+    if title:
+        spec["title"] = title
+    st.vega_lite_chart(spec=spec, use_container_width=True)
+
+@traced("render")
+def light_grouped_bars(labels, series, colors, title=None, x_title=None, height=300):
+    """Horizontal grouped bars as a Vega-Lite spec: one group per label, one bar per series"""
+    spec = {
+        "data": {"values": [{"label": label, "series": name, "value": value}
+                            for name, values in series.items() for label, value in zip(labels, values)]},
+        "height": height - 60,
+        "mark": "bar",
+        "encoding": {
+            "y": {"field": "label", "type": "nominal", "sort": None, "title": None},
+            "yOffset": {"field": "series", "sort": None},
+            "x": {"field": "value", "type": "quantitative", "title": x_title},
+            "color": {"field": "series", "type": "nominal", "sort": None, "title": None,
+                      "scale": {"domain": list(series), "range": colors}},
+            "tooltip": [{"field": "label", "title": "Course"}, {"field": "series", "title": "Speed"},
+                        {"field": "value", "title": x_title}]
+        }
+    }
+    if title:
+        spec["title"] = title
+    st.vega_lite_chart(spec=spec, use_container_width=True)
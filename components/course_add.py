@@ -1,5 +1,9 @@
 import streamlit as st
+import pandas as pd
 from database import add_course
+from instrumentation import traced
+from components.course_handlers import format_speed, duration_at_speeds
+from components.playback import get_playback_speeds
 import datetime
 
 def create_manual_section_form():
@@ -31,7 +35,6 @@ def create_manual_section_form():
                 videos.append({
                     "title": f"Video {j+1}",
                     "duration_minutes": avg_duration,
-                    "duration_2x_minutes": round(avg_duration / 2, 1),
                     "completed": False
                 })
             
@@ -58,7 +61,6 @@ def create_manual_section_form():
                     videos.append({
                         "title": f"Video {j+1}",
                         "duration_minutes": avg_duration,
-                        "duration_2x_minutes": round(avg_duration / 2, 1),
                         "completed": False
                     })
             else:
@@ -75,7 +77,6 @@ def create_manual_section_form():
                     videos.append({
                         "title": video_title,
                         "duration_minutes": duration,
-                        "duration_2x_minutes": round(duration / 2, 1),
                         "completed": False
                     })
             
@@ -104,13 +105,15 @@ def display_course_preview(course_data):
     st.write(f"**Platform:** {course_data.get('platform', 'Unknown Platform').capitalize()}")
     
     # Display course statistics
-    col1, col2, col3 = st.columns(3)
+    speeds = get_playback_speeds()
+    col1, col2, *speed_cols = st.columns(2 + len(speeds))
     with col1:
         st.metric("Total Videos", course_data.get('total_videos', 0))
     with col2:
         st.metric("Total Duration", f"{course_data.get('total_duration_minutes', 0)} min")
-    with col3:
-        st.metric("Duration (2x)", f"{course_data.get('total_duration_2x_minutes', 0)} min")
+    for col, (speed, minutes) in zip(speed_cols, duration_at_speeds(course_data.get('total_duration_minutes', 0), speeds).items()):
+        with col:
+            st.metric(f"Duration ({format_speed(speed)})", f"{minutes} min")
     
     # For many sections, show summary instead of all details
     if len(course_data.get('sections', [])) > 10:
@@ -133,8 +136,7 @@ def display_course_preview(course_data):
                 for j, video in enumerate(section['videos'][:5]):  # Show first 5 videos
                     video_data.append({
                         "Video": f"{j+1}. {video.get('title', 'Unknown Video')}",
-                        "Duration": f"{video.get('duration_minutes', 0)} min",
-                        "2x Duration": f"{video.get('duration_2x_minutes', 0)} min"
+                        "Duration": f"{video.get('duration_minutes', 0)} min"
                     })
                 if video_data:
                     st.table(video_data)
@@ -144,8 +146,7 @@ def display_course_preview(course_data):
                 for j, video in enumerate(section['videos']):
                     video_data.append({
                         "Video": f"{j+1}. {video.get('title', 'Unknown Video')}",
-                        "Duration": f"{video.get('duration_minutes', 0)} min",
-                        "2x Duration": f"{video.get('duration_2x_minutes', 0)} min"
+                        "Duration": f"{video.get('duration_minutes', 0)} min"
                     })
                 if video_data:
                     st.table(video_data)
@@ -155,6 +156,88 @@ def display_course_preview(course_data):
     if len(course_data.get('sections', [])) > 3:
         st.write("... and more sections")
 
+STRUCTURE_COLUMNS = ["Section", "Video Title", "Duration (min)"]
+DEFAULT_VIDEO_DURATION = 10.0
+
+def structure_template(num_sections=1, videos_per_section=1, duration=DEFAULT_VIDEO_DURATION):
+    """Build a structure table with generated section and video names"""
+    rows = []
+    for i in range(int(num_sections)):
+        for j in range(int(videos_per_section)):
+            rows.append({
+                "Section": f"Section {i+1}",
+                "Video Title": f"Video {j+1}",
+                "Duration (min)": float(duration)
+            })
+    return pd.DataFrame(rows, columns=STRUCTURE_COLUMNS)
+
+def parse_pasted_structure(text):
+    """Parse rows pasted from a spreadsheet into a structure table
+
+    Accepts tab- or comma-separated lines of either `section, title, duration`
+    or `title, duration`. A header row is skipped, and rows without a section
+    belong to the section of the row above.
+    """
+    rows = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        delimiter = "\t" if "\t" in line else ","
+        cells = [cell.strip() for cell in line.split(delimiter)]
+        
+        if len(cells) >= 3:
+            section, title, duration = cells[0], cells[1], cells[2]
+        elif len(cells) == 2:
+            section, title, duration = "", cells[0], cells[1]
+        else:
+            section, title, duration = "", cells[0], ""
+        
+        try:
+            duration = float(duration) if duration else DEFAULT_VIDEO_DURATION
+        except ValueError:
+            # Header rows ("Section | Title | Duration") have no numeric duration
+            if not rows:
+                continue
+            duration = DEFAULT_VIDEO_DURATION
+        
+        rows.append({"Section": section, "Video Title": title, "Duration (min)": duration})
+    
+    return pd.DataFrame(rows, columns=STRUCTURE_COLUMNS)
+
+def structure_to_sections(structure):
+    """Group structure table rows into the course sections/videos layout
+
+    Consecutive rows sharing a section name form one section; a blank section
+    name continues the previous section.
+    """
+    sections = []
+    current_title = None
+    
+    for row in structure.itertuples(index=False):
+        section_title, video_title, duration = row
+        section_title = "" if pd.isna(section_title) else str(section_title).strip()
+        video_title = "" if pd.isna(video_title) else str(video_title).strip()
+        duration = DEFAULT_VIDEO_DURATION if pd.isna(duration) else float(duration)
+        
+        if not sections or (section_title and section_title != current_title):
+            current_title = section_title or f"Section {len(sections) + 1}"
+            sections.append({"title": current_title, "videos": []})
+        
+        videos = sections[-1]["videos"]
+        videos.append({
+            "title": video_title or f"Video {len(videos) + 1}",
+            "duration_minutes": duration,
+            "completed": False
+        })
+    
+    return sections
+
+def _reset_structure(structure):
+    """Replace the structure table and remount the editor with the new rows"""
+    st.session_state["course_structure"] = structure
+    st.session_state["course_structure_version"] = st.session_state.get("course_structure_version", 0) + 1
+
+@traced("render")
 def add_course_form():
     """Form for adding a new course manually"""
     st.title("Add New Course")
@@ -172,109 +255,80 @@ def add_course_form():
     
     course_description = st.text_area("Course Description (optional)", height=100, key="course_description")
     
-    # Section configuration
+    # Course structure lives in a single table, so the number of widgets
+    # no longer grows with the number of videos
     st.subheader("Course Structure")
-    num_sections = st.number_input("Number of Sections", min_value=1, value=1, key="num_sections")
     
-    # Container for dynamic section content
-    section_container = st.container()
+    if "course_structure" not in st.session_state:
+        _reset_structure(structure_template())
+    
+    with st.expander("Generate structure"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            num_sections = st.number_input("Number of Sections", min_value=1, value=1, key="template_sections")
+        with col2:
+            videos_per_section = st.number_input("Videos per Section", min_value=1, value=5, key="template_videos")
+        with col3:
+            avg_duration = st.number_input("Video Duration (minutes)", min_value=0.5, value=DEFAULT_VIDEO_DURATION,
+                                           step=0.5, key="template_duration")
+        if st.button("Generate", key="generate_structure_btn"):
+            _reset_structure(structure_template(num_sections, videos_per_section, avg_duration))
+            st.rerun()
+    
+    with st.expander("Paste from spreadsheet"):
+        st.caption("One video per line: Section, Video Title, Duration (min). "
+                   "Columns copied from a spreadsheet are tab-separated and can be pasted as-is.")
+        pasted = st.text_area("Rows", height=150, key="structure_paste")
+        col1, col2 = st.columns(2)
+        with col1:
+            replace_rows = st.button("Replace table", key="paste_replace_btn", use_container_width=True)
+        with col2:
+            append_rows = st.button("Append to table", key="paste_append_btn", use_container_width=True)
+        if (replace_rows or append_rows) and pasted.strip():
+            parsed = parse_pasted_structure(pasted)
+            if parsed.empty:
+                st.error("No rows found in the pasted text")
+            else:
+                if append_rows:
+                    parsed = pd.concat([st.session_state["course_structure"], parsed], ignore_index=True)
+                _reset_structure(parsed)
+                st.rerun()
+    
+    structure = st.data_editor(
+        st.session_state["course_structure"],
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Section": st.column_config.TextColumn("Section", help="Rows with the same section are grouped together"),
+            "Video Title": st.column_config.TextColumn("Video Title"),
+            "Duration (min)": st.column_config.NumberColumn("Duration (min)", min_value=0.0, step=0.5,
+                                                             default=DEFAULT_VIDEO_DURATION)
+        },
+        key=f"course_structure_editor_{st.session_state['course_structure_version']}"
+    )
+    
+    durations = pd.to_numeric(structure["Duration (min)"], errors="coerce").fillna(DEFAULT_VIDEO_DURATION)
+    total_minutes = round(durations.sum(), 1)
+    speed_totals = "".join(f", {minutes} min at {format_speed(speed)}"
+                           for speed, minutes in duration_at_speeds(total_minutes, get_playback_speeds()).items())
+    st.caption(f"{len(structure)} videos, {total_minutes} min total{speed_totals}")
     
     # Submit button at the bottom
     submit_col1, submit_col2 = st.columns([1, 3])
     with submit_col1:
         submit_button = st.button("Save Course", use_container_width=True, key="save_course_btn")
     
-    # Initialize or get sections from session state
-    if "sections_data" not in st.session_state:
-        st.session_state.sections_data = [{
-            "title": f"Section {i+1}",
-            "num_videos": 1,
-            "videos": []
-        } for i in range(int(num_sections))]
-    
-    # Update sections_data if number of sections changes
-    if len(st.session_state.sections_data) != num_sections:
-        # If increasing sections, add new ones
-        if len(st.session_state.sections_data) < num_sections:
-            for i in range(len(st.session_state.sections_data), int(num_sections)):
-                st.session_state.sections_data.append({
-                    "title": f"Section {i+1}",
-                    "num_videos": 1,
-                    "videos": []
-                })
-        # If decreasing sections, remove extra ones
-        else:
-            st.session_state.sections_data = st.session_state.sections_data[:int(num_sections)]
-    
-    # Display each section form
-    with section_container:
-        for i, section_data in enumerate(st.session_state.sections_data):
-            with st.expander(f"Section {i+1}", expanded=(i == 0)):
-                section_title = st.text_input(f"Section Title", 
-                                            value=section_data["title"], 
-                                            key=f"section_title_{i}")
-                st.session_state.sections_data[i]["title"] = section_title
-                
-                num_videos = st.number_input(f"Number of Videos in Section {i+1}", 
-                                          min_value=1, 
-                                          value=section_data.get("num_videos", 1),
-                                          key=f"num_videos_{i}")
-                st.session_state.sections_data[i]["num_videos"] = num_videos
-                
-                # Videos information
-                st.write("Video Information:")
-                
-                # Initialize or update videos list
-                if not section_data.get("videos") or len(section_data["videos"]) != num_videos:
-                    current_videos = section_data.get("videos", [])
-                    # Preserve existing videos data when increasing
-                    if len(current_videos) < num_videos:
-                        for j in range(len(current_videos), int(num_videos)):
-                            current_videos.append({
-                                "title": f"Video {j+1}",
-                                "duration_minutes": 10.0,
-                                "duration_2x_minutes": 5.0,
-                                "completed": False
-                            })
-                    else:
-                        current_videos = current_videos[:int(num_videos)]
-                    st.session_state.sections_data[i]["videos"] = current_videos
-                
-                # Display each video's information
-                for j, video in enumerate(st.session_state.sections_data[i]["videos"]):
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        video_title = st.text_input(f"Video {j+1} Title", 
-                                               value=video.get("title", f"Video {j+1}"),
-                                               key=f"video_title_{i}_{j}")
-                        st.session_state.sections_data[i]["videos"][j]["title"] = video_title
-                    
-                    with col2:
-                        duration = st.number_input(f"Duration (minutes)",
-                                              min_value=0.5, 
-                                              value=video.get("duration_minutes", 10.0),
-                                              step=0.5,
-                                              key=f"duration_{i}_{j}")
-                        st.session_state.sections_data[i]["videos"][j]["duration_minutes"] = duration
-                        st.session_state.sections_data[i]["videos"][j]["duration_2x_minutes"] = round(duration / 2, 1)
-                
-                # Add a separator between videos if there are many
-                if num_videos > 3:
-                    st.markdown("---")
-    
     # Handle form submission
     if submit_button:
         if not course_title:
             st.error("Please enter a course title")
             return
         
-        # Prepare course data
-        sections = []
-        for section_data in st.session_state.sections_data:
-            sections.append({
-                "title": section_data["title"],
-                "videos": section_data["videos"]
-            })
+        sections = structure_to_sections(structure)
+        if not sections:
+            st.error("Please add at least one video to the course structure")
+            return
         
         # Calculate statistics
         total_videos = sum(len(section["videos"]) for section in sections)
@@ -290,10 +344,8 @@ def add_course_form():
             "completed_videos": 0,
             "completion_percentage": 0.0,
             "total_duration_minutes": round(total_duration, 1),
-            "total_duration_2x_minutes": round(total_duration / 2, 1),
             "completed_duration_minutes": 0,
             "remaining_duration_minutes": round(total_duration, 1),
-            "remaining_duration_2x_minutes": round(total_duration / 2, 1),
             "sections_completed": 0,
             "sections_total": len(sections)
         }
@@ -306,7 +358,7 @@ def add_course_form():
             if course_id:
                 st.success("Course added successfully!")
                 # Clear session data
-                st.session_state.pop("sections_data", None)
+                st.session_state.pop("course_structure", None)
                 # Redirect to courses page
                 st.session_state["page"] = "courses"
                 st.rerun()
@@ -316,7 +368,6 @@ def add_course_form():
             st.error("You must be logged in to add courses")
 
     # Option to clear form
-    if "sections_data" in st.session_state:
-        if st.button("Clear Form", key="clear_form_btn"):
-            st.session_state.pop("sections_data", None)
-            st.rerun() 
\ No newline at end of file
+    if st.button("Clear Form", key="clear_form_btn"):
+        _reset_structure(structure_template())
+        st.rerun()
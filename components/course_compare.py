@@ -0,0 +1,100 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from loader import load_course_summaries, load_user_course_titles
+from instrumentation import traced
+from components.charts import use_light_charts, light_grouped_bars
+from components.course_handlers import format_speed
+from components.playback import SPEED_COLORS, get_playback_speeds
+from progress_queue import flush_user_progress
+
+# Chart serialization is timed separately from the render function around it
+plotly_chart = traced("plotly", "plotly_chart")(st.plotly_chart)
+
+MAX_COMPARED_COURSES = 10
+
+@traced("stats")
+def comparison_frame(summaries, speeds):
+    """One row per course with its progress and remaining time at each speed, computed column-wise"""
+    frame = pd.DataFrame(summaries, columns=["_id", "title", "total_videos", "completed_videos",
+                                             "total_duration_minutes", "completed_duration_minutes",
+                                             "sections_completed", "sections_total"])
+    frame["title"] = frame["title"].fillna("Untitled Course")
+    frame = frame.fillna(0)
+
+    total_videos = frame["total_videos"].where(frame["total_videos"] > 0)
+    frame["completion_percentage"] = (frame["completed_videos"] / total_videos * 100).fillna(0).round(1)
+    frame["videos_left"] = frame["total_videos"] - frame["completed_videos"]
+    remaining = (frame["total_duration_minutes"] - frame["completed_duration_minutes"]).clip(lower=0)
+    frame["remaining_duration_minutes"] = remaining.round(1)
+    # Where each course sits among the compared ones
+    total_remaining = remaining.sum()
+    frame["share_of_remaining"] = (remaining / total_remaining * 100 if total_remaining else remaining * 0).round(1)
+    for speed in speeds:
+        frame[f"remaining_at_{format_speed(speed)}"] = (remaining / speed).round(1)
+    return frame
+
+@traced("render")
+def display_comparison_chart(frame, speeds):
+    """Remaining time of every compared course at each speed, as one grouped bar chart"""
+    labels = [f"{title} ({percentage:g}%)" for title, percentage in zip(frame["title"], frame["completion_percentage"])]
+    series = {"Regular Speed": frame["remaining_duration_minutes"].tolist()}
+    for speed in speeds:
+        series[f"{format_speed(speed)} Speed"] = frame[f"remaining_at_{format_speed(speed)}"].tolist()
+    colors = [SPEED_COLORS[i % len(SPEED_COLORS)] for i in range(len(series))]
+    height = max(300, 40 * len(labels) * len(series) // 2)
+
+    if use_light_charts():
+        light_grouped_bars(labels, series, colors, title='Time Remaining', x_title='Minutes', height=height)
+        return
+
+    fig = go.Figure()
+    for (name, values), color in zip(series.items(), colors):
+        fig.add_trace(go.Bar(y=labels, x=values, name=name, orientation='h', marker_color=color,
+                             text=[f"{value:g} min" for value in values], textposition='auto'))
+    fig.update_layout(
+        title='Time Remaining',
+        barmode='group',
+        xaxis=dict(title='Minutes'),
+        yaxis=dict(autorange='reversed'),
+        height=height,
+        margin=dict(l=20, r=20, t=50, b=20),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    plotly_chart(fig, use_container_width=True)
+
+@traced("render")
+def course_comparison(user):
+    """Compare progress and remaining time of several courses side by side"""
+    # Save buffered progress first so the stored statistics include it
+    flush_user_progress(user['id'])
+
+    courses = load_user_course_titles(user['id'])
+    if len(courses) < 2:
+        st.info("Add at least two courses to compare them.")
+        return
+
+    titles = {str(course['_id']): course.get('title', 'Untitled Course') for course in courses}
+    selected = st.multiselect(
+        "Courses to compare", list(titles), default=list(titles)[:3], format_func=titles.get,
+        max_selections=MAX_COMPARED_COURSES, key="compare_courses",
+        help=f"Pick 2 to {MAX_COMPARED_COURSES} courses"
+    )
+    if len(selected) < 2:
+        st.info("Pick at least two courses to compare.")
+        return
+
+    # Only the statistics are fetched, for all selected courses in one query
+    summaries = [summary for summary in load_course_summaries(selected) if summary]
+    speeds = get_playback_speeds()
+    frame = comparison_frame(summaries, speeds)
+
+    display_comparison_chart(frame, speeds)
+
+    table = frame.set_index("title")[["completion_percentage", "completed_videos", "total_videos",
+                                      "sections_completed", "sections_total", "remaining_duration_minutes",
+                                      *[f"remaining_at_{format_speed(speed)}" for speed in speeds],
+                                      "share_of_remaining"]]
+    table.columns = ["Completion %", "Videos Done", "Videos", "Sections Done", "Sections", "Remaining (min)",
+                     *[f"At {format_speed(speed)} (min)" for speed in speeds], "Share of Remaining %"]
+    st.dataframe(table, use_container_width=True)
@@ -1,11 +1,30 @@
 import logging
+from instrumentation import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def calculate_course_statistics(course_data):
-    """Calculate various statistics for a course"""
+# Speeds users can pick in the sidebar, and the ones shown until they do
+PLAYBACK_SPEED_OPTIONS = [1.25, 1.5, 1.75, 2.0, 2.5, 3.0]
+DEFAULT_PLAYBACK_SPEEDS = [1.5, 2.0]
+
+def format_speed(speed):
+    """Speed label, e.g. 1.5 -> 1.5x and 2.0 -> 2x"""
+    return f"{speed:g}x"
+
+def duration_at_speeds(minutes, speeds):
+    """{speed: minutes} of a duration watched at each playback speed"""
+    minutes = max(minutes or 0, 0)
+    return {speed: round(minutes / speed, 1) for speed in speeds}
+
+@traced("stats")
+def calculate_course_statistics(course_data, speeds=None):
+    """Calculate various statistics for a course
+
+    With `speeds`, also the remaining time at each playback speed
+    (`remaining_duration_by_speed`), which is derived for display and not stored.
+    """
     if not course_data or 'sections' not in course_data:
         return {}
     
@@ -27,23 +46,25 @@ def calculate_course_statistics(course_data):
     # Calculate statistics
     completion_percentage = (completed_videos / total_videos * 100) if total_videos > 0 else 0
     remaining_duration = total_duration_minutes - completed_duration_minutes
-    remaining_duration_2x = remaining_duration / 2 if remaining_duration > 0 else 0
     sections_completed = sum(1 for section in course_data['sections'] 
                             if all(video.get('completed', False) for video in section['videos']))
     sections_total = len(course_data['sections'])
     
-    return {
+    stats = {
         "total_videos": total_videos,
         "completed_videos": completed_videos,
         "completion_percentage": round(completion_percentage, 1),
         "total_duration_minutes": round(total_duration_minutes, 1),
         "completed_duration_minutes": round(completed_duration_minutes, 1),
         "remaining_duration_minutes": round(remaining_duration, 1),
-        "remaining_duration_2x_minutes": round(remaining_duration_2x, 1),
         "sections_completed": sections_completed,
         "sections_total": sections_total
     }
+    if speeds is not None:
+        stats["remaining_duration_by_speed"] = duration_at_speeds(stats["remaining_duration_minutes"], speeds)
+    return stats
 
+@traced("stats")
 def update_course_statistics(course_data):
     """Update the course statistics in the course data object"""
     if not course_data or 'sections' not in course_data:
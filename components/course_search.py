@@ -0,0 +1,57 @@
+import time
+import streamlit as st
+from search_index import search_courses
+from instrumentation import traced
+
+KIND_ICONS = {
+    "course": "📚",
+    "description": "📝",
+    "section": "📂",
+    "video": "🎬"
+}
+
+def open_search_result(result):
+    """Open the course of a search result, focused on the matching section"""
+    st.session_state["page"] = "courses"
+    st.session_state["selected_course"] = result["course_id"]
+    if result["section_index"] is not None:
+        st.session_state["focus_section"] = {
+            "course_id": result["course_id"],
+            "section_index": result["section_index"],
+            "video_index": result["video_index"]
+        }
+    else:
+        st.session_state.pop("focus_section", None)
+
+@traced("render")
+def course_search(user_id):
+    """Search box over course, section and video titles with ranked results"""
+    query = st.text_input("Search courses and videos", key="course_search_query",
+                          placeholder="e.g. decorators")
+    if not query.strip():
+        return
+
+    start = time.perf_counter()
+    results = search_courses(user_id, query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    st.caption(f"{len(results)} results in {elapsed_ms:.1f} ms")
+    if not results:
+        st.info("No matching courses, sections or videos.")
+        return
+
+    for i, result in enumerate(results):
+        col1, col2 = st.columns([9, 1])
+        with col1:
+            path = [result["course_title"]]
+            if result["section_title"] is not None:
+                path.append(result["section_title"])
+            if result["kind"] == "video":
+                path.append(result["text"])
+            elif result["kind"] == "description":
+                path.append("Description")
+            st.markdown(f"{KIND_ICONS[result['kind']]} " + " › ".join(path))
+        with col2:
+            if st.button("Open", key=f"search_open_{i}", use_container_width=True):
+                open_search_result(result)
+                st.rerun()
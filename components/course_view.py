@@ -1,10 +1,18 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from database import get_course_by_id, update_video_status, update_course
-from components.course_handlers import calculate_course_statistics, update_course_statistics
+from loader import load_course
+from components.course_handlers import calculate_course_statistics, format_speed, duration_at_speeds
 import json
+from instrumentation import traced
+from components.charts import use_light_charts, light_gauge, light_donut, light_bars
+from components.playback import get_playback_speeds, remaining_time_bars
+from progress_queue import queue_video_status, set_progress, apply_pending_progress, progress_durability
 
+# Chart serialization is timed separately from the render function around it
+plotly_chart = traced("plotly", "plotly_chart")(st.plotly_chart)
+
+@traced("render")
 def display_course_header(course):
     """Display course title and platform badge"""
     # Get platform info for styling
@@ -49,6 +57,7 @@ def display_course_header(course):
     if 'url' in course and course['url'] and not course.get('url_generated', False):
         st.markdown(f"[View Original Course]({course['url']})")
 
+@traced("render")
 def display_course_progress(course):
     """Display course progress metrics and visualizations"""
     # Calculate relevant statistics
@@ -58,7 +67,8 @@ def display_course_progress(course):
     total_sections = course.get('sections_total', 0)
     completed_sections = course.get('sections_completed', 0)
     remaining_duration = course.get('remaining_duration_minutes', 0)
-    remaining_duration_2x = course.get('remaining_duration_2x_minutes', 0)
+    speeds = get_playback_speeds()
+    remaining_by_speed = duration_at_speeds(remaining_duration, speeds)
     total_duration = course.get('total_duration_minutes', 0)
     
     # Create a container for the progress section
@@ -70,51 +80,58 @@ def display_course_progress(course):
         
         with col1:
             # Create gauge chart for completion percentage
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=completion,
-                title={'text': "Completion", 'font': {'size': 20}},
-                gauge={
-                    'axis': {'range': [0, 100], 'tickwidth': 1},
-                    'bar': {'color': "#4CAF50"},
-                    'steps': [
-                        {'range': [0, 33], 'color': "rgba(244, 67, 54, 0.2)"},
-                        {'range': [33, 66], 'color': "rgba(255, 193, 7, 0.2)"},
-                        {'range': [66, 100], 'color': "rgba(76, 175, 80, 0.2)"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': completion
-                    }
-                },
-                number={'suffix': "%", 'font': {'size': 26}}
-            ))
-            fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
-            st.plotly_chart(fig, use_container_width=True)
+            if use_light_charts():
+                light_gauge("Completion", completion)
+            else:
+                fig = go.Figure(go.Indicator(
+                    mode="gauge+number",
+                    value=completion,
+                    title={'text': "Completion", 'font': {'size': 20}},
+                    gauge={
+                        'axis': {'range': [0, 100], 'tickwidth': 1},
+                        'bar': {'color': "#4CAF50"},
+                        'steps': [
+                            {'range': [0, 33], 'color': "rgba(244, 67, 54, 0.2)"},
+                            {'range': [33, 66], 'color': "rgba(255, 193, 7, 0.2)"},
+                            {'range': [66, 100], 'color': "rgba(76, 175, 80, 0.2)"}
+                        ],
+                        'threshold': {
+                            'line': {'color': "red", 'width': 4},
+                            'thickness': 0.75,
+                            'value': completion
+                        }
+                    },
+                    number={'suffix': "%", 'font': {'size': 26}}
+                ))
+                fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
+                plotly_chart(fig, use_container_width=True)
         
         with col2:
-            # Create pie chart showing completed vs remaining
-            labels = ['Completed', 'Remaining']
-            values = [completed_videos, total_videos - completed_videos]
-            colors = ['#4CAF50', '#ECEFF1']
+            if use_light_charts():
+                light_donut(['Completed', 'Remaining'], [completed_videos, total_videos - completed_videos],
+                            ['#4CAF50', '#ECEFF1'], center_text=f"{completed_videos}/{total_videos}")
+            else:
+                # Create pie chart showing completed vs remaining
+                labels = ['Completed', 'Remaining']
+                values = [completed_videos, total_videos - completed_videos]
+                colors = ['#4CAF50', '#ECEFF1']
             
-            fig = px.pie(
-                values=values, 
-                names=labels, 
-                hole=0.6,
-                color_discrete_sequence=colors
-            )
-            fig.update_layout(
-                annotations=[dict(text=f"{completed_videos}/{total_videos}", x=0.5, y=0.5, font_size=20, showarrow=False)],
-                showlegend=True,
-                height=250,
-                margin=dict(l=20, r=20, t=30, b=20)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                fig = px.pie(
+                    values=values, 
+                    names=labels, 
+                    hole=0.6,
+                    color_discrete_sequence=colors
+                )
+                fig.update_layout(
+                    annotations=[dict(text=f"{completed_videos}/{total_videos}", x=0.5, y=0.5, font_size=20, showarrow=False)],
+                    showlegend=True,
+                    height=250,
+                    margin=dict(l=20, r=20, t=30, b=20)
+                )
+                plotly_chart(fig, use_container_width=True)
         
-        # Additional progress metrics
-        col1, col2, col3, col4 = st.columns(4)
+        # Additional progress metrics, with the remaining time at each playback speed
+        col1, col2, col3, *speed_cols = st.columns(3 + len(speeds))
         
         with col1:
             st.metric("Videos", f"{completed_videos}/{total_videos}")
@@ -125,12 +142,42 @@ def display_course_progress(course):
         with col3:
             st.metric("Time Remaining", f"{round(remaining_duration, 1)} min")
         
-        with col4:
-            st.metric("Time Remaining (2x)", f"{round(remaining_duration_2x, 1)} min")
+        for col, (speed, minutes) in zip(speed_cols, remaining_by_speed.items()):
+            with col:
+                st.metric(f"Time Remaining ({format_speed(speed)})", f"{minutes} min")
             
         # Total duration
         st.metric("Total Duration", f"{round(total_duration, 1)} min")
 
+def display_progress_durability(course_id):
+    """Show whether the latest progress changes are saved yet"""
+    state, detail = progress_durability(course_id)
+    if state == "pending":
+        st.caption(f"⏳ Saving {detail} progress change{'s' if detail != 1 else ''}...")
+    elif state == "failed":
+        st.caption(f"⚠️ {detail} progress change{'s' if detail != 1 else ''} not saved yet, retrying")
+    elif detail:
+        st.caption(f"✅ Progress saved at {detail.strftime('%H:%M:%S')}")
+
+def _video_key(section_index, video_index, course_id):
+    return f"video_{section_index}_{video_index}_{course_id}"
+
+def _set_progress(course, course_id, completed, section_index=None, video_count=None):
+    """Bulk progress callback: one write, then let the affected checkboxes redraw from the course"""
+    set_progress(st.session_state["user"]["id"], course, completed, section_index, video_count)
+    for index, section in enumerate(course['sections']):
+        if section_index is None or index == section_index:
+            for video_index in range(len(section.get('videos', []))):
+                st.session_state.pop(_video_key(index, video_index, course_id), None)
+
+def _complete_up_to(course, course_id, section_index):
+    key = f"complete_up_to_{section_index}_{course_id}"
+    video_index = st.session_state[key]
+    if video_index is not None:
+        _set_progress(course, course_id, True, section_index, video_index + 1)
+        st.session_state[key] = None
+
+@traced("render")
 def display_course_content(course, course_id):
     """Display course content with checkboxes for tracking video progress"""
     if not course.get('sections'):
@@ -164,67 +211,99 @@ def display_course_content(course, course_id):
     </style>
     """, unsafe_allow_html=True)
     
-    # Keep track if any updates were made
-    update_made = False
-    
-    # Function to update video status
-    def update_video_status(section_index, video_index, status):
-        """Update video completion status in database"""
-        # Make a deep copy of the course data to avoid session state issues
-        updated_course = dict(course)
-        # Update the video status
-        updated_course['sections'][section_index]['videos'][video_index]['completed'] = status
-        # Update statistics
-        updated_course = update_course_statistics(updated_course)
-        # Save to database
-        update_course(course_id, updated_course)
-        # Mark that we need to update the display
-        nonlocal update_made
-        update_made = True
-        return updated_course
-    
-    # Display each section and its videos
-    for section_index, section in enumerate(course.get('sections', [])):
-        st.markdown(f"""
-        <div class="section-header">
-            {section.get('title', f'Section {section_index + 1}')}
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Display videos in this section
-        for video_index, video in enumerate(section.get('videos', [])):
-            video_title = video.get('title', f'Video {video_index + 1}')
-            duration = video.get('duration_minutes', 0)
-            is_completed = video.get('completed', False)
-            
-            # Create unique key for checkbox
-            key = f"video_{section_index}_{video_index}_{course_id}"
-            
-            col1, col2 = st.columns([9, 1])
-            
-            with col1:
-                st.markdown(f"""
-                <div class="video-item">
-                    {video_title}
-                    <span class="video-duration"> - {duration} min</span>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                # Checkbox to mark video as completed/not completed - Fix empty label issue
-                if st.checkbox("Completed", value=is_completed, key=key, label_visibility="collapsed"):
-                    if not is_completed:
-                        # Update status to completed
-                        course = update_video_status(section_index, video_index, True)
-                else:
-                    if is_completed:
-                        # Update status to not completed
-                        course = update_video_status(section_index, video_index, False)
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        display_progress_durability(course_id)
+    with col2:
+        with st.popover("Reset course", use_container_width=True):
+            st.write("Untick every video of this course?")
+            st.button("Reset", key=f"reset_course_{course_id}", type="primary",
+                      on_click=_set_progress, args=(course, course_id, False))
+    
+    # Link to the section a search result pointed at
+    focus = st.session_state.get("focus_section")
+    focus_index = None
+    if focus and focus["course_id"] == course_id and focus["section_index"] < len(course['sections']):
+        focus_index = focus["section_index"]
+        focus_section = course['sections'][focus_index]
+        message = f"Search result: [{focus_section.get('title', f'Section {focus_index + 1}')}](#section-{focus_index})"
+        if focus["video_index"] is not None and focus["video_index"] < len(focus_section.get('videos', [])):
+            message += f" › {focus_section['videos'][focus['video_index']].get('title', '')}"
+        st.info(message)
+    
+    # Each section is a fragment: ticking a video reruns only that section
+    for section_index in range(len(course['sections'])):
+        section_checklist(course, course_id, section_index, section_index == focus_index)
+
+@st.fragment
+@traced("render")
+def section_checklist(course, course_id, section_index, highlight=False):
+    """One section's header, progress bar and video checkboxes, rerun on its own when a box is ticked"""
+    section = course['sections'][section_index]
+    videos = section.get('videos', [])
+    
+    # Widget state already holds this run's clicks, so the counters can be drawn above the boxes
+    keys = [_video_key(section_index, video_index, course_id) for video_index in range(len(videos))]
+    states = [st.session_state.get(key, video.get('completed', False)) for key, video in zip(keys, videos)]
+    
+    # Queue changed videos and keep the course object (reused by fragment reruns) in step
+    changed = False
+    for video_index, (video, completed) in enumerate(zip(videos, states)):
+        if completed != video.get('completed', False):
+            video['completed'] = completed
+            queue_video_status(st.session_state["user"]["id"], course_id, section_index, video_index, completed)
+            changed = True
     
-    # If any video status was updated, get the latest data and rerun to refresh the UI
-    if update_made:
-        st.rerun()
+    highlight_style = ' style="outline: 2px solid #00BCD4;"' if highlight else ""
+    st.markdown(f"""
+    <div class="section-header" id="section-{section_index}"{highlight_style}>
+        {section.get('title', f'Section {section_index + 1}')}
+    </div>
+    """, unsafe_allow_html=True)
+    
+    completed_count = sum(states)
+    st.progress(completed_count / len(videos) if videos else 0.0,
+                text=f"{completed_count}/{len(videos)} videos completed")
+    if changed:
+        display_progress_durability(course_id)
+    
+    # Whole-section changes are written in one update instead of one per checkbox
+    col1, col2, col3 = st.columns([2, 2, 3])
+    with col1:
+        st.button("Complete section", key=f"complete_section_{section_index}_{course_id}",
+                  on_click=_set_progress, args=(course, course_id, True, section_index),
+                  disabled=completed_count == len(videos), use_container_width=True)
+    with col2:
+        st.button("Reset section", key=f"reset_section_{section_index}_{course_id}",
+                  on_click=_set_progress, args=(course, course_id, False, section_index),
+                  disabled=completed_count == 0, use_container_width=True)
+    with col3:
+        st.selectbox("Complete up to", range(len(videos)), index=None, placeholder="Complete up to...",
+                     format_func=lambda video_index: videos[video_index].get('title', f'Video {video_index + 1}'),
+                     key=f"complete_up_to_{section_index}_{course_id}", label_visibility="collapsed",
+                     on_change=_complete_up_to, args=(course, course_id, section_index))
+    
+    # Display videos in this section
+    for video_index, video in enumerate(videos):
+        video_title = video.get('title', f'Video {video_index + 1}')
+        duration = video.get('duration_minutes', 0)
+        
+        col1, col2 = st.columns([9, 1])
+        
+        with col1:
+            st.markdown(f"""
+            <div class="video-item">
+                {video_title}
+                <span class="video-duration"> - {duration} min</span>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            # Checkbox to mark video as completed/not completed
+            st.checkbox("Completed", value=video.get('completed', False), key=keys[video_index],
+                        label_visibility="collapsed")
 
+@traced("render")
 def display_course_info_tab(course, course_id):
     """Display course description and content"""
     # Display description if available
@@ -235,12 +314,13 @@ def display_course_info_tab(course, course_id):
     # Display course content for tracking progress
     display_course_content(course, course_id)
 
+@traced("render")
 def display_statistics_tab(course):
     """Display statistics tab with completion rates"""
     st.header("Course Statistics")
     
     # Get statistics
-    stats = calculate_course_statistics(course)
+    stats = calculate_course_statistics(course, get_playback_speeds())
     
     # Display course completion
     st.subheader("Course Completion")
@@ -250,44 +330,51 @@ def display_statistics_tab(course):
     
     # Completion percentage (gauge chart)
     with col1:
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=stats['completion_percentage'],
-            title={'text': "Overall Completion"},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': "#4CAF50"},
-                'steps': [
-                    {'range': [0, 33], 'color': "#EF5350"},
-                    {'range': [33, 66], 'color': "#FFCA28"},
-                    {'range': [66, 100], 'color': "#66BB6A"}
-                ],
-                'threshold': {
-                    'line': {'color': "black", 'width': 2},
-                    'thickness': 0.75,
-                    'value': stats['completion_percentage']
+        if use_light_charts():
+            light_gauge("Overall Completion", stats['completion_percentage'])
+        else:
+            fig = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=stats['completion_percentage'],
+                title={'text': "Overall Completion"},
+                gauge={
+                    'axis': {'range': [0, 100]},
+                    'bar': {'color': "#4CAF50"},
+                    'steps': [
+                        {'range': [0, 33], 'color': "#EF5350"},
+                        {'range': [33, 66], 'color': "#FFCA28"},
+                        {'range': [66, 100], 'color': "#66BB6A"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "black", 'width': 2},
+                        'thickness': 0.75,
+                        'value': stats['completion_percentage']
+                    }
                 }
-            }
-        ))
-        fig.update_layout(height=300, margin=dict(l=20, r=20, t=50, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+            ))
+            fig.update_layout(height=300, margin=dict(l=20, r=20, t=50, b=20))
+            plotly_chart(fig, use_container_width=True)
     
     # Video completion breakdown (pie chart)
     with col2:
-        fig = go.Figure(data=[go.Pie(
-            labels=['Completed', 'Remaining'],
-            values=[stats['completed_videos'], stats['total_videos'] - stats['completed_videos']],
-            hole=.4,
-            marker_colors=['#4CAF50', '#E0E0E0']
-        )])
-        fig.update_layout(
-            title_text="Video Completion",
-            height=300,
-            margin=dict(l=20, r=20, t=50, b=20),
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        if use_light_charts():
+            light_donut(['Completed', 'Remaining'], [stats['completed_videos'], stats['total_videos'] - stats['completed_videos']],
+                        ['#4CAF50', '#E0E0E0'], title="Video Completion", height=300)
+        else:
+            fig = go.Figure(data=[go.Pie(
+                labels=['Completed', 'Remaining'],
+                values=[stats['completed_videos'], stats['total_videos'] - stats['completed_videos']],
+                hole=.4,
+                marker_colors=['#4CAF50', '#E0E0E0']
+            )])
+            fig.update_layout(
+                title_text="Video Completion",
+                height=300,
+                margin=dict(l=20, r=20, t=50, b=20),
+                showlegend=True,
+                legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+            )
+            plotly_chart(fig, use_container_width=True)
     
     # Time statistics
     st.subheader("Time Statistics")
@@ -296,53 +383,60 @@ def display_statistics_tab(course):
     
     # Time completion chart
     with col1:
-        labels = ['Watched', 'Remaining']
-        values = [stats['completed_duration_minutes'], stats['remaining_duration_minutes']]
+        if use_light_charts():
+            light_donut(['Watched', 'Remaining'], [stats['completed_duration_minutes'], stats['remaining_duration_minutes']],
+                        ['#2196F3', '#E0E0E0'], title="Time Spent vs Remaining", height=300)
+        else:
+            labels = ['Watched', 'Remaining']
+            values = [stats['completed_duration_minutes'], stats['remaining_duration_minutes']]
         
-        fig = go.Figure(data=[go.Pie(
-            labels=labels,
-            values=values,
-            hole=.4,
-            marker_colors=['#2196F3', '#E0E0E0']
-        )])
-        fig.update_layout(
-            title_text="Time Spent vs Remaining",
-            height=300,
-            margin=dict(l=20, r=20, t=50, b=20),
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            fig = go.Figure(data=[go.Pie(
+                labels=labels,
+                values=values,
+                hole=.4,
+                marker_colors=['#2196F3', '#E0E0E0']
+            )])
+            fig.update_layout(
+                title_text="Time Spent vs Remaining",
+                height=300,
+                margin=dict(l=20, r=20, t=50, b=20),
+                showlegend=True,
+                legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+            )
+            plotly_chart(fig, use_container_width=True)
     
     # Remaining time visualization
     with col2:
-        remaining_regular = stats['remaining_duration_minutes']
-        remaining_speed_2x = stats['remaining_duration_2x_minutes']
-        
-        fig = go.Figure()
+        speeds = list(stats['remaining_duration_by_speed'])
+        labels, values, colors, texts = remaining_time_bars(stats['remaining_duration_minutes'], speeds)
         
-        fig.add_trace(go.Bar(
-            y=['Regular Speed', '2x Speed'],
-            x=[remaining_regular, remaining_speed_2x],
-            orientation='h',
-            marker=dict(
-                color=['#FF9800', '#2196F3'],
-                line=dict(color='rgba(0, 0, 0, 0)', width=1)
-            ),
-            text=[f"{round(remaining_regular, 1)} min", f"{round(remaining_speed_2x, 1)} min"],
-            textposition='inside',
-            name='Time'
-        ))
+        if use_light_charts():
+            light_bars(labels, values, colors, texts=texts, title='Time to Complete', x_title='Minutes', height=300)
+        else:
+            fig = go.Figure()
+            
+            fig.add_trace(go.Bar(
+                y=labels,
+                x=values,
+                orientation='h',
+                marker=dict(
+                    color=colors,
+                    line=dict(color='rgba(0, 0, 0, 0)', width=1)
+                ),
+                text=texts,
+                textposition='inside',
+                name='Time'
+            ))
         
-        fig.update_layout(
-            title='Time to Complete',
-            xaxis=dict(title='Minutes'),
-            height=300,
-            margin=dict(l=20, r=20, t=50, b=20),
-            showlegend=False
-        )
+            fig.update_layout(
+                title='Time to Complete',
+                xaxis=dict(title='Minutes'),
+                height=300,
+                margin=dict(l=20, r=20, t=50, b=20),
+                showlegend=False
+            )
         
-        st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
     
     # Section completion statistics
     if 'sections' in course and course['sections']:
@@ -374,32 +468,40 @@ def display_statistics_tab(course):
         section_percentages.reverse()
         
         # Create the section completion bar chart
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=section_percentages,
-            y=section_names,
-            orientation='h',
-            marker_color=['#4CAF50' if p >= 75 else '#FF9800' if p >= 25 else '#F44336' for p in section_percentages],
-            text=[f"{p}%" for p in section_percentages],
-            textposition='auto',
-        ))
+        if use_light_charts():
+            # Lists were reversed for Plotly's bottom-up axis; Vega-Lite keeps the given order
+            light_bars(section_names[::-1], section_percentages[::-1],
+                       ['#4CAF50' if p >= 75 else '#FF9800' if p >= 25 else '#F44336' for p in section_percentages[::-1]],
+                       texts=[f"{p}%" for p in section_percentages[::-1]], title='Section Completion Percentage',
+                       x_title='Completion Percentage', x_max=100, height=max(200, 25 * len(section_names)))
+        else:
+            fig = go.Figure()
+            fig.add_trace(go.Bar(
+                x=section_percentages,
+                y=section_names,
+                orientation='h',
+                marker_color=['#4CAF50' if p >= 75 else '#FF9800' if p >= 25 else '#F44336' for p in section_percentages],
+                text=[f"{p}%" for p in section_percentages],
+                textposition='auto',
+            ))
         
-        fig.update_layout(
-            title='Section Completion Percentage',
-            xaxis=dict(title='Completion Percentage', range=[0, 100]),
-            yaxis=dict(title='Section'),
-            height=max(400, 50 * len(section_names)),
-            margin=dict(l=20, r=20, t=50, b=20),
-        )
+            fig.update_layout(
+                title='Section Completion Percentage',
+                xaxis=dict(title='Completion Percentage', range=[0, 100]),
+                yaxis=dict(title='Section'),
+                height=max(400, 50 * len(section_names)),
+                margin=dict(l=20, r=20, t=50, b=20),
+            )
         
-        st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
     else:
         st.info("No section data available for this course.")
 
+@traced("render")
 def course_view(course_id):
     """Display a course view with tabs for course info and statistics"""
     # Get course data from database
-    course = get_course_by_id(course_id)
+    course = apply_pending_progress(load_course(course_id))
     
     if not course:
         st.error("Course not found!")
@@ -424,6 +526,7 @@ def course_view(course_id):
     with tab2:
         display_statistics_tab(course)
 
+@traced("render")
 def course_list_view(courses):
     """Display a list of courses sorted by completion percentage"""
     if not courses:
@@ -502,7 +605,9 @@ def course_list_view(courses):
                 with col1:
                     st.write(f"Remaining: {round(course.get('remaining_duration_minutes', 0), 1)} min")
                 with col2:
-                    st.write(f"At 2x: {round(course.get('remaining_duration_2x_minutes', 0), 1)} min")
+                    for speed, minutes in duration_at_speeds(course.get('remaining_duration_minutes', 0),
+                                                             get_playback_speeds()).items():
+                        st.write(f"At {format_speed(speed)}: {minutes} min")
                 
                 # Total time
                 st.write(f"Total Time: {round(course.get('total_duration_minutes', 0), 1)} min")
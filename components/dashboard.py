@@ -1,25 +1,36 @@
+import time
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from database import get_user_courses, delete_course
+from database import delete_course, restore_course, COURSE_UNDO_SECONDS
+from loader import load_user_course_summaries, load_user_stats
+from instrumentation import traced
+from components.charts import use_light_charts, light_gauge, light_donut, light_bars
+from components.course_handlers import format_speed, duration_at_speeds
+from components.playback import get_playback_speeds, remaining_time_bars
+from progress_queue import flush_user_progress
+
+# Chart serialization is timed separately from the render function around it
+plotly_chart = traced("plotly", "plotly_chart")(st.plotly_chart)
 
 def display_user_welcome(user):
     """Display welcome message for the user"""
     # Removed the welcome message as requested
     pass
 
-def display_overall_stats(courses):
-    """Display overall statistics for all courses"""
-    if not courses:
+@traced("render")
+def display_overall_stats(stats):
+    """Display overall statistics from the user's precomputed summary"""
+    if not stats or not stats.get('courses'):
         return
     
     # Collect statistics
-    total_courses = len(courses)
-    total_videos = sum(course.get('total_videos', 0) for course in courses)
-    completed_videos = sum(course.get('completed_videos', 0) for course in courses)
-    total_duration = sum(course.get('total_duration_minutes', 0) for course in courses)
-    completed_duration = sum(course.get('completed_duration_minutes', 0) for course in courses if 'completed_duration_minutes' in course)
+    total_courses = stats['courses']
+    total_videos = stats.get('total_videos', 0)
+    completed_videos = stats.get('completed_videos', 0)
+    total_duration = stats.get('total_duration_minutes', 0)
+    completed_duration = stats.get('completed_duration_minutes', 0)
     
     # Calculate overall completion percentage
     overall_completion = 0
@@ -55,27 +66,30 @@ def display_overall_stats(courses):
     
     # Courses count and completion gauge
     with col1:
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=overall_completion,
-            title={'text': "Overall Completion"},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': "#4CAF50"},
-                'steps': [
-                    {'range': [0, 33], 'color': "#EF5350"},
-                    {'range': [33, 66], 'color': "#FFCA28"},
-                    {'range': [66, 100], 'color': "#66BB6A"}
-                ],
-                'threshold': {
-                    'line': {'color': "black", 'width': 2},
-                    'thickness': 0.75,
-                    'value': overall_completion
+        if use_light_charts():
+            light_gauge("Overall Completion", overall_completion)
+        else:
+            fig = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=overall_completion,
+                title={'text': "Overall Completion"},
+                gauge={
+                    'axis': {'range': [0, 100]},
+                    'bar': {'color': "#4CAF50"},
+                    'steps': [
+                        {'range': [0, 33], 'color': "#EF5350"},
+                        {'range': [33, 66], 'color': "#FFCA28"},
+                        {'range': [66, 100], 'color': "#66BB6A"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "black", 'width': 2},
+                        'thickness': 0.75,
+                        'value': overall_completion
+                    }
                 }
-            }
-        ))
-        fig.update_layout(height=200, margin=dict(l=20, r=20, t=30, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+            ))
+            fig.update_layout(height=200, margin=dict(l=20, r=20, t=30, b=20))
+            plotly_chart(fig, use_container_width=True)
         
         st.markdown(f"""
         <div class="stats-card">
@@ -87,57 +101,93 @@ def display_overall_stats(courses):
     # Videos progress
     with col2:
         # Videos completion chart
-        fig = go.Figure(go.Indicator(
-            mode="number+gauge",
-            value=completed_videos,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Videos Completed"},
-            gauge={
-                'axis': {'range': [0, total_videos], 'tickwidth': 1},
-                'bar': {'color': "#4CAF50"},
-                'bgcolor': "lightgray",
-                'borderwidth': 2,
-                'steps': [
-                    {'range': [0, total_videos/2], 'color': 'rgba(76, 175, 80, 0.3)'},
-                    {'range': [total_videos/2, total_videos], 'color': 'rgba(76, 175, 80, 0.6)'}
-                ],
-            },
-            number={'suffix': f"/{total_videos}"}
-        ))
-        fig.update_layout(height=200, margin=dict(l=20, r=20, t=30, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        if use_light_charts():
+            light_gauge("Videos Completed", completed_videos, max_value=total_videos, suffix=f"/{total_videos}")
+        else:
+            fig = go.Figure(go.Indicator(
+                mode="number+gauge",
+                value=completed_videos,
+                domain={'x': [0, 1], 'y': [0, 1]},
+                title={'text': "Videos Completed"},
+                gauge={
+                    'axis': {'range': [0, total_videos], 'tickwidth': 1},
+                    'bar': {'color': "#4CAF50"},
+                    'bgcolor': "lightgray",
+                    'borderwidth': 2,
+                    'steps': [
+                        {'range': [0, total_videos/2], 'color': 'rgba(76, 175, 80, 0.3)'},
+                        {'range': [total_videos/2, total_videos], 'color': 'rgba(76, 175, 80, 0.6)'}
+                    ],
+                },
+                number={'suffix': f"/{total_videos}"}
+            ))
+            fig.update_layout(height=200, margin=dict(l=20, r=20, t=30, b=20))
+            plotly_chart(fig, use_container_width=True)
     
     # Time remaining stats
     with col3:
         remaining_duration = total_duration - completed_duration
-        remaining_duration_2x = remaining_duration / 2
+        labels, values, colors, texts = remaining_time_bars(remaining_duration)
         
         # Create a visual representation of time remaining
-        fig = go.Figure()
+        if use_light_charts():
+            light_bars(labels, values, colors, texts=texts, title='Time Remaining', x_title='Minutes')
+        else:
+            fig = go.Figure()
         
-        fig.add_trace(go.Bar(
-            y=['Regular Speed', '2x Speed'],
-            x=[remaining_duration, remaining_duration_2x],
-            orientation='h',
-            marker=dict(
-                color=['#FF9800', '#2196F3'],
-                line=dict(color='rgba(0, 0, 0, 0)', width=1)
-            ),
-            text=[f"{round(remaining_duration, 1)} min", f"{round(remaining_duration_2x, 1)} min"],
-            textposition='inside',
-            name='Time'
-        ))
+            fig.add_trace(go.Bar(
+                y=labels,
+                x=values,
+                orientation='h',
+                marker=dict(
+                    color=colors,
+                    line=dict(color='rgba(0, 0, 0, 0)', width=1)
+                ),
+                text=texts,
+                textposition='inside',
+                name='Time'
+            ))
         
-        fig.update_layout(
-            title='Time Remaining',
-            xaxis=dict(title='Minutes'),
-            height=200,
-            margin=dict(l=20, r=20, t=50, b=20),
-            showlegend=False
-        )
+            fig.update_layout(
+                title='Time Remaining',
+                xaxis=dict(title='Minutes'),
+                height=200,
+                margin=dict(l=20, r=20, t=50, b=20),
+                showlegend=False
+            )
         
-        st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
+
+def _delete_course(course_id, title):
+    """Delete button callback; the course can be restored from the undo banner"""
+    if delete_course(course_id):
+        st.session_state["deleted_course"] = {"id": course_id, "title": title, "deleted_at": time.time()}
+    else:
+        st.error("Failed to delete course")
 
+def _undo_delete():
+    """Undo button callback"""
+    deleted = st.session_state.pop("deleted_course", None)
+    if deleted and not restore_course(deleted["id"]):
+        st.error("The course can no longer be restored")
+
+@traced("render")
+def display_undo_delete():
+    """Offer to undo the last deletion while its undo window lasts"""
+    deleted = st.session_state.get("deleted_course")
+    if not deleted:
+        return
+    if time.time() - deleted["deleted_at"] > COURSE_UNDO_SECONDS:
+        st.session_state.pop("deleted_course", None)
+        return
+    
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.success(f"Deleted \"{deleted['title']}\"")
+    with col2:
+        st.button("Undo", key="undo_delete_btn", on_click=_undo_delete, use_container_width=True)
+
+@traced("render")
 def display_course_summary(courses):
     """Display summary of all courses with their progress"""
     if not courses:
@@ -199,6 +249,7 @@ def display_course_summary(courses):
     """, unsafe_allow_html=True)
     
     cols = st.columns(3)
+    speeds = get_playback_speeds()
     
     for i, course in enumerate(courses):
         col = cols[i % 3]
@@ -218,7 +269,7 @@ def display_course_summary(courses):
             completed_sections = course.get('sections_completed', 0)
             total_duration = course.get('total_duration_minutes', 0)
             remaining_duration = course.get('remaining_duration_minutes', 0)
-            remaining_2x = course.get('remaining_duration_2x_minutes', 0)
+            remaining_by_speed = duration_at_speeds(remaining_duration, speeds)
             
             # Create a bordered container similar to course progress style
             with st.container(border=True):
@@ -247,13 +298,14 @@ def display_course_summary(courses):
                     """, unsafe_allow_html=True)
                 
                 with col2:
+                    speed_stats = "".join(f"""
+                    <div class="progress-stat">
+                        <span>At {format_speed(speed)}:</span> <span class="completion-value">{minutes} min</span>
+                    </div>""" for speed, minutes in remaining_by_speed.items())
                     st.markdown(f"""
                     <div class="progress-stat">
                         <span>Remaining:</span> <span class="completion-value">{round(remaining_duration, 1)} min</span>
-                    </div>
-                    <div class="progress-stat">
-                        <span>At 2x:</span> <span class="completion-value">{round(remaining_2x, 1)} min</span>
-                    </div>
+                    </div>{speed_stats}
                     """, unsafe_allow_html=True)
                 
                 st.markdown(f"""
@@ -270,62 +322,71 @@ def display_course_summary(courses):
                         st.session_state["page"] = "courses"
                         st.rerun()
                 with col2:
-                    if st.button("Delete", key=f"delete_{course['_id']}", use_container_width=True):
-                        if delete_course(str(course["_id"])):
-                            st.success("Course deleted successfully!")
-                            st.rerun()
-                        else:
-                            st.error("Failed to delete course")
+                    # Deleted in the click's callback, before the rerun that redraws the list
+                    st.button("Delete", key=f"delete_{course['_id']}", use_container_width=True,
+                              on_click=_delete_course, args=(str(course["_id"]), course.get('title', 'Untitled Course')))
 
-def display_platform_distribution(courses):
+@traced("render")
+def display_platform_distribution(stats):
     """Display platform distribution pie chart"""
-    if not courses or len(courses) == 0:
+    if not stats or not stats.get('platforms'):
         return
     
-    # Count courses by platform
-    platform_counts = {}
-    for course in courses:
-        platform = course.get('platform', 'other').capitalize()
-        platform_counts[platform] = platform_counts.get(platform, 0) + 1
+    # Course counts by platform are kept in the user's summary
+    platform_counts = {platform.capitalize(): count for platform, count in stats['platforms'].items() if count}
     
     if platform_counts:
         # Create pie chart with improved styling
-        fig = px.pie(
-            values=list(platform_counts.values()),
-            names=list(platform_counts.keys()),
-            title='Courses by Platform',
-            color_discrete_map={
-                'Youtube': '#FF0000',
-                'Udemy': '#A435F0',
-                'Other': '#4CAF50'
-            }
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
-            margin=dict(l=20, r=20, t=50, b=20),
-        )
+        if use_light_charts():
+            colors = {'Youtube': '#FF0000', 'Udemy': '#A435F0', 'Other': '#4CAF50'}
+            light_donut(list(platform_counts.keys()), list(platform_counts.values()),
+                        [colors.get(platform, '#9E9E9E') for platform in platform_counts], title='Courses by Platform', height=300)
+        else:
+            fig = px.pie(
+                values=list(platform_counts.values()),
+                names=list(platform_counts.keys()),
+                title='Courses by Platform',
+                color_discrete_map={
+                    'Youtube': '#FF0000',
+                    'Udemy': '#A435F0',
+                    'Other': '#4CAF50'
+                }
+            )
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            fig.update_layout(
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+                margin=dict(l=20, r=20, t=50, b=20),
+            )
         
-        st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
 
+@traced("render")
 def dashboard(user):
     """Main dashboard function"""
-    # Get all user courses
-    courses = get_user_courses(user['id'])
+    # Save buffered progress first so the summary includes it
+    flush_user_progress(user['id'])
+    
+    # Totals come from the user's summary document, cards from the courses' stored
+    # statistics; neither needs the sections
+    stats = load_user_stats(user['id'])
+    courses = load_user_course_summaries(user['id'])
     
     # Display welcome section - removed as requested
     # display_user_welcome(user)
     
+    # Undo banner for the last deleted course
+    display_undo_delete()
+    
     # Display overall stats
     st.subheader("Your Learning Stats")
-    display_overall_stats(courses)
+    display_overall_stats(stats)
     
     # Display courses with delete functionality
     display_course_summary(courses)
     
     # Display platform distribution chart
-    if courses:
-        display_platform_distribution(courses)
+    if stats and stats.get('courses'):
+        display_platform_distribution(stats)
     
     # Action button to add new course
     st.subheader("Actions")
@@ -0,0 +1,102 @@
+import streamlit as st
+from database import STORAGE_BACKEND, explain_slow_query
+from query_monitor import query_monitor
+
+CATEGORY_COLORS = {
+    "db": "#4CAF50",
+    "stats": "#FF9800",
+    "render": "#2196F3",
+    "plotly": "#A435F0",
+    "search": "#00BCD4"
+}
+
+def display_span_totals(rerun):
+    """Display total time per span category"""
+    totals = rerun.totals()
+    rows = [{
+        "Category": category,
+        "Spans": entry["count"],
+        "Total (ms)": round(entry["total_ms"], 1)
+    } for category, entry in sorted(totals.items(), key=lambda item: -item[1]["total_ms"])]
+
+    st.metric("Rerun so far", f"{round(rerun.elapsed_ms(), 1)} ms")
+    if rows:
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+def display_span_waterfall(rerun):
+    """Display spans as a waterfall of horizontal bars on the rerun timeline"""
+    import plotly.graph_objects as go
+
+    spans = sorted(rerun.spans, key=lambda item: (item["start_ms"], item["depth"]))
+    labels = [f"{i+1:>3}. {'  ' * item['depth']}{item['name']}" for i, item in enumerate(spans)]
+
+    fig = go.Figure(go.Bar(
+        base=[item["start_ms"] for item in spans],
+        x=[max(item["duration_ms"], 0.05) for item in spans],
+        y=labels,
+        orientation='h',
+        marker_color=[CATEGORY_COLORS.get(item["category"], "#9E9E9E") for item in spans],
+        hovertext=[f"{item['category']}: {item['duration_ms']} ms" for item in spans],
+        hoverinfo="text"
+    ))
+    fig.update_layout(
+        xaxis=dict(title='ms since rerun start'),
+        yaxis=dict(autorange="reversed"),
+        height=max(250, 18 * len(spans)),
+        margin=dict(l=10, r=10, t=10, b=10),
+        showlegend=False
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+def display_redundant_queries(rerun):
+    """Display read queries issued more than once in this rerun"""
+    redundant = rerun.redundant_queries()
+    st.caption(f"{len(rerun.queries)} read queries this rerun, {len(redundant)} repeated")
+    if redundant:
+        st.dataframe(
+            [{"Times": count, "Query": signature} for signature, count in
+             sorted(redundant.items(), key=lambda item: -item[1])],
+            hide_index=True,
+            use_container_width=True
+        )
+
+def display_slow_queries(session_id):
+    """Display this session's slow commands with an on-demand explain"""
+    slow_queries = query_monitor.get_slow_queries(session_id)
+    st.caption(f"Commands slower than {query_monitor.slow_ms:g} ms from this session: {len(slow_queries)}")
+    
+    for i, entry in enumerate(slow_queries[:10]):
+        st.markdown(f"**{entry['command']}** `{entry['collection']}` · {entry['duration_ms']} ms · "
+                    f"{entry['reply_bytes']} B reply")
+        st.code(str(entry["filter"]), language="json")
+        # Only MongoDB can explain the captured commands
+        if STORAGE_BACKEND == "mongo" and st.button("Explain", key=f"perf_explain_{entry['time'].isoformat()}_{i}"):
+            try:
+                st.json(explain_slow_query(entry))
+            except Exception as e:
+                st.error(f"Explain failed: {e}")
+
+def display_perf_panel(rerun):
+    """Sidebar panel with the spans collected for the current rerun"""
+    with st.sidebar.expander("Performance", expanded=True):
+        st.caption(f"Page: {rerun.page} · rerun {rerun.id}")
+        display_span_totals(rerun)
+        if rerun.spans:
+            display_span_waterfall(rerun)
+        else:
+            st.write("No spans recorded")
+    
+    with st.sidebar.expander("Queries"):
+        display_redundant_queries(rerun)
+        display_slow_queries(rerun.session_id)
+
+def display_profile_panel(profile):
+    """Sidebar table with the hotspots of the last profiled rerun"""
+    with st.sidebar.expander("Profile", expanded=True):
+        st.caption(f"Page: {profile['page']} · {profile['duration_ms']} ms · {profile['calls']} calls")
+        if profile["path"]:
+            st.caption(f"Saved to `{profile['path']}`")
+        st.dataframe(profile["hotspots"], hide_index=True, use_container_width=True)
+        if st.button("Dismiss", key="dismiss_profile_btn"):
+            st.session_state.pop("last_profile", None)
+            st.rerun()
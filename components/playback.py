@@ -0,0 +1,31 @@
+import streamlit as st
+from database import update_user_playback_speeds
+from components.course_handlers import PLAYBACK_SPEED_OPTIONS, DEFAULT_PLAYBACK_SPEEDS, format_speed, duration_at_speeds
+
+# Bar colors of the remaining-time charts: regular speed first, then each playback speed
+SPEED_COLORS = ['#FF9800', '#2196F3', '#9C27B0', '#009688', '#3F51B5', '#795548', '#607D8B']
+
+def get_playback_speeds():
+    """Playback speeds of the logged-in user"""
+    user = st.session_state.get("user") or {}
+    return user.get("playback_speeds", DEFAULT_PLAYBACK_SPEEDS)
+
+def _save_playback_speeds():
+    speeds = sorted(st.session_state["playback_speeds"])
+    st.session_state["user"]["playback_speeds"] = speeds
+    update_user_playback_speeds(st.session_state["user"]["id"], speeds)
+
+def playback_speed_selector():
+    """Sidebar picker for the speeds remaining times are shown at, saved with the user"""
+    st.sidebar.multiselect("Playback speeds", PLAYBACK_SPEED_OPTIONS, default=get_playback_speeds(),
+                           format_func=format_speed, key="playback_speeds", on_change=_save_playback_speeds,
+                           help="Remaining times are also shown at these speeds")
+
+def remaining_time_bars(remaining_minutes, speeds=None):
+    """(labels, values, colors, texts) of the remaining time at regular speed and each playback speed"""
+    speeds = get_playback_speeds() if speeds is None else speeds
+    labels = ['Regular Speed'] + [f"{format_speed(speed)} Speed" for speed in speeds]
+    values = [remaining_minutes] + list(duration_at_speeds(remaining_minutes, speeds).values())
+    colors = [SPEED_COLORS[i % len(SPEED_COLORS)] for i in range(len(values))]
+    texts = [f"{round(value, 1)} min" for value in values]
+    return labels, values, colors, texts
@@ -0,0 +1,80 @@
+import datetime
+import streamlit as st
+import pandas as pd
+from loader import load_user_courses
+from instrumentation import traced
+from planner import plan_courses
+from components.course_handlers import format_speed
+from components.playback import get_playback_speeds
+from progress_queue import apply_pending_progress
+
+ORDERS = {
+    "closest": "Closest to finishing first",
+    "listed": "One course at a time, as listed"
+}
+
+def _format_date(date):
+    return date.strftime("%a %d %b %Y") if date else "Done"
+
+@traced("render")
+def display_day(plan, day, daily_minutes, speed):
+    """The videos falling on one study day, with the part of each to watch"""
+    parts = plan.day_slice(day, daily_minutes, speed)
+    if not parts:
+        st.success("Nothing left to watch 🎉")
+        return
+    for video, from_minute, to_minute in parts:
+        whole = from_minute == 0 and to_minute >= video["duration_minutes"]
+        part = "" if whole else f" (minutes {from_minute:g}–{to_minute:g})"
+        st.markdown(f"- **{video['video_title']}**{part} · {round((to_minute - from_minute) / speed, 1):g} min  \n"
+                    f"  {video['course_title']} › {video['section_title']}")
+
+@traced("render")
+def study_plan(user):
+    """Forecast finish dates and today's videos for a daily study time and playback speed"""
+    courses = [apply_pending_progress(course) for course in load_user_courses(user['id'])]
+    if not courses:
+        st.info("Add a course to plan your studying.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        daily_minutes = st.number_input("Minutes per day", min_value=5, max_value=600, value=45, step=5,
+                                        key="plan_daily_minutes")
+    with col2:
+        speeds = sorted({1.0, *get_playback_speeds()})
+        speed = st.selectbox("Playback speed", speeds, index=speeds.index(1.5) if 1.5 in speeds else 0,
+                             format_func=format_speed, key="plan_speed")
+    with col3:
+        titles = {str(course['_id']): course.get('title', 'Untitled Course') for course in courses}
+        scope = st.selectbox("Plan", [None, *titles], format_func=lambda course_id: titles.get(course_id, "All courses"),
+                             key="plan_scope")
+
+    if scope is None:
+        order = st.radio("Order", list(ORDERS), format_func=ORDERS.get, horizontal=True, key="plan_order")
+        plan = plan_courses(courses, order)
+    else:
+        plan = plan_courses([course for course in courses if str(course['_id']) == scope])
+
+    today = datetime.date.today()
+    days_left = plan.days_to(plan.total_minutes, daily_minutes, speed)
+    finish = plan.finish_date(daily_minutes, speed, today)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Finish Date", _format_date(finish))
+    with col2:
+        st.metric("Study Days Left", days_left)
+    with col3:
+        st.metric(f"Time Left at {format_speed(speed)}", f"{round(plan.total_minutes / speed, 1):g} min")
+
+    if scope is None:
+        st.subheader("Finish Dates")
+        st.dataframe(pd.DataFrame(
+            [{"Course": title, "Finishes": _format_date(date)}
+             for _, title, date in plan.course_finish_dates(daily_minutes, speed, today)]
+        ), hide_index=True, use_container_width=True)
+
+    st.subheader("What to Watch")
+    day = st.slider("Study day", 1, days_left, 1, key="plan_day", format="Day %d") - 1 if days_left > 1 else 0
+    st.caption(_format_date(today + datetime.timedelta(days=day)))
+    display_day(plan, day, daily_minutes, speed)
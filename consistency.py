@@ -0,0 +1,143 @@
+import os
+import json
+import math
+import time
+import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import database
+from components.course_handlers import calculate_course_statistics
+
+# Stored statistics whose difference from the recomputed value is below this are not drift
+TOLERANCE = 0.05
+
+def _slim_course(course):
+    """Only what the statistics depend on, so little is pickled to the workers"""
+    return {
+        "_id": str(course["_id"]),
+        "user_id": course.get("user_id"),
+        "updated_at": course.get("updated_at"),
+        "stored": {key: value for key, value in course.items() if not isinstance(value, (list, dict))},
+        "sections": [{"videos": [{"duration_minutes": video.get("duration_minutes", 0),
+                                  "completed": video.get("completed", False)}
+                                 for video in section.get("videos", [])]}
+                     for section in course.get("sections", [])]
+    }
+
+def _differs(stored, expected):
+    if not isinstance(stored, (int, float)) or isinstance(stored, bool):
+        return True
+    return not math.isclose(stored, expected, abs_tol=TOLERANCE)
+
+def check_courses(courses):
+    """Mismatches of a chunk of slim courses: [(course_id, user_id, updated_at, {field: [stored, expected]})]
+
+    Runs in the worker processes.
+    """
+    mismatches = []
+    for course in courses:
+        expected = calculate_course_statistics(course)
+        fields = {field: [course["stored"].get(field), value] for field, value in expected.items()
+                  if _differs(course["stored"].get(field), value)}
+        if fields:
+            mismatches.append((course["_id"], course["user_id"], course["updated_at"], fields))
+    return mismatches
+
+def _chunks(batch_size, chunk_size):
+    """Slim courses in chunks of `chunk_size`, read from the database `batch_size` at a time"""
+    after_id = None
+    while True:
+        courses = database.get_courses_after(after_id, batch_size)
+        if not courses:
+            return
+        after_id = str(courses[-1]["_id"])
+        slim = [_slim_course(course) for course in courses]
+        for start in range(0, len(slim), chunk_size):
+            yield slim[start:start + chunk_size]
+
+def plan_entry(course_id, user_id, updated_at, fields):
+    """One line of a repair plan: the course, the version it was checked at and the values to set"""
+    return {"course_id": course_id, "user_id": user_id,
+            "expected_updated_at": updated_at.isoformat() if isinstance(updated_at, datetime.datetime) else updated_at,
+            "set": {field: values[1] for field, values in fields.items()},
+            "stored": {field: values[0] for field, values in fields.items()}}
+
+def check_all(workers=None, batch_size=1000, chunk_size=200, on_mismatch=None, on_progress=None):
+    """Recompute the statistics of every live course in a process pool and compare them with the stored ones
+
+    Courses are read a batch at a time and at most two chunks per worker are
+    in flight, so memory stays bounded however many courses there are.
+    `on_mismatch(course_id, user_id, updated_at, fields)` is called for each
+    drifted course. `workers=0` checks in this process. Returns a summary.
+    """
+    summary = {"checked": 0, "mismatched": 0, "fields": {}, "elapsed": 0.0}
+    start = time.perf_counter()
+
+    def collect(chunk_size, mismatches):
+        summary["checked"] += chunk_size
+        summary["mismatched"] += len(mismatches)
+        for mismatch in mismatches:
+            for field in mismatch[3]:
+                summary["fields"][field] = summary["fields"].get(field, 0) + 1
+            if on_mismatch:
+                on_mismatch(*mismatch)
+        summary["elapsed"] = time.perf_counter() - start
+        if on_progress:
+            on_progress(summary)
+
+    if workers == 0:
+        for chunk in _chunks(batch_size, chunk_size):
+            collect(len(chunk), check_courses(chunk))
+        return summary
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_in_flight = workers * 2
+        in_flight = {}
+        for chunk in _chunks(batch_size, chunk_size):
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(in_flight.pop(future), future.result())
+            in_flight[pool.submit(check_courses, chunk)] = len(chunk)
+        for future in list(in_flight):
+            collect(in_flight.pop(future), future.result())
+    return summary
+
+def apply_plan(entries, batch_size=500):
+    """Apply repair plan entries with bulk writes; returns (written, skipped)
+
+    Entries for courses updated since the check are skipped. User summaries
+    of repaired courses are rebuilt, since bulk writes bypass them.
+    """
+    written = skipped = 0
+    batch = []
+
+    def flush():
+        nonlocal written, skipped
+        updates = [(entry["course_id"], _parse_updated_at(entry["expected_updated_at"]), entry["set"])
+                   for entry in batch]
+        count = database.bulk_update_courses(updates)
+        written += count
+        skipped += len(batch) - count
+        for user_id in {entry["user_id"] for entry in batch if entry.get("user_id")}:
+            database.rebuild_user_stats(user_id)
+        batch.clear()
+
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return written, skipped
+
+def _parse_updated_at(value):
+    return datetime.datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def read_plan(path):
+    """Stream the entries of an NDJSON repair plan"""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,72 @@
+import os
+import time
+import logging
+import datetime
+import threading
+
+from database import purge_deleted_courses
+
+logger = logging.getLogger(__name__)
+
+# Deleted courses are removed for good by a background thread every
+# COURSE_PURGE_INTERVAL seconds, in batches of COURSE_PURGE_BATCH_SIZE with a
+# pause in between so the deletes never hog the database. COURSE_PURGE_HOURS
+# (e.g. "1-5", local time) keeps the purge to off-peak hours. Set
+# COURSE_PURGE_INTERVAL=0 to purge only with scripts/purge_deleted_courses.py.
+PURGE_INTERVAL = float(os.getenv("COURSE_PURGE_INTERVAL", "900"))
+PURGE_BATCH_SIZE = int(os.getenv("COURSE_PURGE_BATCH_SIZE", "200"))
+PURGE_PAUSE = float(os.getenv("COURSE_PURGE_PAUSE", "0.5"))
+PURGE_HOURS = os.getenv("COURSE_PURGE_HOURS", "")
+
+def parse_hours(hours):
+    """(start, end) local hours from "start-end", or None for any time"""
+    if not hours:
+        return None
+    start, end = (int(hour) for hour in hours.split("-"))
+    return (start, end)
+
+def in_purge_window(window, now=None):
+    """True when `now` falls in the (start, end) hours; the window may wrap past midnight"""
+    if window is None:
+        return True
+    hour = (now or datetime.datetime.now()).hour
+    start, end = window
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+def purge(batch_size=PURGE_BATCH_SIZE, pause=PURGE_PAUSE, max_batches=None):
+    """Purge expired deleted courses batch by batch until none are left; returns the number purged"""
+    purged = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = purge_deleted_courses(batch_size)
+        purged += count
+        batches += 1
+        if count < batch_size:
+            break
+        time.sleep(pause)
+    return purged
+
+def _purge_loop(interval, window):
+    while True:
+        time.sleep(interval)
+        if not in_purge_window(window):
+            continue
+        try:
+            purged = purge()
+        except Exception as e:
+            logger.error(f"Failed to purge deleted courses: {e}")
+            continue
+        if purged:
+            logger.info(f"Purged {purged} deleted courses")
+
+_purger_started = False
+_purger_lock = threading.Lock()
+
+def start_purger():
+    """Start the background purge once per process; safe to call on every rerun"""
+    global _purger_started
+    with _purger_lock:
+        if _purger_started or PURGE_INTERVAL <= 0:
+            return
+        _purger_started = True
+        threading.Thread(target=_purge_loop, args=(PURGE_INTERVAL, parse_hours(PURGE_HOURS)),
+                         name="course-purge", daemon=True).start()
@@ -1,76 +1,218 @@
-import pymongo
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, DuplicateKeyError
 import bcrypt
 import logging
 import datetime
+import threading
 import uuid
 import os
+from collections import OrderedDict
 from dotenv import load_dotenv
 import secrets
+from instrumentation import span, traced
+from metrics import record_cache_lookup
+from storage import create_storage
+from storage.catalog import split_sections, structure_fingerprint, join_sections
 
 load_dotenv()
 
 
+# Storage backend: "mongo" (default) or "sqlite" for single-node deployments
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/study_track.db")
+
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 DB_NAME = os.getenv("DB_NAME", "study_track")
 
 # Collection names
 USERS_COLLECTION = os.getenv("USERS_COLLECTION", "users")
 COURSES_COLLECTION = os.getenv("COURSES_COLLECTION", "courses")
+USER_STATS_COLLECTION = os.getenv("USER_STATS_COLLECTION", "user_stats")
+CATALOG_COLLECTION = os.getenv("CATALOG_COLLECTION", "course_catalog")
+# Cached rollups of the admin reports (scripts/admin_reports.py)
+REPORTS_COLLECTION = os.getenv("REPORTS_COLLECTION", "reports")
+
+# Version of the course document layout written by add_course; older courses
+# are upgraded by scripts/migrate_courses.py (see migrations.py)
+COURSE_SCHEMA_VERSION = 3
+
+# Catalog structures never change once stored, so they are cached in-process
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "512"))
 
 # App settings
 APP_NAME = "Study Track"
 DEFAULT_THEME = "light"
 
+# Deleted courses can be restored for this long before the purge may remove them
+COURSE_UNDO_SECONDS = int(os.getenv("COURSE_UNDO_SECONDS", "60"))
+
 # Password settings
 PASSWORD_SALT_ROUNDS = 10 
 
+# Record MongoDB commands with the query monitor (see query_monitor.py)
+COMMAND_MONITORING = os.getenv("MONGO_COMMAND_MONITORING", "1").lower() in ("1", "true", "yes")
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize MongoDB client
-try:
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)  # 5s timeout
-    client.admin.command('ping')  # Test connection
-    logger.info(f"Successfully connected to MongoDB at {MONGO_URI}")
-except ConnectionFailure as e:
-    logger.error(f"Failed to connect to MongoDB: {e}")
-    raise
 
-# Access database and collections
-db = client[DB_NAME]
-users_collection = db[USERS_COLLECTION]
-courses_collection = db[COURSES_COLLECTION]
 
-# Ensure unique index on users' email
-users_collection.create_index([("email", pymongo.ASCENDING)], unique=True)
+# Commands that the explain command accepts
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+def _plan_stages(plan):
+    """Stage names of a query plan from the root down, e.g. FETCH > IXSCAN (user_id_1)"""
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f" ({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return stages
+
+def explain_slow_query(entry):
+    """Run explain on a captured slow command and summarize the winning plan"""
+    if entry["command"] not in EXPLAINABLE_COMMANDS:
+        return {"error": f"{entry['command']} commands cannot be explained"}
+    storage = get_storage()
+    if storage.name != "mongo":
+        return {"error": f"Explain needs the MongoDB backend; STORAGE_BACKEND is {storage.name}"}
+    
+    result = storage.client[entry["database"]].command("explain", entry["body"], verbosity="executionStats")
+    planner = result.get("queryPlanner", {})
+    execution = result.get("executionStats", {})
+    stages = _plan_stages(planner.get("winningPlan", {}).get("queryPlan", planner.get("winningPlan", {})))
+    return {
+        "plan": " > ".join(stages),
+        "collection_scan": any(stage.startswith("COLLSCAN") for stage in stages),
+        "returned": execution.get("nReturned"),
+        "keys_examined": execution.get("totalKeysExamined"),
+        "docs_examined": execution.get("totalDocsExamined"),
+        "execution_ms": execution.get("executionTimeMillis")
+    }
+
+# Storage backend, created on first use so importing this module doesn't
+# connect (or import the MongoDB driver) before a page needs data
+_storage = None
+_storage_lock = threading.Lock()
+
+def _create_storage():
+    if STORAGE_BACKEND == "sqlite":
+        return create_storage("sqlite", path=SQLITE_PATH)
+    
+    event_listeners = []
+    if COMMAND_MONITORING:
+        from query_monitor import query_monitor
+        event_listeners.append(query_monitor)
+    return create_storage(
+        STORAGE_BACKEND,
+        uri=MONGO_URI,
+        db_name=DB_NAME,
+        users_collection=USERS_COLLECTION,
+        courses_collection=COURSES_COLLECTION,
+        user_stats_collection=USER_STATS_COLLECTION,
+        catalog_collection=CATALOG_COLLECTION,
+        reports_collection=REPORTS_COLLECTION,
+        event_listeners=event_listeners
+    )
+
+def get_storage():
+    """The storage backend, connecting on first call"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = _create_storage()
+    return _storage
+
+
+
+# Catalog operations
+
+_catalog_cache = OrderedDict()
+_catalog_lock = threading.Lock()
+
+def store_course_structure(sections):
+    """Put a course's structure in the catalog; returns the enrollment fields (catalog_id, sections) referring to it"""
+    structure, progress = split_sections(sections)
+    catalog_id = structure_fingerprint(structure)
+    get_storage().insert_catalog_structure(catalog_id, structure)
+    return {"catalog_id": catalog_id, "sections": progress}
+
+def _get_catalog_structures(catalog_ids):
+    """{catalog_id: structure}, from the cache where possible and otherwise in one query"""
+    structures, missing = {}, []
+    with _catalog_lock:
+        for catalog_id in catalog_ids:
+            structure = _catalog_cache.get(catalog_id)
+            if structure is None:
+                missing.append(catalog_id)
+            else:
+                _catalog_cache.move_to_end(catalog_id)
+                structures[catalog_id] = structure
+    for catalog_id in catalog_ids:
+        record_cache_lookup("catalog", catalog_id in structures)
+    if not missing:
+        return structures
+    
+    loaded = get_storage().get_catalog_structures(missing)
+    structures.update(loaded)
+    with _catalog_lock:
+        _catalog_cache.update(loaded)
+        while len(_catalog_cache) > CATALOG_CACHE_SIZE:
+            _catalog_cache.popitem(last=False)
+    return structures
+
+def _join_catalog(courses):
+    """Fill in the sections of catalog-backed courses from their shared structure"""
+    catalog_ids = {course["catalog_id"] for course in courses if course.get("catalog_id")}
+    if not catalog_ids:
+        return courses
+    structures = _get_catalog_structures(catalog_ids)
+    for course in courses:
+        if course.get("catalog_id"):
+            structure = structures.get(course["catalog_id"])
+            if structure is None:
+                logger.error(f"Course {course.get('_id')} refers to missing catalog structure {course['catalog_id']}")
+                structure = []
+            course["sections"] = join_sections(structure, course.get("sections"))
+    return courses
 
 
 
 # User operations
 
 def create_user(email, password, name):
-    """Create a new user with hashed password"""
-    try:
+    """Create a new user with hashed password; None if the email is taken, other failures raise"""
+    # Hashed outside the db span, so bcrypt time isn't reported as database time
+    with span("hash_password", "bcrypt"):
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(PASSWORD_SALT_ROUNDS))
-        user = {
-            "email": email,
-            "password": hashed_password,
-            "name": name,
-            "created_at": datetime.datetime.utcnow()
-        }
-        result = users_collection.insert_one(user)
-        return str(result.inserted_id)
-    except DuplicateKeyError:
-        logger.warning(f"User with email {email} already exists")
-        return None
-
-def get_user_by_email(email):
-    """Get user by email"""
-    return users_collection.find_one({"email": email})
+    return _insert_user({
+        "email": email,
+        "password": hashed_password,
+        "name": name,
+        "created_at": datetime.datetime.utcnow()
+    })
 
+@traced("db", "create_user")
+def _insert_user(user):
+    # The unique email index decides, so there is no separate existence check
+    user_id = get_storage().insert_user(user)
+    if user_id is None:
+        logger.warning(f"User with email {user['email']} already exists")
+    return user_id
+
+@traced("db")
+def get_user_by_email(email, fields=None):
+    """Get user by email, ignoring case; only `fields` when given"""
+    return get_storage().get_user_by_email(email, fields)
+
+@traced("db")
+def update_user_playback_speeds(user_id, speeds):
+    """Save the playback speeds a user wants remaining times shown at"""
+    return get_storage().update_user(user_id, {"playback_speeds": sorted(speeds)})
+
+@traced("bcrypt")
 def verify_password(stored_password, provided_password):
     """Verify the password"""
     return bcrypt.checkpw(provided_password.encode('utf-8'), stored_password)
@@ -79,48 +221,81 @@ def verify_password(stored_password, provided_password):
 
 # Course operations
 
+@traced("db")
 def add_course(user_id, course_data):
     """Add a course for a user"""
-    try:
-        course_data["user_id"] = user_id
-        course_data["created_at"] = datetime.datetime.utcnow()
-        course_data["updated_at"] = datetime.datetime.utcnow()
+    course_data["user_id"] = user_id
+    course_data["created_at"] = datetime.datetime.utcnow()
+    course_data["updated_at"] = datetime.datetime.utcnow()
+    course_data["schema_version"] = COURSE_SCHEMA_VERSION
+    
+    if not course_data.get('url') or course_data.get('url') == "":
+        unique_id = str(uuid.uuid4())
+        course_data['url'] = f"manual_course_{unique_id}"
+        course_data['url_generated'] = True
         
-        if not course_data.get('url') or course_data.get('url') == "":
-            unique_id = str(uuid.uuid4())
-            course_data['url'] = f"manual_course_{unique_id}"
-            course_data['url_generated'] = True
-            
-        result = courses_collection.insert_one(course_data)
-        return str(result.inserted_id)
-    except DuplicateKeyError:
+    # The stored enrollment only holds progress; the structure goes to the shared catalog
+    document = {**course_data, **store_course_structure(course_data.get("sections", []))}
+    course_id = get_storage().insert_course(document)
+    if course_id is None:
         logger.warning(f"Course with URL {course_data.get('url')} already exists for user {user_id}")
-        return None
+    return course_id
 
+@traced("db")
 def get_user_courses(user_id):
     """Get all courses for a user"""
-    return list(courses_collection.find({"user_id": user_id}))
+    return _join_catalog(get_storage().get_user_courses(user_id))
+
+@traced("db")
+def get_user_course_outlines(user_id):
+    """Get the searchable text of a user's courses (titles and descriptions only)"""
+    return _join_catalog(get_storage().get_user_course_outlines(user_id))
+
+@traced("db")
+def get_user_courses_fingerprint(user_id):
+    """Get (course count, last update time) for a user, used to tell if derived data is stale"""
+    return get_storage().get_user_courses_fingerprint(user_id)
 
+@traced("db")
 def get_course_by_id(course_id):
     """Get course by ID"""
-    from bson.objectid import ObjectId
-    return courses_collection.find_one({"_id": ObjectId(course_id)})
+    course = get_storage().get_course_by_id(course_id)
+    return _join_catalog([course])[0] if course else None
 
+@traced("db")
+def get_courses_by_ids(course_ids):
+    """Get several courses in one query; missing and deleted ones are left out"""
+    return _join_catalog(get_storage().get_courses_by_ids(course_ids))
+
+@traced("db")
+def get_course_summaries(course_ids):
+    """Get the statistics and titles of several courses in one query, without their sections"""
+    return get_storage().get_course_summaries(course_ids)
+
+@traced("db")
+def get_user_course_summaries(user_id):
+    """Get the statistics and titles of a user's courses in one query, without their sections"""
+    return get_storage().get_user_course_summaries(user_id)
+
+@traced("db")
+def get_user_course_titles(user_id):
+    """Get the ID and title of each of a user's courses, most recently updated first"""
+    return get_storage().get_user_course_titles(user_id)
+
+@traced("db")
 def update_course(course_id, update_data):
     """Update course data"""
-    from bson.objectid import ObjectId
     update_data["updated_at"] = datetime.datetime.utcnow()
-    return courses_collection.update_one(
-        {"_id": ObjectId(course_id)},
-        {"$set": update_data}
-    )
+    if "sections" in update_data:
+        # A changed structure is a new catalog entry; the old one stays for other users
+        update_data = {**update_data, **store_course_structure(update_data["sections"])}
+    return get_storage().update_course(course_id, update_data)
 
+@traced("db")
 def delete_course(course_id):
-    """Delete a course by ID"""
-    from bson.objectid import ObjectId
+    """Delete a course by ID; it can be restored for COURSE_UNDO_SECONDS, then it is purged"""
     try:
-        result = courses_collection.delete_one({"_id": ObjectId(course_id)})
-        if result.deleted_count > 0:
+        if get_storage().soft_delete_course(course_id, datetime.datetime.utcnow()):
             logger.info(f"Successfully deleted course with ID: {course_id}")
             return True
         else:
@@ -130,13 +305,83 @@ def delete_course(course_id):
         logger.error(f"Error deleting course: {e}")
         return False
 
+@traced("db")
+def restore_course(course_id):
+    """Undo a recent delete_course; False once the undo window has passed"""
+    deleted_since = datetime.datetime.utcnow() - datetime.timedelta(seconds=COURSE_UNDO_SECONDS)
+    return get_storage().restore_course(course_id, deleted_since)
+
+@traced("db")
+def purge_deleted_courses(limit, deleted_before=None):
+    """Permanently delete up to `limit` courses whose undo window has passed; returns how many"""
+    if deleted_before is None:
+        deleted_before = datetime.datetime.utcnow() - datetime.timedelta(seconds=COURSE_UNDO_SECONDS)
+    return get_storage().purge_deleted_courses(deleted_before, limit)
+
+@traced("db")
 def update_video_status(course_id, section_index, video_index, completed):
     """Update the completion status of a video"""
-    from bson.objectid import ObjectId
-    return courses_collection.update_one(
-        {"_id": ObjectId(course_id)},
-        {"$set": {
-            f"sections.{section_index}.videos.{video_index}.completed": completed,
-            "updated_at": datetime.datetime.utcnow()
-        }}
-    )
+    return get_storage().update_video_status(course_id, section_index, video_index, completed,
+                                       datetime.datetime.utcnow())
+
+@traced("db")
+def update_video_statuses(course_id, changes, fields, expected_updated_at=None):
+    """Update the completion status of several videos of a course together with top-level fields
+
+    With `expected_updated_at`, nothing is written (False) if the course was updated since it was read.
+    """
+    fields = dict(fields, updated_at=datetime.datetime.utcnow())
+    return get_storage().update_video_statuses(course_id, changes, fields, expected_updated_at)
+
+@traced("db")
+def set_videos_completed(course_id, completed, fields, section_index=None, video_count=None, expected_updated_at=None):
+    """Complete or reset a whole course, one section or its first `video_count` videos in one write
+
+    With `expected_updated_at`, nothing is written (False) if the course was updated since it was read.
+    """
+    fields = dict(fields, updated_at=datetime.datetime.utcnow())
+    return get_storage().set_videos_completed(course_id, completed, fields, section_index, video_count,
+                                              expected_updated_at)
+
+
+
+# Scan and migration operations
+
+@traced("db")
+def get_courses_after(after_id, limit):
+    """Next batch of live courses in ID order, for full scans"""
+    return _join_catalog(get_storage().get_courses_after(after_id, limit))
+
+@traced("db")
+def count_courses_to_migrate(version=COURSE_SCHEMA_VERSION):
+    """Count live courses whose schema_version is below `version`"""
+    return get_storage().count_courses_below_version(version)
+
+@traced("db")
+def get_courses_to_migrate(after_id, limit, version=COURSE_SCHEMA_VERSION):
+    """Next batch of courses below `version` in ID order, joined with their catalog structure"""
+    return _join_catalog(get_storage().get_courses_below_version(version, after_id, limit))
+
+@traced("db")
+def bulk_update_courses(updates):
+    """Write [(course_id, expected_updated_at, fields)] in one batch; courses changed meanwhile are skipped"""
+    return get_storage().bulk_update_courses(updates)
+
+
+
+# User summary operations
+
+@traced("db")
+def get_user_stats(user_id):
+    """Get the precomputed totals of a user's courses, building them if missing"""
+    storage = get_storage()
+    stats = storage.get_user_stats(user_id)
+    if stats is None:
+        storage.rebuild_user_stats(user_id)
+        stats = storage.get_user_stats(user_id)
+    return stats
+
+@traced("db")
+def rebuild_user_stats(user_id=None):
+    """Recompute user summaries from the courses, for one user or everyone"""
+    return get_storage().rebuild_user_stats(user_id)
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import uuid
+import logging
+import functools
+import contextvars
+from contextlib import contextmanager
+
+# Structured per-span log lines go to their own logger so they can be routed separately
+logger = logging.getLogger("study_track.perf")
+
+# Set STUDY_TRACK_PERF=1 to collect spans for every rerun
+PERF_ENV_VAR = "STUDY_TRACK_PERF"
+
+_current_rerun = contextvars.ContextVar("study_track_rerun", default=None)
+_span_listeners = []
+
+class Rerun:
+    """Spans collected while the app script runs once"""
+
+    def __init__(self, page, enabled, session_id=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.page = page
+        self.enabled = enabled
+        self.session_id = session_id
+        self.start = time.perf_counter()
+        self.spans = []
+        self.queries = []
+        self._stack = []
+
+    def elapsed_ms(self):
+        """Milliseconds since the rerun started"""
+        return (time.perf_counter() - self.start) * 1000
+
+    def totals(self):
+        """Total milliseconds and span count per category, counting only outermost spans"""
+        totals = {}
+        for item in self.spans:
+            entry = totals.setdefault(item["category"], {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            # Nested spans of the same category are already part of their parent's time
+            if not item["nested_in_category"]:
+                entry["total_ms"] += item["duration_ms"]
+        return totals
+
+    def redundant_queries(self):
+        """Read queries issued more than once during this rerun, with their counts"""
+        counts = {}
+        for signature in self.queries:
+            counts[signature] = counts.get(signature, 0) + 1
+        return {signature: count for signature, count in counts.items() if count > 1}
+
+def is_perf_enabled(query_params=None):
+    """True when span collection is enabled by env var or `?perf=1` query param"""
+    if os.getenv(PERF_ENV_VAR, "").lower() in ("1", "true", "yes"):
+        return True
+    return bool(query_params) and query_params.get("perf") in ("1", "true")
+
+def begin_rerun(page, enabled, session_id=None):
+    """Start collecting spans for the current script run"""
+    rerun = Rerun(page, enabled, session_id)
+    _current_rerun.set(rerun)
+    return rerun
+
+def end_rerun(rerun):
+    """Finish the rerun and emit its spans as structured log lines"""
+    _current_rerun.set(None)
+    if not rerun.enabled:
+        return
+
+    for item in rerun.spans:
+        logger.info(json.dumps({"event": "span", "rerun": rerun.id, "page": rerun.page, **item}))
+    logger.info(json.dumps({
+        "event": "rerun",
+        "rerun": rerun.id,
+        "page": rerun.page,
+        "duration_ms": round(rerun.elapsed_ms(), 3),
+        "totals": rerun.totals(),
+        "queries": len(rerun.queries),
+        "redundant_queries": rerun.redundant_queries()
+    }))
+
+def current_rerun():
+    """The rerun being collected in this script thread, if any"""
+    return _current_rerun.get()
+
+def add_span_listener(listener):
+    """Register listener(category, name, seconds), called for every finished span"""
+    _span_listeners.append(listener)
+
+@contextmanager
+def span(name, category="render"):
+    """Time a block of code as a span of the current rerun"""
+    rerun = _current_rerun.get()
+    collect = rerun is not None and rerun.enabled
+    if collect:
+        nested_in_category = any(parent["category"] == category for parent in rerun._stack)
+        item = {
+            "name": name,
+            "category": category,
+            "depth": len(rerun._stack),
+            "start_ms": round(rerun.elapsed_ms(), 3),
+            "nested_in_category": nested_in_category
+        }
+        rerun._stack.append(item)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        for listener in _span_listeners:
+            listener(category, name, duration)
+        if collect:
+            rerun._stack.pop()
+            item["duration_ms"] = round(duration * 1000, 3)
+            rerun.spans.append(item)
+
+def traced(category, name=None):
+    """Decorator recording each call of the function as a span"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+import contextvars
+
+import database
+
+_current_loader = contextvars.ContextVar("study_track_loader", default=None)
+
+class RerunLoader:
+    """Course data read during one rerun, each distinct need fetched at most once
+
+    Pages and the sidebar ask the loader instead of the database, so reading
+    the same courses twice in a rerun costs one query. Courses requested by
+    ID are fetched together with a single `$in` query, and courses already
+    loaded as part of a user's list are served from it.
+    """
+
+    def __init__(self):
+        self._courses = {}
+        self._user_courses = {}
+        self._user_stats = {}
+        self._summaries = {}
+        self._user_titles = {}
+        self._user_summaries = {}
+
+    def get_courses(self, course_ids):
+        """Courses by ID (None for missing ones), fetching the ones not loaded yet in one query"""
+        course_ids = [str(course_id) for course_id in course_ids]
+        missing = list(dict.fromkeys(course_id for course_id in course_ids if course_id not in self._courses))
+        if missing:
+            found = {str(course["_id"]): course for course in database.get_courses_by_ids(missing)}
+            for course_id in missing:
+                self._courses[course_id] = found.get(course_id)
+        return [self._courses[course_id] for course_id in course_ids]
+
+    def get_course(self, course_id):
+        return self.get_courses([course_id])[0]
+
+    def get_user_courses(self, user_id):
+        if user_id not in self._user_courses:
+            courses = database.get_user_courses(user_id)
+            self._user_courses[user_id] = courses
+            for course in courses:
+                self._courses.setdefault(str(course["_id"]), course)
+        return self._user_courses[user_id]
+
+    def get_course_summaries(self, course_ids):
+        """Summary projections by ID (None for missing ones), fetching the ones not loaded yet in one query"""
+        course_ids = [str(course_id) for course_id in course_ids]
+        missing = list(dict.fromkeys(course_id for course_id in course_ids if course_id not in self._summaries))
+        if missing:
+            found = {str(summary["_id"]): summary for summary in database.get_course_summaries(missing)}
+            for course_id in missing:
+                self._summaries[course_id] = found.get(course_id)
+        return [self._summaries[course_id] for course_id in course_ids]
+
+    def get_user_course_titles(self, user_id):
+        if user_id not in self._user_titles:
+            self._user_titles[user_id] = database.get_user_course_titles(user_id)
+        return self._user_titles[user_id]
+
+    def get_user_course_summaries(self, user_id):
+        if user_id not in self._user_summaries:
+            self._user_summaries[user_id] = database.get_user_course_summaries(user_id)
+        return self._user_summaries[user_id]
+
+    def get_user_stats(self, user_id):
+        if user_id not in self._user_stats:
+            self._user_stats[user_id] = database.get_user_stats(user_id)
+        return self._user_stats[user_id]
+
+def begin_rerun_loader():
+    """Start a fresh loader for the current script run"""
+    _current_loader.set(RerunLoader())
+
+def end_rerun_loader():
+    """Drop the loader, so nothing read in this rerun is served to the next"""
+    _current_loader.set(None)
+
+def get_loader():
+    """The current rerun's loader; outside one (e.g. a fragment rerun) a throwaway loader that always reads"""
+    return _current_loader.get() or RerunLoader()
+
+def load_course(course_id):
+    """Get a course by ID, at most once per rerun"""
+    return get_loader().get_course(course_id)
+
+def load_courses(course_ids):
+    """Get several courses by ID in one query, at most once per rerun"""
+    return get_loader().get_courses(course_ids)
+
+def load_user_courses(user_id):
+    """Get all of a user's courses, at most once per rerun"""
+    return get_loader().get_user_courses(user_id)
+
+def load_user_stats(user_id):
+    """Get a user's dashboard totals, at most once per rerun"""
+    return get_loader().get_user_stats(user_id)
+
+def load_course_summaries(course_ids):
+    """Get the statistics of several courses by ID in one query, at most once per rerun"""
+    return get_loader().get_course_summaries(course_ids)
+
+def load_user_course_titles(user_id):
+    """Get the ID and title of each of a user's courses, at most once per rerun"""
+    return get_loader().get_user_course_titles(user_id)
+
+def load_user_course_summaries(user_id):
+    """Get the statistics of each of a user's courses, without their sections, at most once per rerun"""
+    return get_loader().get_user_course_summaries(user_id)
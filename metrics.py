@@ -0,0 +1,236 @@
+import os
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from instrumentation import add_span_listener
+
+logger = logging.getLogger(__name__)
+
+# Exporter settings: serve /metrics on a local port and/or write a textfile
+# for the node_exporter textfile collector
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE")
+METRICS_TEXTFILE_INTERVAL = float(os.getenv("METRICS_TEXTFILE_INTERVAL", "15"))
+
+# A session counts as active if it reran within this many seconds
+ACTIVE_SESSION_WINDOW = float(os.getenv("ACTIVE_SESSION_WINDOW", "300"))
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _escape(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonically increasing value per label combination"""
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets"""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            state = self._values.setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {key: {**state, "buckets": list(state["buckets"])} for key, state in self._values.items()}
+        for key, state in sorted(values.items()):
+            for bound, count in zip(self.buckets, state["buckets"]):
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', bound)])} {count}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {state['count']}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {state['sum']}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {state['count']}"
+
+class Gauge:
+    """Value computed at scrape time by a callback"""
+
+    type = "gauge"
+
+    def __init__(self, name, help, callback):
+        self.name = name
+        self.help = help
+        self.callback = callback
+
+    def samples(self):
+        yield f"{self.name} {self.callback()}"
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+DB_OPERATION_SECONDS = registry.register(Histogram(
+    "study_track_db_operation_seconds",
+    "Latency of database functions",
+    ["operation"]
+))
+BCRYPT_SECONDS = registry.register(Histogram(
+    "study_track_bcrypt_seconds",
+    "Duration of bcrypt password hashing and verification",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+))
+CACHE_REQUESTS = registry.register(Counter(
+    "study_track_cache_requests_total",
+    "In-process cache lookups by cache and result (hit or miss)",
+    ["cache", "result"]
+))
+RERUNS = registry.register(Counter(
+    "study_track_reruns_total",
+    "Script reruns per page",
+    ["page"]
+))
+
+_session_last_seen = {}
+_sessions_lock = threading.Lock()
+
+def _active_session_count():
+    """Sessions seen within the activity window; forgets sessions older than that"""
+    cutoff = time.monotonic() - ACTIVE_SESSION_WINDOW
+    with _sessions_lock:
+        for session_id in [sid for sid, seen in _session_last_seen.items() if seen < cutoff]:
+            del _session_last_seen[session_id]
+        return len(_session_last_seen)
+
+ACTIVE_SESSIONS = registry.register(Gauge(
+    "study_track_active_sessions",
+    f"Sessions that reran within the last {int(ACTIVE_SESSION_WINDOW)} seconds",
+    _active_session_count
+))
+
+def record_rerun(page, session_id):
+    """Count a rerun of `page` and mark the session as active"""
+    RERUNS.inc(page=page)
+    with _sessions_lock:
+        _session_last_seen[session_id] = time.monotonic()
+
+def record_cache_lookup(cache, hit):
+    """Count a hit or miss of an in-process cache"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+def _observe_span(category, name, seconds):
+    """Feed finished instrumentation spans into the latency histograms"""
+    if category == "db":
+        DB_OPERATION_SECONDS.observe(seconds, operation=name)
+    elif category == "bcrypt":
+        BCRYPT_SECONDS.observe(seconds, operation=name)
+
+add_span_listener(_observe_span)
+
+# Exporters
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the app log
+        pass
+
+def write_textfile(path):
+    """Atomically write the current metrics to `path`"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+def _textfile_loop(path, interval):
+    while True:
+        try:
+            write_textfile(path)
+        except OSError as e:
+            logger.error(f"Failed to write metrics textfile {path}: {e}")
+        time.sleep(interval)
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+def start_exporter():
+    """Start the configured exporters once per process; safe to call on every rerun"""
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+        if METRICS_PORT:
+            try:
+                server = ThreadingHTTPServer((METRICS_HOST, int(METRICS_PORT)), _MetricsHandler)
+            except OSError as e:
+                logger.error(f"Failed to start metrics endpoint on {METRICS_HOST}:{METRICS_PORT}: {e}")
+            else:
+                threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+                logger.info(f"Serving metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+        if METRICS_TEXTFILE:
+            threading.Thread(target=_textfile_loop, args=(METRICS_TEXTFILE, METRICS_TEXTFILE_INTERVAL),
+                             name="metrics-textfile", daemon=True).start()
+            logger.info(f"Writing metrics to {METRICS_TEXTFILE} every {METRICS_TEXTFILE_INTERVAL}s")
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import logging
+
+import database
+from components.course_handlers import calculate_course_statistics
+
+logger = logging.getLogger(__name__)
+
+def _recompute_statistics(course):
+    """Statistics recomputed in one place; older courses lack some or all of them"""
+    return calculate_course_statistics(course)
+
+# Precomputed 2x durations, replaced by playback speeds computed on read
+STORED_2X_FIELDS = ("total_duration_2x_minutes", "remaining_duration_2x_minutes")
+STORED_2X_VIDEO_FIELD = "duration_2x_minutes"
+
+def _without_2x_durations(sections):
+    return [{**section, "videos": [{key: value for key, value in video.items() if key != STORED_2X_VIDEO_FIELD}
+                                   for video in section.get("videos", [])]}
+            for section in sections]
+
+def _move_structure_to_catalog(course):
+    """Courses from before the catalog keep their structure embedded; move it to the shared catalog"""
+    if course.get("catalog_id"):
+        return {}
+    return database.store_course_structure(_without_2x_durations(course.get("sections", [])))
+
+def _drop_2x_durations(course):
+    """Durations at 2x are computed from the user's playback speeds now; drop the stored ones"""
+    fields = {field: None for field in STORED_2X_FIELDS if field in course}
+    sections = course.get("sections", [])
+    if any(STORED_2X_VIDEO_FIELD in video for section in sections for video in section.get("videos", [])):
+        fields.update(database.store_course_structure(_without_2x_durations(sections)))
+    return fields
+
+# (version, description, step). A course at schema_version N gets every step
+# above N in order. Steps get the course as the app reads it (joined with its
+# catalog structure) and return the fields to set; None removes a field.
+STEPS = [
+    (1, "recompute statistics", _recompute_statistics),
+    (2, "move structure to the catalog", _move_structure_to_catalog),
+    (3, "drop stored 2x durations", _drop_2x_durations),
+]
+
+assert STEPS[-1][0] == database.COURSE_SCHEMA_VERSION, "add a migration step for the new COURSE_SCHEMA_VERSION"
+
+def migrate_course(course, version=database.COURSE_SCHEMA_VERSION):
+    """Fields that bring a course document up to `version`"""
+    current = course.get("schema_version") or 0
+    fields = {}
+    for step_version, _, step in STEPS:
+        if current < step_version <= version:
+            fields.update(step(course))
+    fields["schema_version"] = version
+    return fields
+
+def _load_state(path, version):
+    """Saved cursor of an interrupted run towards `version`, or None"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("version") != version:
+        logger.warning(f"Ignoring migration state for version {state.get('version')} in {path}")
+        return None
+    return state
+
+def _save_state(path, state):
+    if not path:
+        return
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def migrate_courses(batch_size=500, state_path=None, restart=False, on_batch=None,
+                    version=database.COURSE_SCHEMA_VERSION):
+    """Bring every live course up to `version`, batch by batch in ID order
+
+    After each batch the cursor (last course ID) and counters are saved to
+    `state_path`, so an interrupted run resumes where it stopped. Courses
+    modified by the app while a batch was in flight are skipped and picked
+    up by the next run. `on_batch` gets a progress dict after every batch.
+    Returns the final counters.
+    """
+    state = None if restart else _load_state(state_path, version)
+    if state:
+        logger.info(f"Resuming migration to version {version} after course {state['after_id']}")
+    else:
+        state = {"version": version, "after_id": None, "scanned": 0, "migrated": 0, "skipped": 0}
+    remaining = database.count_courses_to_migrate(version)
+    scanned_at_start = state["scanned"]
+    start = time.perf_counter()
+
+    while True:
+        courses = database.get_courses_to_migrate(state["after_id"], batch_size, version)
+        if not courses:
+            break
+
+        updates = [(str(course["_id"]), course.get("updated_at"), migrate_course(course, version)) for course in courses]
+        written = database.bulk_update_courses(updates)
+        # Bulk writes bypass the summaries' incremental updates
+        for user_id in {course["user_id"] for course in courses}:
+            database.rebuild_user_stats(user_id)
+
+        state["after_id"] = str(courses[-1]["_id"])
+        state["scanned"] += len(courses)
+        state["migrated"] += written
+        state["skipped"] += len(courses) - written
+        _save_state(state_path, state)
+
+        if on_batch:
+            elapsed = time.perf_counter() - start
+            scanned = state["scanned"] - scanned_at_start
+            on_batch({**state, "remaining": max(remaining - scanned, 0), "elapsed": elapsed,
+                      "courses_per_second": scanned / elapsed if elapsed else 0.0})
+
+    if state_path and os.path.exists(state_path):
+        os.remove(state_path)
+    return state
@@ -0,0 +1,105 @@
+import bisect
+import datetime
+import math
+from itertools import accumulate
+
+class StudyPlan:
+    """Remaining videos of one or more courses in watch order, with prefix sums of their durations
+
+    Courses are watched one after the other, in the order given, each in
+    section and video order. Built once in O(videos); after that a finish
+    date is O(1) and what falls on a given day is a binary search, so
+    answering for every course or any day doesn't rescan the videos.
+
+    Positions are in minutes of content. Studying `daily_minutes` a day at
+    `speed` covers `daily_minutes * speed` minutes of content per day; day 0
+    is the first study day.
+    """
+
+    def __init__(self, courses):
+        self.videos = []
+        # Content minute at which each course's last remaining video ends, in watch
+        # order; None for a course with nothing left
+        self.course_ends = []
+        for course in courses:
+            first = len(self.videos)
+            for section_index, section in enumerate(course.get('sections', [])):
+                for video_index, video in enumerate(section.get('videos', [])):
+                    if not video.get('completed', False):
+                        self.videos.append({
+                            "course_id": str(course.get('_id')),
+                            "course_title": course.get('title', 'Untitled Course'),
+                            "section_index": section_index,
+                            "section_title": section.get('title', f'Section {section_index + 1}'),
+                            "video_index": video_index,
+                            "video_title": video.get('title', f'Video {video_index + 1}'),
+                            "duration_minutes": max(video.get('duration_minutes', 0) or 0, 0)
+                        })
+            end = len(self.videos) if len(self.videos) > first else None
+            self.course_ends.append((str(course.get('_id')), course.get('title', 'Untitled Course'), end))
+        # prefix[i] is where video i ends: the minutes of videos[0..i]
+        self.prefix = list(accumulate(video["duration_minutes"] for video in self.videos))
+        self.course_ends = [(course_id, title, None if end is None else self.prefix[end - 1])
+                            for course_id, title, end in self.course_ends]
+
+    @property
+    def total_minutes(self):
+        """Content minutes left across all courses"""
+        return self.prefix[-1] if self.prefix else 0.0
+
+    def _start(self, index):
+        return self.prefix[index - 1] if index else 0.0
+
+    @staticmethod
+    def _per_day(daily_minutes, speed):
+        per_day = daily_minutes * speed
+        if per_day <= 0:
+            raise ValueError("daily_minutes and speed must be positive")
+        return per_day
+
+    def days_to(self, position, daily_minutes, speed=1.0):
+        """Study days needed to reach `position` minutes into the plan"""
+        return math.ceil(round(position / self._per_day(daily_minutes, speed), 9))
+
+    def finish_date(self, daily_minutes, speed=1.0, start=None, position=None):
+        """Date the plan (or `position` minutes of it) is finished, or None when nothing is left"""
+        position = self.total_minutes if position is None else position
+        if position <= 0:
+            return None
+        start = start or datetime.date.today()
+        return start + datetime.timedelta(days=self.days_to(position, daily_minutes, speed) - 1)
+
+    def course_finish_dates(self, daily_minutes, speed=1.0, start=None):
+        """[(course_id, title, finish date or None when nothing is left)] in watch order"""
+        return [(course_id, title, None if end is None else self.finish_date(daily_minutes, speed, start, end))
+                for course_id, title, end in self.course_ends]
+
+    def day_slice(self, day, daily_minutes, speed=1.0):
+        """What to watch on study day `day`: [(video, from_minute, to_minute)] within each video
+
+        A video cut by the end of a day appears on both days, each with its part.
+        """
+        per_day = self._per_day(daily_minutes, speed)
+        window_start, window_end = day * per_day, (day + 1) * per_day
+        # First video ending at or after the window starts, so zero-length videos on the
+        # boundary are listed (one ending exactly there is cut to nothing below), through
+        # the one the window ends in; the last day also takes trailing zero-length videos
+        first = bisect.bisect_left(self.prefix, window_start)
+        if window_end >= self.total_minutes:
+            last = len(self.videos)
+        else:
+            last = min(bisect.bisect_left(self.prefix, window_end) + 1, len(self.videos))
+        parts = []
+        for index in range(first, last):
+            start = self._start(index)
+            from_minute = max(window_start - start, 0.0)
+            to_minute = min(window_end, self.prefix[index]) - start
+            if to_minute > from_minute or self.videos[index]["duration_minutes"] == 0:
+                parts.append((self.videos[index], round(from_minute, 1), round(to_minute, 1)))
+        return parts
+
+def plan_courses(courses, order="closest"):
+    """StudyPlan over `courses`: "closest" watches the course with the least time left first, "listed" keeps the order"""
+    if order == "closest":
+        courses = sorted(courses, key=lambda course: course.get('remaining_duration_minutes', 0) or 0)
+    return StudyPlan(courses)
@@ -0,0 +1,85 @@
+import os
+import io
+import re
+import time
+import pstats
+import cProfile
+import logging
+import datetime
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Set STUDY_TRACK_PROFILE=1 to profile every rerun; `?profile=1` profiles a single rerun
+PROFILE_ENV_VAR = "STUDY_TRACK_PROFILE"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+
+# Only one profiler can be active per process on newer Pythons, so concurrent
+# sessions asking for a profile take turns; the losers run unprofiled
+_profiler_lock = threading.Lock()
+
+def is_profiling_requested(query_params=None):
+    """True when this rerun should run under the profiler"""
+    if os.getenv(PROFILE_ENV_VAR, "").lower() in ("1", "true", "yes"):
+        return True
+    return bool(query_params) and query_params.get("profile") in ("1", "true")
+
+def profile_path(page):
+    """File for a new profile of `page`, named by page and timestamp"""
+    safe_page = re.sub(r"[^A-Za-z0-9_-]", "_", page)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(PROFILE_DIR, f"{safe_page}_{stamp}.prof")
+
+def top_hotspots(stats, limit=PROFILE_TOP_N):
+    """Functions with the most time spent in their own code"""
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "Function": function,
+            "Location": f"{os.path.basename(filename)}:{line}",
+            "Calls": calls,
+            "Own (ms)": round(tottime * 1000, 2),
+            "Cumulative (ms)": round(cumtime * 1000, 2)
+        })
+    rows.sort(key=lambda row: -row["Own (ms)"])
+    return rows[:limit]
+
+def profile_call(page, func, on_result):
+    """Run func() under cProfile, save the profile and pass a summary to on_result
+
+    The summary is delivered even if func raises (Streamlit's st.rerun() works by
+    raising), so the caller can keep it for display on the next rerun.
+    """
+    if not _profiler_lock.acquire(blocking=False):
+        logger.warning(f"Profiler busy, running {page} without profiling")
+        return func()
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+        try:
+            return func()
+        finally:
+            profiler.disable()
+    finally:
+        _profiler_lock.release()
+        elapsed = time.perf_counter() - start
+        path = profile_path(page)
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError as e:
+            logger.error(f"Failed to save profile to {path}: {e}")
+            path = None
+
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        logger.info(f"Profiled {page} rerun in {round(elapsed * 1000, 1)} ms, saved to {path}")
+        on_result({
+            "page": page,
+            "path": path,
+            "duration_ms": round(elapsed * 1000, 1),
+            "calls": stats.total_calls,
+            "hotspots": top_hotspots(stats)
+        })
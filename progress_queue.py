@@ -0,0 +1,221 @@
+import os
+import atexit
+import logging
+import datetime
+import threading
+
+from database import get_course_by_id, update_video_statuses, set_videos_completed
+from components.course_handlers import calculate_course_statistics, update_course_statistics
+
+logger = logging.getLogger(__name__)
+
+# Progress toggles are buffered and written by a background thread. Set
+# PROGRESS_WRITE_BEHIND=0 to write every toggle before the rerun completes.
+WRITE_BEHIND = os.getenv("PROGRESS_WRITE_BEHIND", "1").lower() in ("1", "true", "yes")
+FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "2"))
+FLUSH_BATCH_SIZE = int(os.getenv("PROGRESS_FLUSH_BATCH_SIZE", "50"))
+# Progress writes are retried on a fresh read this many times when other sessions keep changing the course
+SET_PROGRESS_ATTEMPTS = 3
+# How long a course's last save time is kept for the "Progress saved" caption
+FLUSHED_AT_RETENTION = datetime.timedelta(minutes=10)
+
+class ProgressQueue:
+    """Write-behind buffer of video completion changes
+
+    Changes are keyed by (course_id, section_index, video_index), so toggling
+    the same video repeatedly before a flush leaves only the last value. A
+    flush groups the changes by course and writes each course once.
+    """
+
+    def __init__(self, interval, batch_size):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._pending = {}
+        self._flushing = {}
+        self._owners = {}
+        self._flushed_at = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+        # Only one flush writes at a time, so an older value never lands after a newer one
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.coalesced = 0
+
+    def enqueue(self, user_id, course_id, section_index, video_index, completed):
+        """Buffer a change; returns immediately"""
+        key = (str(course_id), section_index, video_index)
+        with self._lock:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = completed
+            self._owners[key[0]] = user_id
+            size = len(self._pending)
+        self._start()
+        if size >= self.batch_size:
+            self._wakeup.set()
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="progress-flush", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def apply_pending(self, course):
+        """Overlay unsaved changes on a course loaded from the database; True if any applied"""
+        course_id = str(course.get("_id"))
+        with self._lock:
+            changes = [(key, completed) for source in (self._flushing, self._pending)
+                       for key, completed in source.items() if key[0] == course_id]
+        sections = course.get("sections", [])
+        for (_, section_index, video_index), completed in changes:
+            if section_index < len(sections) and video_index < len(sections[section_index].get("videos", [])):
+                sections[section_index]["videos"][video_index]["completed"] = completed
+        if changes:
+            update_course_statistics(course)
+        return bool(changes)
+
+    def durability(self, course_id):
+        """State of a course's progress: ("pending", count), ("failed", count) or ("flushed", time)"""
+        course_id = str(course_id)
+        with self._lock:
+            count = sum(1 for source in (self._flushing, self._pending) for key in source if key[0] == course_id)
+            if count:
+                return ("failed" if course_id in self._failed else "pending", count)
+            return ("flushed", self._flushed_at.get(course_id))
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending) + len(self._flushing)
+
+    def flush(self, user_id=None):
+        """Write buffered changes (only `user_id`'s when given); returns the number of courses written"""
+        with self._flush_lock:
+            with self._lock:
+                keys = [key for key in self._pending
+                        if user_id is None or self._owners.get(key[0]) == user_id]
+                for key in keys:
+                    self._flushing[key] = self._pending.pop(key)
+                # Other users' in-flight or failed changes are left to the background flush
+                batch = {key: completed for key, completed in self._flushing.items()
+                         if user_id is None or self._owners.get(key[0]) == user_id}
+
+            by_course = {}
+            for (course_id, section_index, video_index), completed in batch.items():
+                by_course.setdefault(course_id, []).append((section_index, video_index, completed))
+
+            written = 0
+            for course_id, changes in by_course.items():
+                try:
+                    self._write_course(course_id, changes)
+                except Exception as e:
+                    logger.error(f"Failed to save progress of course {course_id}, will retry: {e}")
+                    with self._lock:
+                        self._failed.add(course_id)
+                    continue
+                written += 1
+                with self._lock:
+                    for section_index, video_index, _ in changes:
+                        self._flushing.pop((course_id, section_index, video_index), None)
+                    self._failed.discard(course_id)
+                    self._flushed_at[course_id] = datetime.datetime.now()
+            self._forget_idle_courses()
+            return written
+
+    def _forget_idle_courses(self):
+        """Drop the owners of courses with nothing left to write, and save times past FLUSHED_AT_RETENTION"""
+        expired = datetime.datetime.now() - FLUSHED_AT_RETENTION
+        with self._lock:
+            busy = {key[0] for source in (self._pending, self._flushing) for key in source}
+            for course_id in [course_id for course_id in self._owners if course_id not in busy]:
+                del self._owners[course_id]
+            for course_id in [course_id for course_id, flushed_at in self._flushed_at.items() if flushed_at < expired]:
+                del self._flushed_at[course_id]
+
+    def _write_course(self, course_id, changes):
+        """Apply the changes to the stored course and save them with its recomputed statistics
+
+        The write only goes through if the course wasn't updated since it was
+        read, so a bulk change from another session isn't overwritten with
+        statistics computed before it; otherwise it is read again and retried.
+        """
+        for _ in range(SET_PROGRESS_ATTEMPTS):
+            course = get_course_by_id(course_id)
+            if course is None:
+                logger.warning(f"Dropping progress changes for missing course {course_id}")
+                return
+            sections = course.get("sections", [])
+            valid = [(section_index, video_index, completed) for section_index, video_index, completed in changes
+                     if section_index < len(sections) and video_index < len(sections[section_index].get("videos", []))]
+            for section_index, video_index, completed in valid:
+                sections[section_index]["videos"][video_index]["completed"] = completed
+            if update_video_statuses(course_id, valid, calculate_course_statistics(course), course.get("updated_at")):
+                return
+        # Kept queued; the next flush tries again
+        raise RuntimeError("the course kept changing while saving")
+
+progress_queue = ProgressQueue(FLUSH_INTERVAL, FLUSH_BATCH_SIZE)
+
+# Don't lose buffered clicks when the server shuts down cleanly
+atexit.register(progress_queue.flush)
+
+def queue_video_status(user_id, course_id, section_index, video_index, completed):
+    """Record a video completion change, written behind unless write-behind is disabled"""
+    progress_queue.enqueue(user_id, course_id, section_index, video_index, completed)
+    if not WRITE_BEHIND:
+        progress_queue.flush(user_id)
+
+def flush_user_progress(user_id):
+    """Write all of a user's buffered progress now, e.g. on logout"""
+    return progress_queue.flush(user_id)
+
+def _mark_videos(course, completed, section_index, video_count):
+    """Set the completed flags on a loaded course; returns its recomputed statistics"""
+    sections = course.get("sections", [])
+    for section in sections if section_index is None else sections[section_index:section_index + 1]:
+        videos = section.get("videos", [])
+        for video in videos if video_count is None else videos[:video_count]:
+            video["completed"] = completed
+    stats = calculate_course_statistics(course)
+    course.update(stats)
+    return stats
+
+def set_progress(user_id, course, completed, section_index=None, video_count=None):
+    """Complete or reset a whole course, one section or its first `video_count` videos
+
+    Written at once rather than queued; the user's buffered changes are
+    written first so they can't land on top of it later. The statistics are
+    computed from the loaded course, so the write only goes through if the
+    course wasn't updated since; otherwise it is read again and retried.
+    `course` is updated in place.
+    """
+    flush_user_progress(user_id)
+    course_id = str(course["_id"])
+    for _ in range(SET_PROGRESS_ATTEMPTS):
+        stats = _mark_videos(course, completed, section_index, video_count)
+        if set_videos_completed(course_id, completed, stats, section_index, video_count, course.get("updated_at")):
+            return True
+        stored = get_course_by_id(course_id)
+        if stored is None:
+            return False
+        course.clear()
+        course.update(stored)
+    logger.warning(f"Gave up setting progress of course {course_id}, it kept changing")
+    return False
+
+def apply_pending_progress(course):
+    """Show a course loaded from the database with its unsaved progress applied"""
+    if course:
+        progress_queue.apply_pending(course)
+    return course
+
+def progress_durability(course_id):
+    """(state, detail) of a course's progress; see ProgressQueue.durability"""
+    return progress_queue.durability(course_id)
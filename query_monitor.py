@@ -0,0 +1,129 @@
+import os
+import bson
+import json
+import logging
+import datetime
+import threading
+from collections import deque
+
+from pymongo import monitoring
+
+from instrumentation import current_rerun
+
+logger = logging.getLogger(__name__)
+
+# Commands at or above this duration are kept for inspection in the perf panel
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+
+# Commands whose repetition within one rerun means the same data was fetched twice
+READ_COMMANDS = {"find", "aggregate", "count", "countDocuments", "distinct"}
+
+# Driver/session fields that are not part of the query itself
+COMMAND_METADATA_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber",
+                           "$client", "readConcern", "writeConcern", "apiVersion"}
+
+def _query_signature(command_name, command):
+    """Canonical string identifying a read command's collection, filter and shape"""
+    parts = {key: value for key, value in command.items() if key not in COMMAND_METADATA_FIELDS}
+    return f"{command_name} " + json.dumps(parts, sort_keys=True, default=str)
+
+class QueryMonitor(monitoring.CommandListener):
+    """Records every command the app issues and keeps the slow ones for inspection
+
+    Re-encoding a command to measure it costs about as much as sending it, so
+    sizes are only measured for commands of perf-enabled reruns and, for the
+    reply, of slow commands; the byte totals cover the `sized` commands only.
+    """
+    
+    def __init__(self, slow_ms, max_slow_queries):
+        self.slow_ms = slow_ms
+        self.slow_queries = deque(maxlen=max_slow_queries)
+        self.stats = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+    
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name)
+        # Listeners run on the thread issuing the command, so this is the rerun that asked for it
+        rerun = current_rerun()
+        sized = rerun is not None and rerun.enabled
+        info = {
+            "command": event.command_name,
+            "database": event.database_name,
+            "collection": collection if isinstance(collection, str) else None,
+            "request_bytes": len(bson.encode(command)) if sized else None,
+            "body": {key: value for key, value in command.items() if key not in COMMAND_METADATA_FIELDS}
+        }
+        
+        if rerun is not None:
+            info["session_id"] = rerun.session_id
+            if rerun.enabled and event.command_name in READ_COMMANDS:
+                rerun.queries.append(_query_signature(event.command_name, command))
+        
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = info
+    
+    def succeeded(self, event):
+        self._finish(event, event.reply)
+    
+    def failed(self, event):
+        self._finish(event, None)
+    
+    def _finish(self, event, reply):
+        with self._lock:
+            info = self._pending.pop((event.connection_id, event.request_id), None)
+        if info is None:
+            return
+        
+        duration_ms = event.duration_micros / 1000
+        slow = duration_ms >= self.slow_ms
+        sized = info["request_bytes"] is not None
+        reply_bytes = len(bson.encode(reply)) if reply is not None and (sized or slow) else 0
+        documents = None
+        if reply is not None:
+            if "cursor" in reply:
+                batch = reply["cursor"].get("firstBatch", reply["cursor"].get("nextBatch", []))
+                documents = len(batch)
+            elif "n" in reply:
+                documents = reply["n"]
+        
+        key = (info["command"], info["collection"])
+        with self._lock:
+            entry = self.stats.setdefault(key, {"count": 0, "failed": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                "sized": 0, "request_bytes": 0, "reply_bytes": 0})
+            entry["count"] += 1
+            entry["failed"] += reply is None
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            if sized:
+                entry["sized"] += 1
+                entry["request_bytes"] += info["request_bytes"]
+                entry["reply_bytes"] += reply_bytes
+        
+        if slow:
+            body = info.pop("body")
+            self.slow_queries.append({
+                **info,
+                "time": datetime.datetime.utcnow(),
+                "duration_ms": round(duration_ms, 3),
+                "reply_bytes": reply_bytes,
+                "documents": documents,
+                "filter": body.get("filter", body.get("q", body.get("query"))),
+                "body": body,
+                "failed": reply is None
+            })
+            logger.warning(f"Slow MongoDB {info['command']} on {info['collection']}: {round(duration_ms, 1)} ms")
+    
+    def get_stats(self):
+        """Totals per (command, collection) since startup"""
+        with self._lock:
+            return {key: dict(entry) for key, entry in self.stats.items()}
+    
+    def get_slow_queries(self, session_id=None):
+        """Captured slow commands, newest first, optionally only those issued by one session"""
+        return [entry for entry in reversed(self.slow_queries)
+                if session_id is None or entry.get("session_id") == session_id]
+
+query_monitor = QueryMonitor(SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE)
@@ -0,0 +1,154 @@
+import datetime
+import logging
+
+import pymongo
+
+import database
+from storage.mongo import LIVE, DIRTY_USER_KIND
+
+logger = logging.getLogger(__name__)
+
+# Documents of the reports collection: per-(user, platform, completion bucket)
+# rollups of the courses, the watermark of the last refresh, and the users
+# flagged by the storage when their courses are deleted, restored or purged
+ROLLUP_KIND = "course_rollup"
+WATERMARK_ID = "course_rollup_watermark"
+
+# Courses per completion decile; finished courses get a bucket of their own
+COMPLETION_BUCKET = {"$cond": [
+    {"$gte": [{"$ifNull": ["$completion_percentage", 0]}, 100]},
+    100,
+    {"$multiply": [{"$floor": {"$divide": [{"$ifNull": ["$completion_percentage", 0]}, 10]}}, 10]}
+]}
+
+def _mongo():
+    storage = database.get_storage()
+    if storage.name != "mongo":
+        raise RuntimeError(f"Admin reports run MongoDB aggregations; STORAGE_BACKEND is {storage.name}")
+    return storage
+
+def _aggregate(collection, pipeline, batch_size=1000):
+    """Stream an aggregation's results; stages may spill to disk instead of failing at the memory limit"""
+    return collection.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size)
+
+def active_users(days=30, now=None):
+    """Users with a course updated in the last `days` days, most recently active first"""
+    storage = _mongo()
+    since = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=days)
+    return _aggregate(storage.courses, [
+        {"$match": {"updated_at": {"$gte": since}, **LIVE}},
+        {"$group": {"_id": "$user_id", "courses_updated": {"$sum": 1}, "last_active": {"$max": "$updated_at"}}},
+        {"$sort": {"last_active": pymongo.DESCENDING}},
+        # Course user_ids are strings; the users' _id is an ObjectId
+        {"$lookup": {"from": storage.users.name, "let": {"user_id": {"$toObjectId": "$_id"}},
+                     "pipeline": [{"$match": {"$expr": {"$eq": ["$_id", "$$user_id"]}}},
+                                  {"$project": {"_id": 0, "email": 1, "name": 1}}],
+                     "as": "user"}},
+        {"$project": {"_id": 0, "user_id": "$_id", "email": {"$first": "$user.email"}, "name": {"$first": "$user.name"},
+                      "courses_updated": 1, "last_active": 1}}
+    ])
+
+def largest_documents(collection="courses", limit=20):
+    """The `limit` biggest documents of a collection by BSON size"""
+    storage = _mongo()
+    return _aggregate(storage.db[collection], [
+        {"$project": {"title": 1, "user_id": 1, "email": 1, "bytes": {"$bsonSize": "$$ROOT"}}},
+        {"$sort": {"bytes": pymongo.DESCENDING}},
+        {"$limit": limit},
+        {"$project": {"_id": {"$toString": "$_id"}, "bytes": 1, "title": 1, "user_id": 1, "email": 1}}
+    ])
+
+def _merge_rollups(storage, match):
+    """Recompute the rollups of the courses matching `match` into the reports collection, server-side"""
+    storage.courses.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "platform": {"$toLower": {"$ifNull": ["$platform", "other"]}},
+                    "bucket": COMPLETION_BUCKET},
+            "courses": {"$sum": 1},
+            "total_videos": {"$sum": {"$ifNull": ["$total_videos", 0]}},
+            "completed_videos": {"$sum": {"$ifNull": ["$completed_videos", 0]}},
+            "total_minutes": {"$sum": {"$ifNull": ["$total_duration_minutes", 0]}},
+            "remaining_minutes": {"$sum": {"$ifNull": ["$remaining_duration_minutes", 0]}}
+        }},
+        {"$set": {"kind": ROLLUP_KIND}},
+        {"$merge": {"into": database.REPORTS_COLLECTION, "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ], allowDiskUse=True)
+
+def refresh_rollups(full=False, batch_size=5000, now=None):
+    """Bring the cached course rollups up to date; returns (users refreshed, or None for everyone, watermark)
+
+    Only users with a course updated since the last refresh, or flagged since
+    by a delete, restore or purge, are recomputed, `batch_size` users per
+    aggregation. `full` recomputes everyone, e.g. after editing courses
+    directly in the database.
+    """
+    storage = _mongo()
+    reports = storage.db[database.REPORTS_COLLECTION]
+    # Taken before reading, so a course changed during the refresh is picked up next time;
+    # in whole milliseconds like the stored dates, so a flag set in the same one is kept
+    started_at = now or datetime.datetime.utcnow()
+    started_at = started_at.replace(microsecond=started_at.microsecond // 1000 * 1000)
+    watermark = None if full else reports.find_one({"_id": WATERMARK_ID})
+
+    if watermark is None:
+        user_ids = None
+        reports.delete_many({"kind": ROLLUP_KIND})
+        _merge_rollups(storage, dict(LIVE))
+    else:
+        # Deletes, restores and purges don't touch updated_at (a purged course is
+        # gone altogether), so their users come from the flags instead
+        changed = _aggregate(storage.courses, [
+            {"$match": {"updated_at": {"$gt": watermark["refreshed_at"]}}},
+            {"$group": {"_id": "$user_id"}}
+        ])
+        flagged = reports.find({"kind": DIRTY_USER_KIND}, {"_id": 1})
+        user_ids = list(dict.fromkeys([*(row["_id"] for row in changed),
+                                       *(row["_id"][DIRTY_USER_KIND] for row in flagged)]))
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            reports.delete_many({"kind": ROLLUP_KIND, "_id.user_id": {"$in": batch}})
+            _merge_rollups(storage, {"user_id": {"$in": batch}, **LIVE})
+
+    # Flags set while refreshing stay for the next run
+    reports.delete_many({"kind": DIRTY_USER_KIND, "marked_at": {"$lt": started_at}})
+    reports.replace_one({"_id": WATERMARK_ID}, {"refreshed_at": started_at}, upsert=True)
+    logger.info(f"Refreshed report rollups of {'all' if user_ids is None else len(user_ids)} users")
+    return user_ids, started_at
+
+def platforms():
+    """Courses, users, videos and completion per platform, from the cached rollups"""
+    reports = _mongo().db[database.REPORTS_COLLECTION]
+    return _aggregate(reports, [
+        {"$match": {"kind": ROLLUP_KIND}},
+        # Per user first, so users are counted without collecting them into one array
+        {"$group": {"_id": {"platform": "$_id.platform", "user_id": "$_id.user_id"},
+                    "courses": {"$sum": "$courses"}, "total_videos": {"$sum": "$total_videos"},
+                    "completed_videos": {"$sum": "$completed_videos"}, "total_minutes": {"$sum": "$total_minutes"},
+                    "remaining_minutes": {"$sum": "$remaining_minutes"}}},
+        {"$group": {"_id": "$_id.platform", "users": {"$sum": 1}, "courses": {"$sum": "$courses"},
+                    "total_videos": {"$sum": "$total_videos"}, "completed_videos": {"$sum": "$completed_videos"},
+                    "total_minutes": {"$sum": "$total_minutes"}, "remaining_minutes": {"$sum": "$remaining_minutes"}}},
+        {"$sort": {"courses": pymongo.DESCENDING}},
+        {"$project": {"_id": 0, "platform": "$_id", "users": 1, "courses": 1, "total_videos": 1, "completed_videos": 1,
+                      "completion_percentage": {"$round": [{"$multiply": [
+                          {"$divide": ["$completed_videos", {"$max": ["$total_videos", 1]}]}, 100]}, 1]},
+                      "total_hours": {"$round": [{"$divide": ["$total_minutes", 60]}, 1]},
+                      "remaining_hours": {"$round": [{"$divide": ["$remaining_minutes", 60]}, 1]}}}
+    ])
+
+def completion_distribution():
+    """Courses per completion decile (100 = finished), from the cached rollups"""
+    reports = _mongo().db[database.REPORTS_COLLECTION]
+    return _aggregate(reports, [
+        {"$match": {"kind": ROLLUP_KIND}},
+        {"$group": {"_id": "$_id.bucket", "courses": {"$sum": "$courses"},
+                    "remaining_minutes": {"$sum": "$remaining_minutes"}}},
+        {"$sort": {"_id": pymongo.ASCENDING}},
+        {"$project": {"_id": 0,
+                      "completion": {"$cond": [{"$eq": ["$_id", 100]}, "100%",
+                                               {"$concat": [{"$toString": "$_id"}, "-",
+                                                            {"$toString": {"$add": ["$_id", 9]}}, "%"]}]},
+                      "courses": 1,
+                      "avg_remaining_minutes": {"$round": [{"$divide": ["$remaining_minutes", "$courses"]}, 1]}}}
+    ])
@@ -0,0 +1,82 @@
+"""Cross-user reports for operating Study Track (MongoDB only)
+
+Runs aggregation pipelines (allowed to spill to disk) and streams the rows
+to CSV or NDJSON. The per-platform and completion reports read rollups
+cached in the reports collection; each run first refreshes the rollups of
+users whose courses changed since the previous run.
+
+Usage:
+    python scripts/admin_reports.py active-users --days 7
+    python scripts/admin_reports.py platforms --format ndjson
+    python scripts/admin_reports.py completion --output completion.csv
+    python scripts/admin_reports.py completion --full      # recompute every rollup
+    python scripts/admin_reports.py largest --collection course_catalog --limit 10
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Study Track admin reports")
+    parser.add_argument("report", choices=["active-users", "platforms", "completion", "largest"])
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--output", help="write here instead of stdout")
+    parser.add_argument("--days", type=int, default=30, help="active-users: activity window in days")
+    parser.add_argument("--collection", default="courses", help="largest: collection to measure")
+    parser.add_argument("--limit", type=int, default=20, help="largest: documents to list")
+    parser.add_argument("--full", action="store_true", help="platforms/completion: recompute every cached rollup")
+    return parser.parse_args()
+
+def _value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+def write_rows(rows, out, output_format):
+    """Write rows as they arrive; CSV columns come from the first row. Returns the row count"""
+    count = 0
+    writer = None
+    for row in rows:
+        row = {key: _value(value) for key, value in row.items()}
+        if output_format == "ndjson":
+            out.write(json.dumps(row, default=str) + "\n")
+        else:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(row), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow(row)
+        count += 1
+    return count
+
+def main():
+    args = parse_args()
+    import reports
+
+    try:
+        if args.report == "active-users":
+            rows = reports.active_users(args.days)
+        elif args.report == "largest":
+            rows = reports.largest_documents(args.collection, args.limit)
+        else:
+            user_ids, refreshed_at = reports.refresh_rollups(full=args.full)
+            print(f"Rollups refreshed for {'all' if user_ids is None else len(user_ids)} users "
+                  f"(as of {refreshed_at:%Y-%m-%d %H:%M:%S} UTC)", file=sys.stderr)
+            rows = reports.platforms() if args.report == "platforms" else reports.completion_distribution()
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        count = write_rows(rows, out, args.format)
+    finally:
+        if args.output:
+            out.close()
+    print(f"{count} rows", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Find (and optionally repair) courses whose stored statistics have drifted
+
+Streams every live course, recomputes its statistics in a process pool with
+calculate_course_statistics and compares them with the stored fields
+(completed_videos, remaining_duration_minutes, sections_completed, ...).
+Mismatches are written as an NDJSON repair plan, one course per line, which
+can be reviewed and applied later with bulk writes.
+
+Usage:
+    python scripts/check_course_stats.py                           # report only
+    python scripts/check_course_stats.py --plan repair.ndjson      # also write the repair plan
+    python scripts/check_course_stats.py --repair                  # check, then apply the plan
+    python scripts/check_course_stats.py --apply repair.ndjson     # apply a reviewed plan
+"""
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_PLAN = "data/course_stats_repair.ndjson"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check Study Track course statistics against recomputed values")
+    parser.add_argument("--workers", type=int, help="checker processes (default: one per CPU, 0 checks in-process)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="courses read from the database at a time")
+    parser.add_argument("--chunk-size", type=int, default=200, help="courses per task sent to a worker")
+    parser.add_argument("--plan", help=f"write the repair plan here (default with --repair: {DEFAULT_PLAN})")
+    parser.add_argument("--repair", action="store_true", help="apply the repair plan after checking")
+    parser.add_argument("--apply", metavar="PLAN", help="apply an existing repair plan instead of checking")
+    parser.add_argument("--show", type=int, default=5, help="mismatches to print as examples")
+    return parser.parse_args()
+
+def apply(path):
+    import consistency
+    written, skipped = consistency.apply_plan(consistency.read_plan(path))
+    print(f"Repaired {written} courses, skipped {skipped} changed since the check")
+
+def main():
+    args = parse_args()
+    if args.apply:
+        apply(args.apply)
+        return
+
+    import consistency
+    plan_path = args.plan or (DEFAULT_PLAN if args.repair else None)
+    if plan_path and os.path.dirname(plan_path):
+        os.makedirs(os.path.dirname(plan_path), exist_ok=True)
+    plan = open(plan_path, "w") if plan_path else None
+    shown = 0
+
+    def on_mismatch(course_id, user_id, updated_at, fields):
+        nonlocal shown
+        if plan:
+            plan.write(json.dumps(consistency.plan_entry(course_id, user_id, updated_at, fields), default=str) + "\n")
+        if shown < args.show:
+            shown += 1
+            print(f"  {course_id}: " + ", ".join(f"{field} {stored} != {expected}"
+                                                   for field, (stored, expected) in fields.items()))
+
+    def on_progress(summary):
+        rate = summary["checked"] / summary["elapsed"] if summary["elapsed"] else 0
+        print(f"{summary['checked']} checked, {summary['mismatched']} mismatched, {rate:.0f} courses/s",
+              file=sys.stderr, flush=True)
+
+    try:
+        summary = consistency.check_all(args.workers, args.batch_size, args.chunk_size, on_mismatch, on_progress)
+    finally:
+        if plan:
+            plan.close()
+
+    print(f"Checked {summary['checked']} courses in {summary['elapsed']:.1f}s: {summary['mismatched']} mismatched")
+    for field, count in sorted(summary["fields"].items(), key=lambda item: -item[1]):
+        print(f"  {field:<32} {count}")
+    if plan_path:
+        print(f"Repair plan written to {plan_path}")
+    if args.repair and summary["mismatched"]:
+        apply(plan_path)
+
+if __name__ == "__main__":
+    main()
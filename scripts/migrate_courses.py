@@ -0,0 +1,53 @@
+"""Upgrade course documents to the current schema version
+
+Scans the courses in batches, applies the steps in migrations.py to every
+course whose `schema_version` is missing or older, and writes each batch in
+one bulk write. The cursor is saved after every batch: rerunning the script
+after an interruption resumes where it stopped.
+
+Usage:
+    python scripts/migrate_courses.py --status
+    python scripts/migrate_courses.py --batch-size 1000
+    python scripts/migrate_courses.py --restart
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Migrate Study Track courses to the current schema version")
+    parser.add_argument("--batch-size", type=int, default=500, help="courses read and written per batch")
+    parser.add_argument("--state", default="data/migrate_courses.json", help="where the resumable cursor is kept")
+    parser.add_argument("--restart", action="store_true", help="ignore a saved cursor and start from the first course")
+    parser.add_argument("--status", action="store_true", help="only print how many courses need migrating")
+    return parser.parse_args()
+
+def print_progress(progress):
+    done = progress["scanned"]
+    total = done + progress["remaining"]
+    rate = progress["courses_per_second"]
+    eta = progress["remaining"] / rate if rate else 0
+    print(f"{done}/{total} courses ({done / total * 100 if total else 100:.0f}%), "
+          f"{progress['migrated']} migrated, {progress['skipped']} skipped, "
+          f"{rate:.0f} courses/s, ETA {eta:.0f}s", flush=True)
+
+def main():
+    args = parse_args()
+    import database
+    import migrations
+
+    version = database.COURSE_SCHEMA_VERSION
+    pending = database.count_courses_to_migrate(version)
+    print(f"{pending} courses below schema version {version}")
+    if args.status or not pending:
+        return
+
+    for step_version, description, _ in migrations.STEPS:
+        print(f"  v{step_version}: {description}")
+    result = migrations.migrate_courses(args.batch_size, args.state, restart=args.restart, on_batch=print_progress)
+    print(f"Done: {result['migrated']} migrated, {result['skipped']} skipped (changed during the run; rerun to retry)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Permanently remove deleted courses whose undo window has passed
+
+Meant for cron at off-peak hours, with the in-app purge disabled
+(COURSE_PURGE_INTERVAL=0). Deletes in batches with a pause in between.
+
+Usage:
+    python scripts/purge_deleted_courses.py
+    python scripts/purge_deleted_courses.py --batch-size 500 --pause 1 --max-batches 100
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Purge deleted Study Track courses")
+    parser.add_argument("--batch-size", type=int, help="courses per delete (default: COURSE_PURGE_BATCH_SIZE)")
+    parser.add_argument("--pause", type=float, help="seconds between batches (default: COURSE_PURGE_PAUSE)")
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches (default: until done)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    import course_purge
+    
+    purged = course_purge.purge(
+        batch_size=args.batch_size or course_purge.PURGE_BATCH_SIZE,
+        pause=course_purge.PURGE_PAUSE if args.pause is None else args.pause,
+        max_batches=args.max_batches
+    )
+    print(f"Purged {purged} deleted courses")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Recompute the per-user summary documents from the courses
+
+Repairs drift between `user_stats` and the courses, e.g. after a crash
+between a course write and its summary update, or after editing courses
+directly in the database.
+
+Usage:
+    python scripts/rebuild_user_stats.py
+    python scripts/rebuild_user_stats.py --email someone@example.com
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rebuild Study Track user summaries")
+    parser.add_argument("--email", help="only rebuild this user's summary (default: all users)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    import database
+    
+    if args.email:
+        user = database.get_user_by_email(args.email)
+        if not user:
+            sys.exit(f"No user with email {args.email}")
+        user_id = str(user["_id"])
+        storage = database.get_storage()
+        before = storage.get_user_stats(user_id)
+        database.rebuild_user_stats(user_id)
+        after = storage.get_user_stats(user_id)
+        print(f"Rebuilt summary of {args.email}" + (" (it had drifted)" if before != after else ""))
+    else:
+        count = database.rebuild_user_stats()
+        print(f"Rebuilt summaries of {count} users")
+
+if __name__ == "__main__":
+    main()
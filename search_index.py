@@ -0,0 +1,135 @@
+import re
+import math
+import bisect
+import threading
+from collections import OrderedDict
+
+from database import get_user_course_outlines, get_user_courses_fingerprint
+from instrumentation import traced
+from metrics import record_cache_lookup
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Matches in a course title count more than matches in a video title
+FIELD_WEIGHTS = {
+    "course": 3.0,
+    "section": 2.0,
+    "video": 1.0,
+    "description": 0.5
+}
+
+# Number of users whose index is kept in memory
+INDEX_CACHE_SIZE = 256
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens of a string"""
+    return TOKEN_PATTERN.findall(str(text or "").lower())
+
+class SearchIndex:
+    """Inverted index over one user's course, section and video titles"""
+
+    def __init__(self, courses):
+        self.entries = []
+        self.postings = {}
+
+        for course in courses:
+            course_id = str(course["_id"])
+            course_title = course.get("title", "Untitled Course")
+            self._add(course_id, course_title, "course", course_title)
+            self._add(course_id, course_title, "description", course.get("description", ""))
+
+            for section_index, section in enumerate(course.get("sections", [])):
+                section_title = section.get("title", f"Section {section_index + 1}")
+                self._add(course_id, course_title, "section", section_title, section_index, section_title)
+
+                for video_index, video in enumerate(section.get("videos", [])):
+                    self._add(course_id, course_title, "video", video.get("title", ""),
+                              section_index, section_title, video_index)
+
+        # Sorted vocabulary for prefix lookups while the user is still typing
+        self.vocabulary = sorted(self.postings)
+
+    def _add(self, course_id, course_title, kind, text, section_index=None, section_title=None, video_index=None):
+        tokens = set(tokenize(text))
+        if not tokens:
+            return
+        entry_id = len(self.entries)
+        self.entries.append({
+            "course_id": course_id,
+            "course_title": course_title,
+            "kind": kind,
+            "text": text,
+            "section_index": section_index,
+            "section_title": section_title,
+            "video_index": video_index
+        })
+        for token in tokens:
+            self.postings.setdefault(token, []).append(entry_id)
+
+    def _matching_entries(self, prefix):
+        """Entry ids containing a token that starts with `prefix`"""
+        matches = set()
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.update(self.postings[token])
+        return matches
+
+    def search(self, query, limit=20):
+        """Entries matching every query term (as a word prefix), best first"""
+        terms = tokenize(query)
+        if not terms or not self.entries:
+            return []
+
+        scores = None
+        for term in terms:
+            matches = self._matching_entries(term)
+            # Rare terms are more telling than ones that appear everywhere
+            idf = math.log(1 + len(self.entries) / (1 + len(matches)))
+            term_scores = {entry_id: idf for entry_id in matches}
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {entry_id: score + term_scores[entry_id]
+                          for entry_id, score in scores.items() if entry_id in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(
+            scores.items(),
+            key=lambda item: (-item[1] * FIELD_WEIGHTS[self.entries[item[0]]["kind"]],
+                              len(self.entries[item[0]]["text"]))
+        )
+        return [{**self.entries[entry_id], "score": round(score * FIELD_WEIGHTS[self.entries[entry_id]["kind"]], 3)}
+                for entry_id, score in ranked[:limit]]
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+@traced("search")
+def get_search_index(user_id):
+    """Search index for a user, rebuilt only when their courses changed"""
+    fingerprint = get_user_courses_fingerprint(user_id)
+
+    with _index_lock:
+        cached = _index_cache.get(user_id)
+        if cached and cached[0] == fingerprint:
+            _index_cache.move_to_end(user_id)
+            record_cache_lookup("search_index", True)
+            return cached[1]
+
+    record_cache_lookup("search_index", False)
+    index = SearchIndex(get_user_course_outlines(user_id))
+
+    with _index_lock:
+        _index_cache[user_id] = (fingerprint, index)
+        _index_cache.move_to_end(user_id)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+@traced("search")
+def search_courses(user_id, query, limit=20):
+    """Ranked course, section and video matches for a user's query"""
+    return get_search_index(user_id).search(query, limit)
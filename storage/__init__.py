@@ -0,0 +1,14 @@
+from storage.base import StorageBackend
+
+# Backends are imported on demand, so only the selected one loads its driver
+BACKENDS = ("mongo", "sqlite")
+
+def create_storage(backend, **options):
+    """Create the storage backend named `backend` ("mongo" or "sqlite")"""
+    if backend == "mongo":
+        from storage.mongo import MongoStorage
+        return MongoStorage(**options)
+    if backend == "sqlite":
+        from storage.sqlite import SQLiteStorage
+        return SQLiteStorage(**options)
+    raise ValueError(f"Unknown storage backend {backend!r}, expected one of {', '.join(BACKENDS)}")
@@ -0,0 +1,222 @@
+from abc import ABC, abstractmethod
+
+# Per-user summary maintained next to the courses (see StorageBackend.get_user_stats)
+USER_STATS_COUNTERS = ["courses", "completed_courses", "total_videos", "completed_videos",
+                       "total_duration_minutes", "completed_duration_minutes"]
+# Course fields the summary is derived from
+COURSE_STATS_FIELDS = ["platform", "total_videos", "completed_videos",
+                       "total_duration_minutes", "completed_duration_minutes"]
+
+# Top-level fields of a course's summary projection (no sections)
+COURSE_SUMMARY_FIELDS = ["title", "platform", "total_videos", "completed_videos", "completion_percentage",
+                         "total_duration_minutes", "completed_duration_minutes", "remaining_duration_minutes",
+                         "sections_completed", "sections_total"]
+
+def course_stats_contribution(course):
+    """What one course adds to its user's summary, as flat (dotted) counter names"""
+    total_videos = course.get("total_videos", 0) or 0
+    completed_videos = course.get("completed_videos", 0) or 0
+    return {
+        "courses": 1,
+        "completed_courses": int(total_videos > 0 and completed_videos >= total_videos),
+        "total_videos": total_videos,
+        "completed_videos": completed_videos,
+        "total_duration_minutes": course.get("total_duration_minutes", 0) or 0,
+        "completed_duration_minutes": course.get("completed_duration_minutes", 0) or 0,
+        f"platforms.{(course.get('platform') or 'other').lower()}": 1
+    }
+
+def user_stats_delta(before=None, after=None):
+    """Counter increments for a course changing from `before` to `after` (None if absent)"""
+    delta = dict(course_stats_contribution(after)) if after is not None else {}
+    if before is not None:
+        for key, value in course_stats_contribution(before).items():
+            delta[key] = delta.get(key, 0) - value
+    return {key: value for key, value in delta.items() if value}
+
+def apply_user_stats_delta(stats, delta):
+    """Apply flat counter increments to a user summary document in place"""
+    for key, value in delta.items():
+        if key.startswith("platforms."):
+            platforms = stats.setdefault("platforms", {})
+            platform = key.split(".", 1)[1]
+            platforms[platform] = platforms.get(platform, 0) + value
+            if not platforms[platform]:
+                del platforms[platform]
+        else:
+            stats[key] = stats.get(key, 0) + value
+    return stats
+
+def build_user_stats(courses):
+    """Summary of a user's courses computed from scratch"""
+    stats = {key: 0 for key in USER_STATS_COUNTERS}
+    stats["platforms"] = {}
+    for course in courses:
+        apply_user_stats_delta(stats, course_stats_contribution(course))
+    return stats
+
+class StorageBackend(ABC):
+    """Interface the data-access functions in `database` go through
+
+    Documents are plain dicts shaped like the MongoDB documents the app has
+    always used (nested sections/videos, `_id`, stats fields), whatever the
+    backend stores underneath. Course and user IDs are passed as strings.
+    Courses added since the catalog split have a `catalog_id` and only
+    progress in `sections`; `database` joins them with the catalog structure
+    (see storage/catalog.py).
+    """
+
+    name = "base"
+
+    # Users
+
+    @abstractmethod
+    def insert_user(self, user):
+        """Insert a user document; return its ID, or None if the email is taken (ignoring case)
+
+        Any other failure raises.
+        """
+
+    @abstractmethod
+    def get_user_by_email(self, email, fields=None):
+        """Get a user document by email, ignoring case, or None; only `fields` (and _id) when given"""
+
+    @abstractmethod
+    def update_user(self, user_id, fields):
+        """Set top-level fields of a user; return True if the user exists"""
+
+    # Courses
+
+    @abstractmethod
+    def insert_course(self, course):
+        """Insert a course document and return its ID, or None if it already exists"""
+
+    @abstractmethod
+    def get_user_courses(self, user_id):
+        """Get all course documents of a user"""
+
+    @abstractmethod
+    def get_user_course_outlines(self, user_id):
+        """Get a user's courses with only _id, title, description and section/video titles"""
+
+    @abstractmethod
+    def get_user_courses_fingerprint(self, user_id):
+        """Get (course count, latest updated_at) of a user's courses"""
+
+    @abstractmethod
+    def get_course_by_id(self, course_id):
+        """Get a course document by ID, or None"""
+
+    @abstractmethod
+    def get_courses_by_ids(self, course_ids):
+        """Get the live courses with the given IDs in one query, in no particular order"""
+
+    @abstractmethod
+    def get_course_summaries(self, course_ids):
+        """COURSE_SUMMARY_FIELDS of the live courses with the given IDs, in one query without their sections"""
+
+    @abstractmethod
+    def get_user_course_summaries(self, user_id):
+        """COURSE_SUMMARY_FIELDS of a user's live courses without their sections, most recently updated first"""
+
+    @abstractmethod
+    def get_user_course_titles(self, user_id):
+        """_id and title of a user's live courses, most recently updated first"""
+
+    @abstractmethod
+    def update_course(self, course_id, fields):
+        """Set top-level fields of a course (`sections` replaces the whole structure)"""
+
+    @abstractmethod
+    def soft_delete_course(self, course_id, deleted_at):
+        """Mark a course deleted; return True if it was live
+
+        Deleted courses are left out of every read and of the user's summary
+        until they are restored or purged.
+        """
+
+    @abstractmethod
+    def restore_course(self, course_id, deleted_since):
+        """Undo a soft delete made at or after `deleted_since`; return True if restored"""
+
+    @abstractmethod
+    def purge_deleted_courses(self, deleted_before, limit):
+        """Delete for good up to `limit` courses soft-deleted before `deleted_before`; returns how many"""
+
+    @abstractmethod
+    def update_video_status(self, course_id, section_index, video_index, completed, updated_at):
+        """Set the completed flag of one video"""
+
+    @abstractmethod
+    def update_video_statuses(self, course_id, changes, fields, expected_updated_at=None):
+        """Set the completed flag of several videos and top-level `fields` in one write
+
+        `changes` is a list of (section_index, video_index, completed). With
+        `expected_updated_at`, a course updated since it was read no longer
+        matches and nothing is written. Returns True if written.
+        """
+
+    @abstractmethod
+    def set_videos_completed(self, course_id, completed, fields, section_index=None, video_count=None,
+                             expected_updated_at=None):
+        """Set the completed flag of every video, of one section's videos or of its first `video_count`, in one write
+
+        Top-level `fields` (the recomputed statistics) are written together
+        with the flags. With `expected_updated_at`, a course updated since it
+        was read no longer matches and nothing is written. Returns True if written.
+        """
+
+    # Scans and migrations (live courses only, in ID order)
+
+    @abstractmethod
+    def get_courses_after(self, after_id, limit):
+        """Up to `limit` courses with IDs after `after_id` (None to start from the first)"""
+
+    @abstractmethod
+    def count_courses_below_version(self, version):
+        """Count courses whose schema_version is missing or lower than `version`"""
+
+    @abstractmethod
+    def get_courses_below_version(self, version, after_id, limit):
+        """Up to `limit` courses below `version` with IDs after `after_id` (None to start from the first)"""
+
+    @abstractmethod
+    def bulk_update_courses(self, updates):
+        """Set fields of many courses; returns how many were written
+
+        `updates` is a list of (course_id, expected_updated_at, fields); a
+        None value removes the field. A course updated since it was read no
+        longer matches and is skipped.
+        Fields are written as given: callers rebuild the affected user
+        summaries if statistics changed.
+        """
+
+    # Catalog
+
+    @abstractmethod
+    def insert_catalog_structure(self, catalog_id, structure):
+        """Store a course structure under its fingerprint; a no-op if it is already there"""
+
+    @abstractmethod
+    def get_catalog_structures(self, catalog_ids):
+        """Get {catalog_id: structure} for the given IDs; missing IDs are left out"""
+
+    # User summaries
+
+    @abstractmethod
+    def get_user_stats(self, user_id):
+        """Get the summary of a user's courses (counters plus `platforms` counts), or None
+
+        Backends keep it in step with insert_course, update_course,
+        update_video_statuses, soft_delete_course and restore_course.
+        """
+
+    @abstractmethod
+    def rebuild_user_stats(self, user_id=None):
+        """Recompute the summary of one user, or of all users, from their courses; returns users rebuilt"""
+
+    # Maintenance
+
+    @abstractmethod
+    def drop(self):
+        """Remove all data of this backend (used by benchmarks and tests)"""
@@ -0,0 +1,47 @@
+import json
+import hashlib
+
+# A course is stored as a shared catalog structure (sections and videos
+# without progress) plus a per-user enrollment whose `sections` only hold the
+# completed flags: [{"videos": [{"completed": bool}, ...]}, ...]. The
+# enrollment's `catalog_id` is the structure's content fingerprint, so users
+# adding the same course share one structure.
+
+# Per-user video state kept on the enrollment rather than in the catalog
+PROGRESS_FIELDS = ["completed"]
+
+def split_sections(sections):
+    """(catalog structure, enrollment progress) of a full sections list"""
+    structure = [
+        {**{key: value for key, value in section.items() if key != "videos"},
+         "videos": [{key: value for key, value in video.items() if key not in PROGRESS_FIELDS}
+                    for video in section.get("videos", [])]}
+        for section in sections
+    ]
+    progress = [
+        {"videos": [{"completed": bool(video.get("completed", False))} for video in section.get("videos", [])]}
+        for section in sections
+    ]
+    return structure, progress
+
+def structure_fingerprint(structure):
+    """Content fingerprint of a catalog structure, used as its ID"""
+    canonical = json.dumps(structure, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def join_sections(structure, progress=None):
+    """Full sections list from a catalog structure and an enrollment's progress
+
+    Builds new section and video dicts, so the shared structure is never
+    modified by callers editing the result.
+    """
+    progress = progress or []
+    sections = []
+    for section_index, section in enumerate(structure):
+        section_progress = progress[section_index].get("videos", []) if section_index < len(progress) else []
+        sections.append({**section, "videos": [
+            {**video, "completed": bool(section_progress[video_index].get("completed", False))
+                                  if video_index < len(section_progress) else False}
+            for video_index, video in enumerate(section["videos"])
+        ]})
+    return sections
@@ -0,0 +1,313 @@
+import logging
+import datetime
+
+import pymongo
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, DuplicateKeyError, OperationFailure, PyMongoError
+from pymongo.collection import ReturnDocument
+from bson.objectid import ObjectId
+
+from storage.base import (StorageBackend, COURSE_STATS_FIELDS, COURSE_SUMMARY_FIELDS, build_user_stats,
+                          user_stats_delta)
+
+logger = logging.getLogger(__name__)
+
+# Soft-deleted courses carry a `deleted_at` field; every read filters on this
+LIVE = {"deleted_at": {"$exists": False}}
+
+# Emails are matched ignoring case; queries must pass the same collation to use the index
+EMAIL_COLLATION = {"locale": "en", "strength": 2}
+
+# Users whose courses were deleted, restored or purged are flagged in the
+# reports collection, so the admin report rollups (reports.py) recompute them
+DIRTY_USER_KIND = "dirty_user"
+
+class MongoStorage(StorageBackend):
+    """Storage on MongoDB with one document per user and per course
+
+    Each user also has a `user_stats` document, keyed by user ID, that is
+    kept current with `$inc` so the dashboard totals are one primary-key read.
+    Course structures shared by several users live once in the catalog
+    collection, keyed by their fingerprint.
+    """
+
+    name = "mongo"
+
+    def __init__(self, uri, db_name, users_collection, courses_collection, user_stats_collection="user_stats",
+                 catalog_collection="course_catalog", reports_collection="reports", event_listeners=()):
+        try:
+            self.client = MongoClient(uri, serverSelectionTimeoutMS=5000,  # 5s timeout
+                                      event_listeners=list(event_listeners))
+            self.client.admin.command('ping')  # Test connection
+            logger.info(f"Successfully connected to MongoDB at {uri}")
+        except ConnectionFailure as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            raise
+
+        self.db = self.client[db_name]
+        self.users = self.db[users_collection]
+        self.courses = self.db[courses_collection]
+        self.user_stats = self.db[user_stats_collection]
+        self.catalog = self.db[catalog_collection]
+        self.reports = self.db[reports_collection]
+        self.ensure_indexes()
+
+    def ensure_indexes(self):
+        """Create the indexes the queries below rely on"""
+        # Unique email ignoring case, so User@x.com and user@x.com are one account
+        try:
+            self.users.create_index([("email", pymongo.ASCENDING)], name="email_ci", unique=True,
+                                    collation=EMAIL_COLLATION)
+        except OperationFailure as e:
+            logger.error(f"Can't create the case-insensitive email index, merge accounts whose emails differ only in case: {e}")
+        else:
+            # The case-sensitive index it replaces
+            if "email_1" in self.users.index_information():
+                self.users.drop_index("email_1")
+
+        # Per-user course lookups; the updated_at key also answers the freshness check
+        self.courses.create_index([("user_id", pymongo.ASCENDING), ("updated_at", pymongo.DESCENDING)])
+
+        # Only soft-deleted courses are indexed, so the purge finds them without a
+        # collection scan and live courses don't pay for the extra index entries
+        self.courses.create_index([("deleted_at", pymongo.ASCENDING)],
+                                  partialFilterExpression={"deleted_at": {"$exists": True}})
+
+    # Users
+
+    def insert_user(self, user):
+        # One write: the unique index rejects taken emails, and the summary is built on first read
+        try:
+            return str(self.users.insert_one(user).inserted_id)
+        except DuplicateKeyError:
+            return None
+
+    def get_user_by_email(self, email, fields=None):
+        return self.users.find_one({"email": email}, {field: 1 for field in fields} if fields else None,
+                                   collation=EMAIL_COLLATION)
+
+    def update_user(self, user_id, fields):
+        return self.users.update_one({"_id": ObjectId(user_id)}, {"$set": fields}).matched_count > 0
+
+    # Courses
+
+    def insert_course(self, course):
+        try:
+            course_id = str(self.courses.insert_one(course).inserted_id)
+        except DuplicateKeyError:
+            return None
+        self._increment_user_stats(course["user_id"], user_stats_delta(after=course))
+        return course_id
+
+    def get_user_courses(self, user_id):
+        return list(self.courses.find({"user_id": user_id, **LIVE}))
+
+    def get_user_course_outlines(self, user_id):
+        return list(self.courses.find(
+            {"user_id": user_id, **LIVE},
+            {"title": 1, "description": 1, "catalog_id": 1, "sections.title": 1, "sections.videos.title": 1}
+        ))
+
+    def get_user_courses_fingerprint(self, user_id):
+        # Both lookups walk the (user_id, updated_at) index; deleted courses are filtered out on fetch
+        count = self.courses.count_documents({"user_id": user_id, **LIVE})
+        latest = self.courses.find_one({"user_id": user_id, **LIVE}, {"_id": 0, "updated_at": 1},
+                                        sort=[("updated_at", pymongo.DESCENDING)])
+        return (count, latest.get("updated_at") if latest else None)
+
+    def get_course_by_id(self, course_id):
+        return self.courses.find_one({"_id": ObjectId(course_id), **LIVE})
+
+    def get_courses_by_ids(self, course_ids):
+        return list(self.courses.find({"_id": {"$in": [ObjectId(course_id) for course_id in course_ids]}, **LIVE}))
+
+    def get_course_summaries(self, course_ids):
+        return list(self.courses.find({"_id": {"$in": [ObjectId(course_id) for course_id in course_ids]}, **LIVE},
+                                      {field: 1 for field in COURSE_SUMMARY_FIELDS}))
+
+    def get_user_course_summaries(self, user_id):
+        # Served by the (user_id, updated_at) index; sections stay on the server
+        return list(self.courses.find({"user_id": user_id, **LIVE}, {field: 1 for field in COURSE_SUMMARY_FIELDS})
+                    .sort("updated_at", pymongo.DESCENDING))
+
+    def get_user_course_titles(self, user_id):
+        # Served by the (user_id, updated_at) index
+        return list(self.courses.find({"user_id": user_id, **LIVE}, {"title": 1})
+                    .sort("updated_at", pymongo.DESCENDING))
+
+    def _update_course(self, course_id, update, fields, expected_updated_at=None):
+        """Apply `update` to a course, moving its user's summary by what changed in `fields`"""
+        query = {"_id": ObjectId(course_id), **LIVE}
+        if expected_updated_at is not None:
+            query["updated_at"] = expected_updated_at
+        if not any(field in fields for field in COURSE_STATS_FIELDS):
+            return self.courses.update_one(query, update).matched_count > 0
+
+        before = self.courses.find_one_and_update(
+            query, update,
+            projection={"user_id": 1, **{field: 1 for field in COURSE_STATS_FIELDS}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if before is None:
+            return False
+        after = {**before, **{field: fields[field] for field in COURSE_STATS_FIELDS if field in fields}}
+        self._increment_user_stats(before["user_id"], user_stats_delta(before, after))
+        return True
+
+    def update_course(self, course_id, fields):
+        return self._update_course(course_id, {"$set": fields}, fields)
+
+    def soft_delete_course(self, course_id, deleted_at):
+        before = self.courses.find_one_and_update(
+            {"_id": ObjectId(course_id), **LIVE},
+            {"$set": {"deleted_at": deleted_at}},
+            projection={"user_id": 1, **{field: 1 for field in COURSE_STATS_FIELDS}}
+        )
+        if before is None:
+            return False
+        self._increment_user_stats(before["user_id"], user_stats_delta(before=before))
+        self._mark_reports_dirty([before["user_id"]])
+        return True
+
+    def restore_course(self, course_id, deleted_since):
+        before = self.courses.find_one_and_update(
+            {"_id": ObjectId(course_id), "deleted_at": {"$gte": deleted_since}},
+            {"$unset": {"deleted_at": ""}},
+            projection={"user_id": 1, **{field: 1 for field in COURSE_STATS_FIELDS}}
+        )
+        if before is None:
+            return False
+        self._increment_user_stats(before["user_id"], user_stats_delta(after=before))
+        self._mark_reports_dirty([before["user_id"]])
+        return True
+
+    def purge_deleted_courses(self, deleted_before, limit):
+        # Served by the partial deleted_at index
+        expired = {"deleted_at": {"$lt": deleted_before}}
+        expired_courses = list(self.courses.find(expired, {"_id": 1, "user_id": 1}).limit(limit))
+        if not expired_courses:
+            return 0
+        # The deleted_at condition is repeated in case a course was restored in between
+        purged = self.courses.delete_many({"_id": {"$in": [course["_id"] for course in expired_courses]},
+                                           **expired}).deleted_count
+        self._mark_reports_dirty({course["user_id"] for course in expired_courses})
+        return purged
+
+    def update_video_status(self, course_id, section_index, video_index, completed, updated_at):
+        result = self.courses.update_one(
+            {"_id": ObjectId(course_id), **LIVE},
+            {"$set": {
+                f"sections.{section_index}.videos.{video_index}.completed": completed,
+                "updated_at": updated_at
+            }}
+        )
+        return result.matched_count > 0
+
+    def update_video_statuses(self, course_id, changes, fields, expected_updated_at=None):
+        updates = {f"sections.{section_index}.videos.{video_index}.completed": completed
+                   for section_index, video_index, completed in changes}
+        return self._update_course(course_id, {"$set": {**updates, **fields}}, fields, expected_updated_at)
+
+    def set_videos_completed(self, course_id, completed, fields, section_index=None, video_count=None,
+                             expected_updated_at=None):
+        # All-positional $[] updates every element in place, however many videos there are
+        if section_index is None:
+            paths = ["sections.$[].videos.$[].completed"]
+        elif video_count is None:
+            paths = [f"sections.{section_index}.videos.$[].completed"]
+        else:
+            paths = [f"sections.{section_index}.videos.{video_index}.completed" for video_index in range(video_count)]
+        return self._update_course(course_id, {"$set": {**{path: completed for path in paths}, **fields}}, fields,
+                                   expected_updated_at)
+
+    # Scans and migrations
+
+    def get_courses_after(self, after_id, limit):
+        query = dict(LIVE)
+        if after_id is not None:
+            query["_id"] = {"$gt": ObjectId(after_id)}
+        return list(self.courses.find(query).sort("_id", pymongo.ASCENDING).limit(limit))
+
+    def _below_version(self, version):
+        # $not also matches documents without a schema_version
+        return {"schema_version": {"$not": {"$gte": version}}, **LIVE}
+
+    def count_courses_below_version(self, version):
+        return self.courses.count_documents(self._below_version(version))
+
+    def get_courses_below_version(self, version, after_id, limit):
+        query = self._below_version(version)
+        if after_id is not None:
+            query["_id"] = {"$gt": ObjectId(after_id)}
+        return list(self.courses.find(query).sort("_id", pymongo.ASCENDING).limit(limit))
+
+    def bulk_update_courses(self, updates):
+        if not updates:
+            return 0
+        requests = []
+        for course_id, expected_updated_at, fields in updates:
+            update = {"$set": {key: value for key, value in fields.items() if value is not None}}
+            removed = {key: "" for key, value in fields.items() if value is None}
+            if removed:
+                update["$unset"] = removed
+            requests.append(UpdateOne({"_id": ObjectId(course_id), "updated_at": expected_updated_at, **LIVE}, update))
+        # Unordered: one failing document doesn't stop the rest of the batch
+        try:
+            return self.courses.bulk_write(requests, ordered=False).matched_count
+        except BulkWriteError as e:
+            logger.error(f"{len(e.details['writeErrors'])} course updates failed: {e.details['writeErrors'][0]['errmsg']}")
+            return e.details["nMatched"]
+
+    # Catalog
+
+    def insert_catalog_structure(self, catalog_id, structure):
+        # Keyed by content fingerprint, so concurrent inserts of the same course are harmless
+        self.catalog.update_one({"_id": catalog_id}, {"$setOnInsert": {"sections": structure}}, upsert=True)
+
+    def get_catalog_structures(self, catalog_ids):
+        return {document["_id"]: document["sections"]
+                for document in self.catalog.find({"_id": {"$in": list(catalog_ids)}})}
+
+    # Reports
+
+    def _mark_reports_dirty(self, user_ids):
+        """Flag users for the next report rollup refresh; marks are keyed by user, so repeats overwrite"""
+        marked_at = datetime.datetime.utcnow()
+        try:
+            self.reports.bulk_write([UpdateOne({"_id": {DIRTY_USER_KIND: user_id}},
+                                               {"$set": {"kind": DIRTY_USER_KIND, "marked_at": marked_at}}, upsert=True)
+                                     for user_id in user_ids], ordered=False)
+        except PyMongoError as e:
+            # The course change itself went through; only the reports lag behind
+            logger.error(f"Failed to flag users {sorted(user_ids)} for the report rollups, refresh them with --full: {e}")
+
+    # User summaries
+
+    def _increment_user_stats(self, user_id, delta):
+        # $inc is applied atomically on the server, so concurrent sessions don't lose updates.
+        # Users from before summaries existed have no document yet; it is built on first read.
+        if delta:
+            self.user_stats.update_one({"_id": user_id}, {"$inc": delta})
+
+    def get_user_stats(self, user_id):
+        return self.user_stats.find_one({"_id": user_id})
+
+    def rebuild_user_stats(self, user_id=None):
+        query = dict(LIVE) if user_id is None else {"user_id": user_id, **LIVE}
+        courses_by_user = {}
+        if user_id is None:
+            for user in self.users.find({}, {"_id": 1}):
+                courses_by_user[str(user["_id"])] = []
+        else:
+            courses_by_user[user_id] = []
+        for course in self.courses.find(query, {"_id": 0, "user_id": 1, **{field: 1 for field in COURSE_STATS_FIELDS}}):
+            courses_by_user.setdefault(course["user_id"], []).append(course)
+
+        for stats_user_id, courses in courses_by_user.items():
+            self.user_stats.replace_one({"_id": stats_user_id}, build_user_stats(courses), upsert=True)
+        return len(courses_by_user)
+
+    # Maintenance
+
+    def drop(self):
+        self.client.drop_database(self.db.name)
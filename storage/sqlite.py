@@ -0,0 +1,588 @@
+import os
+import json
+import sqlite3
+import secrets
+import logging
+import datetime
+import threading
+
+from storage.base import (StorageBackend, COURSE_STATS_FIELDS, COURSE_SUMMARY_FIELDS, build_user_stats,
+                          user_stats_delta, apply_user_stats_delta)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    password BLOB NOT NULL,
+    name TEXT,
+    created_at TEXT,
+    extra TEXT
+);
+
+CREATE TABLE IF NOT EXISTS courses (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT,
+    description TEXT,
+    platform TEXT,
+    url TEXT,
+    url_generated INTEGER,
+    created_at TEXT,
+    updated_at TEXT,
+    total_videos INTEGER,
+    completed_videos INTEGER,
+    completion_percentage REAL,
+    total_duration_minutes REAL,
+    completed_duration_minutes REAL,
+    remaining_duration_minutes REAL,
+    sections_completed INTEGER,
+    sections_total INTEGER,
+    extra TEXT,
+    deleted_at TEXT,
+    catalog_id TEXT,
+    schema_version INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS sections (
+    course_id TEXT NOT NULL REFERENCES courses (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT,
+    extra TEXT,
+    PRIMARY KEY (course_id, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS videos (
+    course_id TEXT NOT NULL,
+    section_position INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT,
+    duration_minutes REAL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    extra TEXT,
+    PRIMARY KEY (course_id, section_position, position),
+    FOREIGN KEY (course_id, section_position) REFERENCES sections (course_id, position) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Course structures shared between enrollments, keyed by content fingerprint, as JSON
+CREATE TABLE IF NOT EXISTS catalog (
+    id TEXT PRIMARY KEY,
+    sections TEXT NOT NULL
+);
+
+-- Per-user summary of the courses above, kept current in the same transactions
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    stats TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Created after MIGRATIONS, since they refer to columns older databases lack
+INDEXES = """
+-- Live courses only: soft-deleted ones (deleted_at set) are left out of the per-user index
+DROP INDEX IF EXISTS idx_courses_user_updated;
+CREATE INDEX IF NOT EXISTS idx_courses_user_live ON courses (user_id, updated_at DESC) WHERE deleted_at IS NULL;
+-- And only they are in this one, which the purge walks
+CREATE INDEX IF NOT EXISTS idx_courses_deleted ON courses (deleted_at) WHERE deleted_at IS NOT NULL;
+"""
+
+# Unique email ignoring case, so User@x.com and user@x.com are one account. Lookups
+# compare with COLLATE NOCASE to use it.
+EMAIL_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_nocase ON users (email COLLATE NOCASE)"
+
+# Columns added since the first release: (table, column, definition)
+MIGRATIONS = [
+    ("courses", "deleted_at", "TEXT"),
+    ("courses", "catalog_id", "TEXT"),
+    ("courses", "schema_version", "INTEGER"),
+]
+
+# Live courses a document migration still has to visit (see scripts/migrate_courses.py)
+COURSES_BELOW_VERSION = "deleted_at IS NULL AND (schema_version IS NULL OR schema_version < ?)"
+
+# Document fields stored in their own columns; anything else goes to the `extra` JSON column
+USER_FIELDS = ["email", "password", "name", "created_at"]
+COURSE_FIELDS = ["user_id", "title", "description", "platform", "url", "url_generated", "created_at",
+                 "updated_at", "total_videos", "completed_videos", "completion_percentage",
+                 "total_duration_minutes", "completed_duration_minutes", "remaining_duration_minutes",
+                 "sections_completed", "sections_total", "catalog_id", "schema_version"]
+SECTION_FIELDS = ["title"]
+VIDEO_FIELDS = ["title", "duration_minutes", "completed"]
+
+DATETIME_FIELDS = {"created_at", "updated_at"}
+BOOLEAN_FIELDS = {"url_generated", "completed"}
+
+def new_id():
+    """24-character hex ID, the same shape as a MongoDB ObjectId string"""
+    return secrets.token_hex(12)
+
+def _json_default(value):
+    if isinstance(value, datetime.datetime):
+        return {"$date": value.isoformat()}
+    return str(value)
+
+def _json_object_hook(value):
+    if set(value) == {"$date"}:
+        return datetime.datetime.fromisoformat(value["$date"])
+    return value
+
+def _to_column(field, value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def _from_column(field, value):
+    if field in DATETIME_FIELDS:
+        return datetime.datetime.fromisoformat(value)
+    if field in BOOLEAN_FIELDS:
+        return bool(value)
+    return value
+
+def _split_fields(document, columns, skip=()):
+    """Split a document into column values and the JSON of the remaining fields"""
+    values = [_to_column(field, document.get(field)) for field in columns]
+    extra = {key: value for key, value in document.items() if key not in columns and key not in skip}
+    return values, json.dumps(extra, default=_json_default) if extra else None
+
+def _row_to_document(row, columns):
+    """Rebuild a document from a row, leaving out NULL columns like a missing Mongo field"""
+    values = dict(zip(row.keys(), row))
+    document = {field: _from_column(field, values[field])
+                for field in columns if values.get(field) is not None}
+    if values.get("extra"):
+        document.update(json.loads(values["extra"], object_hook=_json_object_hook))
+    return document
+
+class SQLiteStorage(StorageBackend):
+    """Embedded storage with normalized courses, sections and videos tables
+
+    For catalog-backed courses the sections and videos rows only carry the
+    completed flags; the shared structure is a JSON row in `catalog`.
+
+    One connection is shared by all sessions and guarded by a lock; SQLite
+    serializes writes anyway and reads take well under a millisecond.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock:
+            self.conn.execute("PRAGMA foreign_keys = ON")
+            if path != ":memory:":
+                self.conn.execute("PRAGMA journal_mode = WAL")
+                self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.executescript(SCHEMA)
+            self._migrate()
+            self.conn.executescript(INDEXES)
+            try:
+                self.conn.execute(EMAIL_INDEX)
+            except sqlite3.IntegrityError as e:
+                logger.error(f"Can't create the case-insensitive email index, merge accounts whose emails differ only in case: {e}")
+        logger.info(f"Using SQLite storage at {path}")
+
+    def _migrate(self):
+        """Add the columns a database created by an older version is missing"""
+        for table, column, definition in MIGRATIONS:
+            columns = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                logger.info(f"Added column {table}.{column}")
+
+    # Users
+
+    def insert_user(self, user):
+        user_id = new_id()
+        values, extra = _split_fields(user, USER_FIELDS, skip=("_id",))
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(
+                    f"INSERT INTO users (id, {', '.join(USER_FIELDS)}, extra) VALUES (?, {', '.join('?' * len(USER_FIELDS))}, ?)",
+                    [user_id, *values, extra]
+                )
+                self._write_user_stats(user_id, build_user_stats([]))
+        except sqlite3.IntegrityError as e:
+            # Only a taken email means None; other constraint failures are real errors
+            if "users.email" not in str(e):
+                raise
+            return None
+        return user_id
+
+    def get_user_by_email(self, email, fields=None):
+        columns = [field for field in USER_FIELDS if not fields or field in fields]
+        # Fields that aren't columns live in the extra JSON
+        if not fields or any(field not in USER_FIELDS for field in fields):
+            columns.append("extra")
+        with self._lock:
+            row = self.conn.execute(f"SELECT id, {', '.join(columns)} FROM users WHERE email = ? COLLATE NOCASE",
+                                    (email,)).fetchone()
+        if row is None:
+            return None
+        document = {"_id": row["id"], **_row_to_document(row, USER_FIELDS)}
+        return {key: value for key, value in document.items() if not fields or key == "_id" or key in fields}
+
+    def update_user(self, user_id, fields):
+        columns = [field for field in USER_FIELDS if field in fields]
+        extra_fields = {key: value for key, value in fields.items() if key not in USER_FIELDS and key != "_id"}
+        with self._lock, self.conn:
+            row = self.conn.execute("SELECT extra FROM users WHERE id = ?", (user_id,)).fetchone()
+            if row is None:
+                return False
+            if columns:
+                self.conn.execute(
+                    f"UPDATE users SET {', '.join(f'{field} = ?' for field in columns)} WHERE id = ?",
+                    [*(_to_column(field, fields[field]) for field in columns), user_id]
+                )
+            if extra_fields:
+                extra = json.loads(row["extra"], object_hook=_json_object_hook) if row["extra"] else {}
+                extra.update(extra_fields)
+                self.conn.execute("UPDATE users SET extra = ? WHERE id = ?",
+                                  (json.dumps(extra, default=_json_default), user_id))
+        return True
+
+    # Courses
+
+    def _write_sections(self, course_id, sections):
+        """Replace the sections and videos of a course (caller holds the lock and transaction)"""
+        self.conn.execute("DELETE FROM videos WHERE course_id = ?", (course_id,))
+        self.conn.execute("DELETE FROM sections WHERE course_id = ?", (course_id,))
+
+        section_rows, video_rows = [], []
+        for section_position, section in enumerate(sections):
+            values, extra = _split_fields(section, SECTION_FIELDS, skip=("videos",))
+            section_rows.append([course_id, section_position, *values, extra])
+            for position, video in enumerate(section.get("videos", [])):
+                values, extra = _split_fields(video, VIDEO_FIELDS)
+                values[VIDEO_FIELDS.index("completed")] = int(bool(video.get("completed", False)))
+                video_rows.append([course_id, section_position, position, *values, extra])
+
+        self.conn.executemany("INSERT INTO sections (course_id, position, title, extra) VALUES (?, ?, ?, ?)",
+                              section_rows)
+        self.conn.executemany(
+            f"INSERT INTO videos (course_id, section_position, position, {', '.join(VIDEO_FIELDS)}, extra) "
+            f"VALUES (?, ?, ?, {', '.join('?' * len(VIDEO_FIELDS))}, ?)",
+            video_rows
+        )
+
+    def insert_course(self, course):
+        course_id = new_id()
+        values, extra = _split_fields(course, COURSE_FIELDS, skip=("_id", "sections"))
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO courses (id, {', '.join(COURSE_FIELDS)}, extra) VALUES (?, {', '.join('?' * len(COURSE_FIELDS))}, ?)",
+                [course_id, *values, extra]
+            )
+            self._write_sections(course_id, course.get("sections", []))
+            self._increment_user_stats(course["user_id"], user_stats_delta(after=course))
+        return course_id
+
+    def _load_courses(self, column, values, outline=False):
+        """Load the courses whose `column` is in `values`, with one query per table"""
+        placeholders = ", ".join("?" * len(values))
+        with self._lock:
+            course_rows = self.conn.execute(
+                f"SELECT * FROM courses WHERE {column} IN ({placeholders}) AND deleted_at IS NULL", values
+            ).fetchall()
+            if not course_rows:
+                return []
+            course_ids = [row["id"] for row in course_rows]
+            id_placeholders = ", ".join("?" * len(course_ids))
+            section_rows = self.conn.execute(
+                f"SELECT * FROM sections WHERE course_id IN ({id_placeholders}) ORDER BY course_id, position",
+                course_ids
+            ).fetchall()
+            # Plain tuples: videos are the bulk of the rows and sqlite3.Row access is slow
+            video_cursor = self.conn.cursor()
+            video_cursor.row_factory = None
+            video_rows = video_cursor.execute(
+                f"SELECT course_id, section_position, {', '.join(VIDEO_FIELDS)}, extra FROM videos "
+                f"WHERE course_id IN ({id_placeholders}) ORDER BY course_id, section_position, position",
+                course_ids
+            ).fetchall()
+
+        courses = {}
+        for row in course_rows:
+            if outline:
+                courses[row["id"]] = {"_id": row["id"], "title": row["title"], "description": row["description"]}
+                if row["catalog_id"]:
+                    courses[row["id"]]["catalog_id"] = row["catalog_id"]
+            else:
+                courses[row["id"]] = {"_id": row["id"], **_row_to_document(row, COURSE_FIELDS)}
+            courses[row["id"]]["sections"] = []
+
+        for row in section_rows:
+            section = {"title": row["title"]} if outline else _row_to_document(row, SECTION_FIELDS)
+            section["videos"] = []
+            courses[row["course_id"]]["sections"].append(section)
+
+        for course_id, section_position, title, duration, completed, extra in video_rows:
+            if outline:
+                video = {"title": title}
+            else:
+                video = {"title": title, "duration_minutes": duration, "completed": bool(completed)}
+                video = {key: value for key, value in video.items() if value is not None}
+                if extra:
+                    video.update(json.loads(extra, object_hook=_json_object_hook))
+            courses[course_id]["sections"][section_position]["videos"].append(video)
+
+        return list(courses.values())
+
+    def get_user_courses(self, user_id):
+        return self._load_courses("user_id", [user_id])
+
+    def get_user_course_outlines(self, user_id):
+        return self._load_courses("user_id", [user_id], outline=True)
+
+    def get_user_courses_fingerprint(self, user_id):
+        with self._lock:
+            count, latest = self.conn.execute(
+                "SELECT COUNT(*), MAX(updated_at) FROM courses WHERE user_id = ? AND deleted_at IS NULL", (user_id,)
+            ).fetchone()
+        return (count, datetime.datetime.fromisoformat(latest) if latest else None)
+
+    def get_course_by_id(self, course_id):
+        courses = self._load_courses("id", [course_id])
+        return courses[0] if courses else None
+
+    def get_courses_by_ids(self, course_ids):
+        return self._load_courses("id", list(course_ids)) if course_ids else []
+
+    def get_course_summaries(self, course_ids):
+        if not course_ids:
+            return []
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, {', '.join(COURSE_SUMMARY_FIELDS)} FROM courses "
+                f"WHERE id IN ({', '.join('?' * len(course_ids))}) AND deleted_at IS NULL", list(course_ids)
+            ).fetchall()
+        return [{"_id": row["id"], **_row_to_document(row, COURSE_SUMMARY_FIELDS)} for row in rows]
+
+    def get_user_course_summaries(self, user_id):
+        # The course row only, no section or video rows
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, {', '.join(COURSE_SUMMARY_FIELDS)} FROM courses "
+                f"WHERE user_id = ? AND deleted_at IS NULL ORDER BY updated_at DESC", (user_id,)
+            ).fetchall()
+        return [{"_id": row["id"], **_row_to_document(row, COURSE_SUMMARY_FIELDS)} for row in rows]
+
+    def get_user_course_titles(self, user_id):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, title FROM courses WHERE user_id = ? AND deleted_at IS NULL ORDER BY updated_at DESC",
+                (user_id,)
+            ).fetchall()
+        return [{"_id": row["id"], **_row_to_document(row, ["title"])} for row in rows]
+
+    def update_course(self, course_id, fields):
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                f"SELECT user_id, extra, {', '.join(COURSE_STATS_FIELDS)} FROM courses "
+                f"WHERE id = ? AND deleted_at IS NULL", (course_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            if any(field in fields for field in COURSE_STATS_FIELDS):
+                before = {field: row[field] for field in COURSE_STATS_FIELDS}
+                after = {**before, **{field: fields[field] for field in COURSE_STATS_FIELDS if field in fields}}
+                self._increment_user_stats(row["user_id"], user_stats_delta(before, after))
+            self._write_course_fields(course_id, row["extra"], fields)
+        return True
+
+    def _write_course_fields(self, course_id, stored_extra, fields):
+        """Write top-level fields of a course as given, in the caller's transaction; the user's summary is left alone"""
+        fields = {key: value for key, value in fields.items() if key != "_id"}
+        columns = [field for field in COURSE_FIELDS if field in fields]
+        extra_fields = {key: value for key, value in fields.items()
+                        if key not in COURSE_FIELDS and key != "sections"}
+        if columns:
+            self.conn.execute(
+                f"UPDATE courses SET {', '.join(f'{field} = ?' for field in columns)} WHERE id = ?",
+                [*(_to_column(field, fields[field]) for field in columns), course_id]
+            )
+        if extra_fields:
+            extra = json.loads(stored_extra, object_hook=_json_object_hook) if stored_extra else {}
+            extra.update(extra_fields)
+            # None removes a field, like a NULL column
+            extra = {key: value for key, value in extra.items() if value is not None}
+            self.conn.execute("UPDATE courses SET extra = ? WHERE id = ?",
+                              (json.dumps(extra, default=_json_default) if extra else None, course_id))
+        if "sections" in fields:
+            self._write_sections(course_id, fields["sections"])
+
+    def _set_deleted_at(self, course_id, deleted_at, condition, params):
+        """Set or clear deleted_at of a course matching `condition`; returns its stats row or None"""
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                f"SELECT user_id, {', '.join(COURSE_STATS_FIELDS)} FROM courses WHERE id = ? AND {condition}",
+                (course_id, *params)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE courses SET deleted_at = ? WHERE id = ?",
+                              (deleted_at.isoformat() if deleted_at else None, course_id))
+            delta = user_stats_delta(after=dict(row)) if deleted_at is None else user_stats_delta(before=dict(row))
+            self._increment_user_stats(row["user_id"], delta)
+            return row
+
+    def soft_delete_course(self, course_id, deleted_at):
+        return self._set_deleted_at(course_id, deleted_at, "deleted_at IS NULL", ()) is not None
+
+    def restore_course(self, course_id, deleted_since):
+        return self._set_deleted_at(course_id, None, "deleted_at >= ?", (deleted_since.isoformat(),)) is not None
+
+    def purge_deleted_courses(self, deleted_before, limit):
+        # The subquery walks idx_courses_deleted; sections and videos cascade
+        with self._lock, self.conn:
+            return self.conn.execute(
+                "DELETE FROM courses WHERE id IN (SELECT id FROM courses WHERE deleted_at < ? LIMIT ?)",
+                (deleted_before.isoformat(), limit)
+            ).rowcount
+
+    def update_video_status(self, course_id, section_index, video_index, completed, updated_at):
+        with self._lock, self.conn:
+            if self.conn.execute("SELECT 1 FROM courses WHERE id = ? AND deleted_at IS NULL",
+                                 (course_id,)).fetchone() is None:
+                return False
+            updated = self.conn.execute(
+                "UPDATE videos SET completed = ? WHERE course_id = ? AND section_position = ? AND position = ?",
+                (int(completed), course_id, section_index, video_index)
+            ).rowcount
+            if updated:
+                self.conn.execute("UPDATE courses SET updated_at = ? WHERE id = ?",
+                                  (updated_at.isoformat(), course_id))
+        return updated > 0
+
+    def _course_matches(self, course_id, expected_updated_at=None):
+        """True if the course is live and, with `expected_updated_at`, wasn't updated since"""
+        row = self.conn.execute("SELECT updated_at FROM courses WHERE id = ? AND deleted_at IS NULL",
+                                (course_id,)).fetchone()
+        return row is not None and (expected_updated_at is None
+                                    or row["updated_at"] == _to_column("updated_at", expected_updated_at))
+
+    def update_video_statuses(self, course_id, changes, fields, expected_updated_at=None):
+        with self._lock, self.conn:
+            if not self._course_matches(course_id, expected_updated_at):
+                return False
+            self.conn.executemany(
+                "UPDATE videos SET completed = ? WHERE course_id = ? AND section_position = ? AND position = ?",
+                [(int(completed), course_id, section_index, video_index)
+                 for section_index, video_index, completed in changes]
+            )
+            # Committed together with the video rows
+            return self.update_course(course_id, fields)
+
+    def set_videos_completed(self, course_id, completed, fields, section_index=None, video_count=None,
+                             expected_updated_at=None):
+        condition, params = "course_id = ?", [course_id]
+        if section_index is not None:
+            condition += " AND section_position = ?"
+            params.append(section_index)
+        if video_count is not None:
+            condition += " AND position < ?"
+            params.append(video_count)
+        with self._lock, self.conn:
+            if not self._course_matches(course_id, expected_updated_at):
+                return False
+            self.conn.execute(f"UPDATE videos SET completed = ? WHERE {condition}", (int(completed), *params))
+            return self.update_course(course_id, fields)
+
+    # Scans and migrations
+
+    def _load_course_page(self, condition, params, after_id, limit):
+        """Courses matching `condition` with IDs after `after_id`, in ID order"""
+        with self._lock:
+            course_ids = [row["id"] for row in self.conn.execute(
+                f"SELECT id FROM courses WHERE {condition} AND id > ? ORDER BY id LIMIT ?",
+                (*params, after_id or "", limit)
+            )]
+        if not course_ids:
+            return []
+        return sorted(self._load_courses("id", course_ids), key=lambda course: course["_id"])
+
+    def get_courses_after(self, after_id, limit):
+        return self._load_course_page("deleted_at IS NULL", (), after_id, limit)
+
+    def count_courses_below_version(self, version):
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM courses WHERE {COURSES_BELOW_VERSION}", (version,)).fetchone()[0]
+
+    def get_courses_below_version(self, version, after_id, limit):
+        return self._load_course_page(COURSES_BELOW_VERSION, (version,), after_id, limit)
+
+    def bulk_update_courses(self, updates):
+        written = 0
+        with self._lock, self.conn:
+            for course_id, expected_updated_at, fields in updates:
+                row = self.conn.execute("SELECT updated_at, extra FROM courses WHERE id = ? AND deleted_at IS NULL",
+                                        (course_id,)).fetchone()
+                if row is None or row["updated_at"] != _to_column("updated_at", expected_updated_at):
+                    continue
+                # Written as given, like the MongoDB backend; callers rebuild the summaries
+                self._write_course_fields(course_id, row["extra"], fields)
+                written += 1
+        return written
+
+    # Catalog
+
+    def insert_catalog_structure(self, catalog_id, structure):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO catalog (id, sections) VALUES (?, ?)",
+                              (catalog_id, json.dumps(structure, default=_json_default)))
+
+    def get_catalog_structures(self, catalog_ids):
+        catalog_ids = list(catalog_ids)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, sections FROM catalog WHERE id IN ({', '.join('?' * len(catalog_ids))})", catalog_ids
+            ).fetchall()
+        return {row["id"]: json.loads(row["sections"], object_hook=_json_object_hook) for row in rows}
+
+    # User summaries
+
+    def _write_user_stats(self, user_id, stats):
+        self.conn.execute("INSERT OR REPLACE INTO user_stats (user_id, stats) VALUES (?, ?)",
+                          (user_id, json.dumps(stats)))
+
+    def _increment_user_stats(self, user_id, delta):
+        """Apply increments to a user's summary (caller holds the lock and transaction)"""
+        row = self.conn.execute("SELECT stats FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+        # Users from before summaries existed have none yet; it is built on first read
+        if row is not None and delta:
+            self._write_user_stats(user_id, apply_user_stats_delta(json.loads(row["stats"]), delta))
+
+    def get_user_stats(self, user_id):
+        with self._lock:
+            row = self.conn.execute("SELECT stats FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+        return {"_id": user_id, **json.loads(row["stats"])} if row else None
+
+    def rebuild_user_stats(self, user_id=None):
+        columns = f"user_id, {', '.join(COURSE_STATS_FIELDS)}"
+        with self._lock, self.conn:
+            if user_id is None:
+                courses_by_user = {row["id"]: [] for row in self.conn.execute("SELECT id FROM users")}
+                rows = self.conn.execute(f"SELECT {columns} FROM courses WHERE deleted_at IS NULL").fetchall()
+            else:
+                courses_by_user = {user_id: []}
+                rows = self.conn.execute(f"SELECT {columns} FROM courses WHERE user_id = ? AND deleted_at IS NULL",
+                                         (user_id,)).fetchall()
+            for row in rows:
+                courses_by_user.setdefault(row["user_id"], []).append(dict(row))
+            for stats_user_id, courses in courses_by_user.items():
+                self._write_user_stats(stats_user_id, build_user_stats(courses))
+        return len(courses_by_user)
+
+    # Maintenance
+
+    def drop(self):
+        with self._lock, self.conn:
+            for table in ("videos", "sections", "courses", "users", "user_stats", "catalog"):
+                self.conn.execute(f"DELETE FROM {table}")